@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Astuce, Categorie, Proposition, Validation, Evaluation, Favori, Recherche
+from .models import Astuce, Categorie, Proposition, Validation, Evaluation, Favori, Recherche, RechercheJournaliere
 
 admin.site.register(Astuce)
 admin.site.register(Categorie)
@@ -8,3 +8,4 @@ admin.site.register(Validation)
 admin.site.register(Evaluation)
 admin.site.register(Favori)
 admin.site.register(Recherche)
+admin.site.register(RechercheJournaliere)
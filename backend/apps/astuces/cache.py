@@ -0,0 +1,156 @@
+import functools
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.cache import get_conditional_response, patch_vary_headers, quote_etag
+from django.utils.http import http_date
+from rest_framework.response import Response
+
+from .favoris import favoris_utilisateur
+
+CLE_GENERATION = 'astuces:generation'
+
+
+# ========== GÉNÉRATION DU CONTENU ==========
+def generation():
+    """
+    Compteur global du contenu public. Il fait partie de chaque clé de cache :
+    l'incrémenter rend d'un coup toutes les réponses mémorisées obsolètes,
+    sans avoir à les supprimer (elles expirent d'elles-mêmes).
+    """
+    valeur = cache.get(CLE_GENERATION)
+    if valeur is None:
+        cache.add(CLE_GENERATION, 1, timeout=None)
+        valeur = cache.get(CLE_GENERATION, 1)
+    return valeur
+
+
+def _incrementer():
+    try:
+        cache.incr(CLE_GENERATION)
+    except ValueError:
+        # Clé absente (cache vidé, redémarrage) : repartir d'une valeur neuve
+        cache.add(CLE_GENERATION, 1, timeout=None)
+        cache.incr(CLE_GENERATION)
+
+
+def invalider_contenu():
+    """
+    À appeler après toute écriture visible des visiteurs anonymes.
+    L'incrément attend le commit pour qu'aucune lecture concurrente ne
+    mémorise l'ancien contenu sous la nouvelle génération.
+    """
+    transaction.on_commit(_incrementer)
+
+
+# ========== RÉPONSES ANONYMES ==========
+def _cle_reponse(request, vue):
+    parametres = sorted(request.query_params.lists())
+    brut = f'{request.path}?{parametres}|{request.accepted_renderer.format}'
+    empreinte = hashlib.md5(brut.encode('utf-8')).hexdigest()
+    return f'astuces:reponse:{generation()}:{vue.__class__.__name__}:{vue.action}:{empreinte}'
+
+
+def cache_anonyme(methode):
+    """
+    Mémorise les réponses 200 des GET anonymes (données sérialisées) sous
+    une clé versionnée par generation(). Les utilisateurs connectés ne
+    passent jamais par le cache (est_favori, contenus non validés...).
+    """
+    @functools.wraps(methode)
+    def wrapper(self, request, *args, **kwargs):
+        if request.method != 'GET' or request.user.is_authenticated:
+            return methode(self, request, *args, **kwargs)
+
+        cle = _cle_reponse(request, self)
+        donnees = cache.get(cle)
+        if donnees is not None:
+            return Response(donnees)
+
+        response = methode(self, request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(cle, response.data, getattr(settings, 'CACHE_REPONSES_TTL', 300))
+        return response
+    return wrapper
+
+
+class CacheAnonymeMixin:
+    """list et retrieve mis en cache pour les visiteurs anonymes."""
+
+    @cache_anonyme
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @cache_anonyme
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
+
+# ========== REQUÊTES CONDITIONNELLES (ETag / Last-Modified) ==========
+def marqueur_utilisateur(request):
+    """
+    Partie des réponses propre à l'utilisateur : rôle (contenus visibles)
+    et empreinte de ses favoris (est_favori), lue dans le cache des favoris.
+    """
+    user = request.user
+    if not user.is_authenticated:
+        return 'anonyme'
+    empreinte, _ = favoris_utilisateur(user.pk)
+    return f"{user.pk}:{getattr(user, 'role', '')}:{user.is_staff}:{empreinte}"
+
+
+def conditionnel(methode):
+    """
+    Répond 304 à If-None-Match / If-Modified-Since à partir de
+    self.validateurs(), avant toute sérialisation. La vue renvoie
+    (source de l'ETag, date de dernière modification), l'un ou l'autre
+    pouvant être None.
+    """
+    @functools.wraps(methode)
+    def wrapper(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return methode(self, request, *args, **kwargs)
+
+        source, derniere_modification = self.validateurs(request, *args, **kwargs)
+        if source is None and derniere_modification is None:
+            return methode(self, request, *args, **kwargs)
+
+        etag = None
+        if source is not None:
+            source = f"{source}|{request.META.get('HTTP_ACCEPT', '')}"
+            etag = quote_etag(hashlib.md5(source.encode('utf-8')).hexdigest())
+        timestamp = int(derniere_modification.timestamp()) if derniere_modification else None
+
+        response = get_conditional_response(request._request, etag=etag, last_modified=timestamp)
+        if response is None:
+            response = methode(self, request, *args, **kwargs)
+
+        if response.status_code in (200, 304):
+            if etag:
+                response['ETag'] = etag
+            if timestamp is not None:
+                response['Last-Modified'] = http_date(timestamp)
+            patch_vary_headers(response, ['Authorization', 'Accept'])
+        return response
+    return wrapper
+
+
+class ConditionnelMixin:
+    """
+    list et retrieve conditionnels. Par défaut l'ETag dépend de la
+    génération du contenu, de l'URL et de l'utilisateur : aucune lecture
+    en base pour les visiteurs anonymes.
+    """
+
+    def validateurs(self, request, *args, **kwargs):
+        return f'{generation()}|{request.get_full_path()}|{marqueur_utilisateur(request)}', None
+
+    @conditionnel
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @conditionnel
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
@@ -0,0 +1,162 @@
+"""
+Détection des quasi-doublons par MinHash et LSH. Chaque astuce validée et
+chaque proposition en attente a une signature MinHash de ses 5-grammes de
+caractères ; les bandes de la signature, hachées, sont rangées dans un
+tableau indexé GIN. Les candidats d'un nouveau texte sont les lignes qui
+partagent au moins une bande (opérateur &&), sans comparer les textes.
+"""
+import hashlib
+import re
+import unicodedata
+import zlib
+
+import numpy as np
+
+from django.db import transaction
+from django.db.models.expressions import RawSQL
+
+from .models import Astuce, Proposition, SignatureTexte
+
+PERMUTATIONS = 128
+BANDES = 32  # 4 lignes par bande : candidats au-delà d'environ 0,42 de Jaccard
+LIGNES = PERMUTATIONS // BANDES
+TAILLE_SHINGLE = 5
+SEUIL = 0.6  # similarité estimée à partir de laquelle un doublon est signalé
+PREMIER = (1 << 31) - 1
+STATUTS_SUIVIS = ('en_attente', 'en_revision')
+CANDIDATS_MAX = 200  # comparés en Python, ceux qui partagent le plus de bandes d'abord
+
+# Permutations fixes : les signatures doivent rester comparables d'un processus à l'autre
+_alea = np.random.RandomState(20250101)
+_A = _alea.randint(1, PREMIER, size=PERMUTATIONS, dtype=np.int64)
+_B = _alea.randint(0, PREMIER, size=PERMUTATIONS, dtype=np.int64)
+MOTS = re.compile(r'\w+')
+
+
+# ========== SIGNATURES ==========
+def normaliser(texte):
+    """Minuscules, sans accents ni ponctuation, espaces réduits."""
+    texte = unicodedata.normalize('NFKD', texte or '').encode('ascii', 'ignore').decode('ascii')
+    return ' '.join(MOTS.findall(texte.lower()))
+
+
+def signature(titre, description):
+    """Signature MinHash (PERMUTATIONS entiers) du titre et de la description."""
+    texte = normaliser(f'{titre} {description}')
+    if len(texte) < TAILLE_SHINGLE:
+        texte = texte.ljust(TAILLE_SHINGLE)
+    shingles = np.fromiter(
+        {zlib.crc32(texte[i:i + TAILLE_SHINGLE].encode()) for i in range(len(texte) - TAILLE_SHINGLE + 1)},
+        dtype=np.int64,
+    ) % PREMIER
+    # (a x + b) mod p pour toutes les permutations et tous les shingles : < 2^62, sans débordement
+    return ((_A[:, None] * shingles[None, :] + _B[:, None]) % PREMIER).min(axis=1)
+
+
+def bandes(sig):
+    """Empreinte 64 bits signée de chaque bande, préfixée par son numéro."""
+    resultat = []
+    for bande in range(BANDES):
+        morceau = sig[bande * LIGNES:(bande + 1) * LIGNES]
+        empreinte = hashlib.blake2b(bytes([bande]) + morceau.tobytes(), digest_size=8).digest()
+        resultat.append(int.from_bytes(empreinte, 'big', signed=True))
+    return resultat
+
+
+def _ligne(sig, **cible):
+    return SignatureTexte(signature=sig.tolist(), bandes=bandes(sig), **cible)
+
+
+# ========== MISE À JOUR DE L'INDEX ==========
+def signer_astuce(astuce):
+    if not astuce.valide:
+        SignatureTexte.objects.filter(astuce=astuce).delete()
+        return
+    SignatureTexte.objects.bulk_create(
+        [_ligne(signature(astuce.titre, astuce.description), astuce=astuce)],
+        update_conflicts=True, unique_fields=['astuce'], update_fields=['signature', 'bandes'],
+    )
+
+
+def signer_proposition(proposition):
+    # Une proposition traitée n'est plus un doublon possible (acceptée, c'est son astuce qui compte)
+    if proposition.statut not in STATUTS_SUIVIS:
+        SignatureTexte.objects.filter(proposition=proposition).delete()
+        return
+    SignatureTexte.objects.bulk_create(
+        [_ligne(signature(proposition.titre, proposition.description), proposition=proposition)],
+        update_conflicts=True, unique_fields=['proposition'], update_fields=['signature', 'bandes'],
+    )
+
+
+def signer_lot(astuces=(), propositions=()):
+    """
+    Pour les écritures en masse (sans post_save) : signe les astuces, signe
+    ou retire chaque proposition selon son statut.
+    """
+    suivies = [proposition for proposition in propositions if proposition.statut in STATUTS_SUIVIS]
+    SignatureTexte.objects.filter(
+        proposition_id__in=[proposition.pk for proposition in propositions if proposition.statut not in STATUTS_SUIVIS]
+    ).delete()
+    SignatureTexte.objects.bulk_create(
+        [_ligne(signature(astuce.titre, astuce.description), astuce=astuce) for astuce in astuces],
+        update_conflicts=True, unique_fields=['astuce'], update_fields=['signature', 'bandes'],
+    )
+    SignatureTexte.objects.bulk_create(
+        [_ligne(signature(proposition.titre, proposition.description), proposition=proposition) for proposition in suivies],
+        update_conflicts=True, unique_fields=['proposition'], update_fields=['signature', 'bandes'],
+    )
+
+
+def reconstruire(taille_lot=2000):
+    """
+    Recalcule tout l'index en une transaction : les lecteurs gardent l'ancien
+    jusqu'au commit. Renvoie le nombre de signatures.
+    """
+    nombre = 0
+    sources = (
+        ('astuce_id', Astuce.objects.filter(valide=True)),
+        ('proposition_id', Proposition.objects.filter(statut__in=STATUTS_SUIVIS)),
+    )
+    with transaction.atomic():
+        SignatureTexte.objects.all().delete()
+        for champ, queryset in sources:
+            lot = []
+            for pk, titre, description in queryset.values_list('id', 'titre', 'description').iterator(chunk_size=taille_lot):
+                lot.append(_ligne(signature(titre, description), **{champ: pk}))
+                if len(lot) >= taille_lot:
+                    SignatureTexte.objects.bulk_create(lot)
+                    nombre += len(lot)
+                    lot = []
+            SignatureTexte.objects.bulk_create(lot)
+            nombre += len(lot)
+    return nombre
+
+
+# ========== RECHERCHE ==========
+def doublons_probables(titre, description, limite=5):
+    """
+    [{'type', 'id', 'similarite'}] des astuces et propositions dont la
+    similarité de Jaccard estimée dépasse SEUIL, les plus proches d'abord.
+    """
+    sig = signature(titre, description)
+    empreintes = bandes(sig)
+    table = SignatureTexte._meta.db_table
+    candidats = (
+        SignatureTexte.objects.filter(bandes__overlap=empreintes)
+        # Plus de bandes communes = similarité probablement plus haute
+        .annotate(communes=RawSQL(f'(SELECT count(*) FROM unnest("{table}"."bandes") b WHERE b = ANY(%s))', (empreintes,)))
+        .order_by('-communes', 'id')
+        .values_list('astuce_id', 'proposition_id', 'signature')[:CANDIDATS_MAX]
+    )
+    resultat = []
+    for astuce_id, proposition_id, autre in candidats:
+        similarite = float(np.mean(sig == np.asarray(autre, dtype=np.int64)))
+        if similarite >= SEUIL:
+            resultat.append({
+                'type': 'astuce' if astuce_id else 'proposition',
+                'id': astuce_id or proposition_id,
+                'similarite': round(similarite, 2),
+            })
+    resultat.sort(key=lambda doublon: -doublon['similarite'])
+    return resultat[:limite]
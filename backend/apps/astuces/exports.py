@@ -0,0 +1,127 @@
+import csv
+from datetime import datetime, time
+
+from django.contrib.postgres.aggregates import ArrayAgg
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime, parse_date
+
+from .models import Astuce, Evaluation, Validation
+
+TAILLE_MORCEAU = 2000  # lignes lues par aller-retour du curseur serveur
+TYPES = {
+    'ndjson': 'application/x-ndjson; charset=utf-8',
+    'csv': 'text/csv; charset=utf-8',
+}
+
+
+# ========== JEUX DE DONNÉES ==========
+CHAMPS_ASTUCES = (
+    'id', 'titre', 'description', 'source', 'date_publication', 'date_modification',
+    'niveau_difficulte', 'valide', 'date_validation', 'score_ai', 'score_fiabilite',
+    'nombre_votes', 'somme_notes', 'createur_id', 'createur__username', 'categories_noms',
+)
+CHAMPS_EVALUATIONS = (
+    'id', 'note', 'fiabilite_percue', 'commentaire', 'date',
+    'utilisateur_id', 'utilisateur__username', 'astuce_id',
+)
+CHAMPS_VALIDATIONS = (
+    'id', 'statut', 'date_validation', 'commentaire',
+    'moderateur_id', 'moderateur__username', 'astuce_id',
+)
+
+
+def _astuces():
+    return Astuce.objects.annotate(
+        categories_noms=ArrayAgg('categories__nom', distinct=True, default=[]),
+    ).values(*CHAMPS_ASTUCES)
+
+
+# ressource: (lignes .values(), colonnes, champ de date pour ?depuis=)
+JEUX = {
+    'astuces': (_astuces, CHAMPS_ASTUCES, 'date_modification'),
+    'evaluations': (lambda: Evaluation.objects.values(*CHAMPS_EVALUATIONS), CHAMPS_EVALUATIONS, 'date'),
+    'validations': (lambda: Validation.objects.values(*CHAMPS_VALIDATIONS), CHAMPS_VALIDATIONS, 'date_validation'),
+}
+
+
+# ========== FORMATS ==========
+class _Tampon:
+    """Fichier factice pour csv.writer : renvoie la ligne au lieu de l'écrire."""
+
+    def write(self, valeur):
+        return valeur
+
+
+def _cellule(valeur):
+    if isinstance(valeur, list):
+        return '|'.join(map(str, valeur))
+    if isinstance(valeur, datetime):
+        return valeur.isoformat()
+    return valeur
+
+
+def _csv(lignes, colonnes):
+    writer = csv.writer(_Tampon())
+    yield writer.writerow(colonnes)
+    for ligne in lignes:
+        yield writer.writerow([_cellule(ligne[colonne]) for colonne in colonnes])
+
+
+def _ndjson(lignes):
+    encodeur = DjangoJSONEncoder(ensure_ascii=False)
+    for ligne in lignes:
+        yield encodeur.encode(ligne) + '\n'
+
+
+def _par_paquets(morceaux, taille=TAILLE_MORCEAU):
+    # Regroupe les lignes pour limiter le nombre d'écritures sur la socket
+    paquet = []
+    for morceau in morceaux:
+        paquet.append(morceau)
+        if len(paquet) >= taille:
+            yield ''.join(paquet)
+            paquet = []
+    if paquet:
+        yield ''.join(paquet)
+
+
+def reponse_export(ressource, type_export='ndjson', depuis=None):
+    """
+    Réponse en flux : lignes .values() lues par curseur serveur
+    (.iterator(chunk_size)), encodées au fil de l'eau. La mémoire reste
+    constante quelle que soit la taille de la table.
+    """
+    fabrique, colonnes, champ_date = JEUX[ressource]
+    queryset = fabrique()
+    if depuis is not None:
+        queryset = queryset.filter(**{f'{champ_date}__gte': depuis})
+    queryset = queryset.order_by('id')
+
+    lignes = queryset.iterator(chunk_size=TAILLE_MORCEAU)
+    if type_export == 'csv':
+        morceaux = _csv(lignes, colonnes)
+    else:
+        morceaux = _ndjson(lignes)
+
+    response = StreamingHttpResponse(_par_paquets(morceaux), content_type=TYPES[type_export])
+    nom = f"{ressource}-{timezone.now():%Y%m%d-%H%M%S}.{type_export}"
+    response['Content-Disposition'] = f'attachment; filename="{nom}"'
+    response['Cache-Control'] = 'no-store'
+    return response
+
+
+def lire_depuis(valeur):
+    """?depuis= : date ou date-heure ISO, None si absent ; ValueError si illisible."""
+    if not valeur:
+        return None
+    date = parse_datetime(valeur)
+    if date is None:
+        jour = parse_date(valeur)
+        if jour is None:
+            raise ValueError(valeur)
+        date = datetime.combine(jour, time.min)
+    if timezone.is_naive(date):
+        date = timezone.make_aware(date)
+    return date
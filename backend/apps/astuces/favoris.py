@@ -0,0 +1,35 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+
+def _cle(utilisateur_id):
+    return f'astuces:favoris:{utilisateur_id}'
+
+
+def favoris_utilisateur(utilisateur_id):
+    """
+    Ids triés des astuces favorites d'un utilisateur et leur empreinte,
+    gardés en cache jusqu'à la prochaine écriture sur ses favoris.
+    Renvoie (empreinte, ids).
+    """
+    valeur = cache.get(_cle(utilisateur_id))
+    if valeur is None:
+        from .models import Favori
+
+        ids = list(
+            Favori.objects.filter(utilisateur_id=utilisateur_id)
+            .order_by('astuce_id')
+            .values_list('astuce_id', flat=True)
+        )
+        empreinte = hashlib.md5(','.join(map(str, ids)).encode('ascii')).hexdigest()
+        valeur = (empreinte, ids)
+        cache.set(_cle(utilisateur_id), valeur, getattr(settings, 'CACHE_FAVORIS_TTL', 3600))
+    return valeur
+
+
+def invalider_favoris(utilisateur_id):
+    """Supprime l'entrée une fois la transaction validée."""
+    transaction.on_commit(lambda: cache.delete(_cle(utilisateur_id)))
@@ -0,0 +1,163 @@
+import hashlib
+import io
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+from django.utils import timezone
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+logger = logging.getLogger(__name__)
+
+# nom: (plus grand côté en pixels, format Pillow, extension)
+VARIANTES = {
+    'miniature': (320, 'JPEG', 'jpg'),
+    'miniature_webp': (320, 'WEBP', 'webp'),
+    'moyenne': (800, 'JPEG', 'jpg'),
+    'moyenne_webp': (800, 'WEBP', 'webp'),
+}
+QUALITE = {'JPEG': 82, 'WEBP': 80}
+
+# modèle: champ image ; les variantes sont enregistrées dans <champ>_variantes
+CHAMPS_IMAGES = {
+    'astuces.Astuce': 'image',
+    'astuces.ImageAstuce': 'image',
+    'astuces.Proposition': 'image',
+    'users.CustomUser': 'avatar',
+}
+
+
+# ========== GÉNÉRATION ==========
+def _encoder(image, largeur, format):
+    copie = image.copy()
+    copie.thumbnail((largeur, largeur), Image.Resampling.LANCZOS)
+    if format == 'JPEG' and copie.mode != 'RGB':
+        copie = copie.convert('RGB')
+    elif format == 'WEBP' and copie.mode not in ('RGB', 'RGBA'):
+        copie = copie.convert('RGBA' if 'A' in copie.getbands() else 'RGB')
+    tampon = io.BytesIO()
+    copie.save(tampon, format=format, quality=QUALITE[format], optimize=format == 'JPEG')
+    return tampon.getvalue(), copie.size
+
+
+def generer_variantes(nom_source):
+    """
+    Construit toutes les variantes d'une image stockée. Les fichiers sont
+    nommés d'après le contenu (derives/<empreinte>_<variante>.<ext>) : une
+    même image n'est calculée qu'une fois et ses URL peuvent être mises en
+    cache sans limite. Renvoie {'source': nom, <variante>: {'chemin', 'largeur', 'hauteur'}}.
+    """
+    with default_storage.open(nom_source, 'rb') as fichier:
+        contenu = fichier.read()
+    empreinte = hashlib.sha1(contenu).hexdigest()
+
+    variantes = {'source': nom_source}
+    image = ImageOps.exif_transpose(Image.open(io.BytesIO(contenu)))
+    for nom, (largeur, format, extension) in VARIANTES.items():
+        chemin = f'derives/{empreinte[:2]}/{empreinte}_{nom}.{extension}'
+        donnees, (l, h) = _encoder(image, largeur, format)
+        if not default_storage.exists(chemin):
+            default_storage.save(chemin, ContentFile(donnees))
+        variantes[nom] = {'chemin': chemin, 'largeur': l, 'hauteur': h}
+    return variantes
+
+
+def enregistrer_variantes(modele, pk, champ):
+    """Calcule et enregistre les variantes, sauf si l'image a changé entre-temps."""
+    nom_source = modele.objects.filter(pk=pk).values_list(champ, flat=True).first()
+    if not nom_source:
+        return
+    try:
+        variantes = generer_variantes(nom_source)
+    except (OSError, UnidentifiedImageError, Image.DecompressionBombError):
+        logger.warning("Variantes impossibles pour %s", nom_source, exc_info=True)
+        return
+
+    modifications = {f'{champ}_variantes': variantes}
+    if any(f.name == 'date_modification' for f in modele._meta.concrete_fields):
+        # Les clients synchronisés doivent recharger l'astuce
+        modifications['date_modification'] = timezone.now()
+    if modele.objects.filter(pk=pk, **{champ: nom_source}).update(**modifications):
+        from .cache import invalider_contenu
+        invalider_contenu()
+
+
+# ========== FILE DE TRAITEMENT ==========
+_executeur = None
+
+
+def _pool():
+    global _executeur
+    if _executeur is None:
+        _executeur = ThreadPoolExecutor(
+            max_workers=getattr(settings, 'IMAGES_TRAVAILLEURS', 2),
+            thread_name_prefix='variantes-images',
+        )
+    return _executeur
+
+
+def _tache(modele, pk, champ):
+    try:
+        enregistrer_variantes(modele, pk, champ)
+    except Exception:
+        logger.exception("Échec des variantes de %s #%s", modele.__name__, pk)
+    finally:
+        # Connexion propre au thread du pool
+        connection.close()
+
+
+def planifier_variantes(instance, champ):
+    """
+    Après le commit, met le calcul en file si l'image n'a pas encore de
+    variantes à jour. Hors du chemin de la requête (pool de threads :
+    Pillow libère le GIL pendant le redimensionnement et l'encodage).
+    """
+    fichier = getattr(instance, champ)
+    actuelles = getattr(instance, f'{champ}_variantes') or {}
+    if not fichier or actuelles.get('source') == fichier.name:
+        return
+    modele, pk = type(instance), instance.pk
+    if getattr(settings, 'IMAGES_VARIANTES_SYNCHRONES', False):
+        transaction.on_commit(lambda: enregistrer_variantes(modele, pk, champ))
+    else:
+        transaction.on_commit(lambda: _pool().submit(_tache, modele, pk, champ))
+
+
+def modeles_images():
+    """(modèle, champ) pour chaque image gérée."""
+    return [(apps.get_model(libelle), champ) for libelle, champ in CHAMPS_IMAGES.items()]
+
+
+# ========== SÉRIALISATION ==========
+def urls_variantes(variantes, request=None, prive=False):
+    """
+    Map des URL par variante, plus des chaînes « srcset » (JPEG et WebP)
+    prêtes pour un rendu responsive. None tant que rien n'est calculé.
+    Les variantes d'une image privée sont signées (media.url_media).
+    """
+    from .media import url_media
+
+    if not variantes or 'source' not in variantes:
+        return None
+
+    def url(chemin):
+        return url_media(chemin, request, prive)
+
+    urls = {}
+    srcset = {'srcset': [], 'srcset_webp': []}
+    for nom, (_, format, _) in VARIANTES.items():
+        variante = variantes.get(nom)
+        if not variante:
+            continue
+        urls[nom] = url(variante['chemin'])
+        cle = 'srcset_webp' if format == 'WEBP' else 'srcset'
+        descripteur = f"{variante['largeur']}w"
+        # Petite image source : miniature et moyenne ont la même largeur
+        if not any(entree.endswith(' ' + descripteur) for entree in srcset[cle]):
+            srcset[cle].append(f"{urls[nom]} {descripteur}")
+    urls.update({cle: ', '.join(valeurs) for cle, valeurs in srcset.items() if valeurs})
+    return urls
@@ -0,0 +1,125 @@
+import atexit
+import logging
+import os
+import queue
+import threading
+
+from django.conf import settings
+from django.db import DatabaseError, connection
+from django.utils import timezone
+from prometheus_client import Counter, Gauge
+
+logger = logging.getLogger(__name__)
+
+# Exportés par /metrics (core.metriques)
+RECHERCHES_ECRITES = Counter('astuce_recherches_ecrites', "Recherches insérées dans le journal")
+RECHERCHES_PERDUES = Counter(
+    'astuce_recherches_perdues', "Recherches abandonnées : file pleine ou lot refusé par la base", ['cause'],
+)
+RECHERCHES_EN_ATTENTE = Gauge(
+    'astuce_recherches_en_attente', "Recherches en file, pas encore insérées", multiprocess_mode='livesum',
+)
+
+
+class JournalRecherches:
+    """
+    Écriture différée des recherches : les requêtes n'attendent plus l'INSERT,
+    les événements sont mis en file et insérés par lots (bulk_create) par un
+    thread de fond, dès que `taille_lot` est atteint ou toutes les
+    `intervalle` secondes. La file est bornée : au-delà de `capacite`, les
+    événements sont abandonnés et comptés dans astuce_recherches_perdues_total.
+    """
+
+    def __init__(self, capacite=10000, taille_lot=200, intervalle=2.0, differe=True):
+        self.capacite = capacite
+        self.taille_lot = taille_lot
+        self.intervalle = intervalle
+        self.differe = differe
+        self._file = queue.Queue(maxsize=capacite)
+        self._reveil = threading.Event()
+        self._verrou = threading.Lock()
+        self._verrou_vidage = threading.Lock()
+        self._thread = None
+        self._pid = None
+
+    def enregistrer(self, utilisateur_id, mots_cles):
+        from .models import Recherche
+
+        recherche = Recherche(
+            utilisateur_id=utilisateur_id,
+            mots_cles=mots_cles[:Recherche._meta.get_field('mots_cles').max_length],
+            date=timezone.now(),
+        )
+        if not self.differe:
+            recherche.save()
+            RECHERCHES_ECRITES.inc()
+            return
+
+        try:
+            self._file.put_nowait(recherche)
+        except queue.Full:
+            RECHERCHES_PERDUES.labels('file_pleine').inc()
+            return
+        RECHERCHES_EN_ATTENTE.set(self._file.qsize())
+
+        self._demarrer()
+        if self._file.qsize() >= self.taille_lot:
+            self._reveil.set()
+
+    def vider(self):
+        """Insère tout ce qui est en file ; appelé par le thread et à l'arrêt."""
+        from .models import Recherche
+
+        with self._verrou_vidage:
+            while True:
+                lot = []
+                while len(lot) < self.taille_lot:
+                    try:
+                        lot.append(self._file.get_nowait())
+                    except queue.Empty:
+                        break
+                RECHERCHES_EN_ATTENTE.set(self._file.qsize())
+                if not lot:
+                    return
+                try:
+                    Recherche.objects.bulk_create(lot)
+                    RECHERCHES_ECRITES.inc(len(lot))
+                except DatabaseError:
+                    # Journal non critique : le lot est abandonné, mais compté et signalé
+                    RECHERCHES_PERDUES.labels('base').inc(len(lot))
+                    logger.warning("Lot de %s recherches abandonné", len(lot), exc_info=True)
+
+    def en_attente(self):
+        return self._file.qsize()
+
+    def _demarrer(self):
+        # Le thread ne survit pas à un fork (workers gunicorn) : on le relance
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._verrou:
+            if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._boucle, name='journal-recherches', daemon=True)
+            self._thread.start()
+
+    def _boucle(self):
+        while True:
+            self._reveil.wait(self.intervalle)
+            self._reveil.clear()
+            try:
+                self.vider()
+            finally:
+                # Connexion propre au thread : ne pas la garder ouverte entre deux lots
+                connection.close()
+
+
+journal_recherches = JournalRecherches(
+    capacite=getattr(settings, 'RECHERCHES_CAPACITE_FILE', 10000),
+    taille_lot=getattr(settings, 'RECHERCHES_TAILLE_LOT', 200),
+    intervalle=getattr(settings, 'RECHERCHES_INTERVALLE_VIDAGE', 2.0),
+    differe=getattr(settings, 'RECHERCHES_ECRITURE_DIFFEREE', True),
+)
+
+# Arrêt propre du processus : rien ne reste en mémoire
+atexit.register(journal_recherches.vider)
@@ -0,0 +1,18 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from apps.astuces.tendances import agreger
+
+
+class Command(BaseCommand):
+    help = "Ajoute les nouvelles recherches à l'agrégat quotidien (incrémental, à lancer par cron)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--taille-lot', type=int, default=10000)
+        parser.add_argument('--delai', type=int, default=60,
+                            help="Secondes laissées au journal différé avant d'agréger une recherche")
+
+    def handle(self, *args, **options):
+        traitees = agreger(options['taille_lot'], timedelta(seconds=options['delai']))
+        self.stdout.write(self.style.SUCCESS(f"{traitees} recherche(s) agrégée(s)"))
@@ -0,0 +1,24 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.astuces.recommandations import calculer
+
+
+class Command(BaseCommand):
+    help = "Recalcule les voisins des astuces et les recommandations de chaque utilisateur (scipy, hors ligne)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--voisins', type=int, default=50, help="Voisins gardés par astuce")
+        parser.add_argument('--recommandations', type=int, default=50, help="Recommandations gardées par utilisateur")
+        parser.add_argument('--taille-lot', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        debut = time.monotonic()
+        astuces, utilisateurs = calculer(
+            options['voisins'], options['recommandations'], options['taille_lot'], stdout=self.stdout,
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"{astuces} astuces avec voisins, {utilisateurs} utilisateurs avec recommandations "
+            f"en {time.monotonic() - debut:.1f}s"
+        ))
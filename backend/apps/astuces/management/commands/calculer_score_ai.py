@@ -0,0 +1,19 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.astuces.score_ai import scorer
+
+
+class Command(BaseCommand):
+    help = "Calcule score_ai des propositions en attente et des astuces pas encore notées par la version courante du modèle"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--travailleurs', type=int, help="Processus de calcul (défaut : SCORE_AI_TRAVAILLEURS ou un par cœur)")
+        parser.add_argument('--taille-lot', type=int, default=500)
+        parser.add_argument('--tout', action='store_true', help="Recalcule aussi les lignes déjà à la version courante")
+
+    def handle(self, *args, **options):
+        debut = time.monotonic()
+        resultat = scorer(options['travailleurs'], options['taille_lot'], options['tout'], stdout=self.stdout)
+        self.stdout.write(self.style.SUCCESS(f"{sum(resultat.values())} score(s) en {time.monotonic() - debut:.1f}s"))
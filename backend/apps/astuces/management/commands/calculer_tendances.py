@@ -0,0 +1,22 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from apps.astuces.tendances import mettre_a_jour_tendances, reconstruire_tendances
+
+
+class Command(BaseCommand):
+    help = "Ajoute les nouvelles évaluations et nouveaux favoris au score tendance des astuces (incrémental)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--taille-lot', type=int, default=5000)
+        parser.add_argument('--delai', type=int, default=60,
+                            help="Secondes laissées aux transactions en cours avant de compter un événement")
+        parser.add_argument('--reconstruire', action='store_true',
+                            help="Remet les scores à zéro et recompte les événements récents (changement de demi-vie)")
+
+    def handle(self, *args, **options):
+        if options['reconstruire']:
+            reconstruire_tendances()
+        traites = mettre_a_jour_tendances(options['taille_lot'], timedelta(seconds=options['delai']))
+        self.stdout.write(self.style.SUCCESS(f"{traites} événement(s) pris en compte"))
@@ -0,0 +1,432 @@
+import io
+import random
+import time
+from datetime import datetime, timedelta
+from itertools import accumulate, islice
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from apps.astuces.cache import invalider_contenu
+from apps.astuces.models import Astuce, Categorie, Evaluation, Favori, Proposition, Recherche, Terme
+from apps.astuces.search import vecteur_astuce
+
+User = get_user_model()
+
+# ========== VOCABULAIRE ==========
+CATEGORIES = [
+    'Productivité', 'Cuisine', 'Jardinage', 'Bricolage',
+    'Informatique', 'Santé', 'Économie', 'Éducation', 'Voyage',
+    'Développement Personnel', 'Maison', 'Automobile',
+]
+SUJETS = [
+    'le café', 'son vélo', 'le jardin', 'son budget', 'son ordinateur', 'son smartphone',
+    'la cuisine', 'le sommeil', 'ses révisions', 'les tomates', 'la peinture', 'sa voiture',
+    'la lessive', 'ses voyages', 'les courses', 'ses emails', 'ses mots de passe', 'la batterie',
+    'les plantes', 'les pâtes', 'le frigo', 'la salle de bain', 'ses dossiers', 'le chauffage',
+    'ses factures', 'le pain', 'les fenêtres', 'son CV', 'la pelouse', 'les vêtements',
+]
+ACTIONS = [
+    'économiser sur', 'nettoyer', 'organiser', 'réparer', 'conserver', 'optimiser',
+    'préparer', 'entretenir', 'ranger', 'accélérer', 'protéger', 'réussir',
+]
+COMPLEMENTS = [
+    'en 5 minutes', 'sans produit chimique', 'avec peu de moyens', 'au quotidien',
+    "avant l'hiver", 'quand on débute', 'comme un pro', 'en télétravail', 'à petit prix', 'en famille',
+]
+PHRASES = [
+    "Pensez à {action} {sujet} régulièrement, cela évite bien des soucis.",
+    "Cette méthode permet de {action} {sujet} {complement}.",
+    "Commencez par faire le point sur {sujet} avant de vous lancer.",
+    "Beaucoup de gens oublient que {sujet} se prête très bien à cette astuce.",
+    "Le résultat est visible dès la première semaine.",
+    "Notez vos progrès pour ajuster la méthode à vos besoins.",
+    "Astuce testée et approuvée par de nombreux membres de la communauté.",
+]
+# Mot présent dans environ 0,2 % des astuces : recherche sélective par défaut de verifier_plans
+MOT_RARE = 'kombucha'
+PROPORTION_MOT_RARE = 0.002
+MOTS_TERMES = [
+    'méthode', 'technique', 'principe', 'règle', 'outil', 'format', 'protocole', 'cycle',
+    'routine', 'modèle', 'matrice', 'échelle', 'indice', 'norme', 'mode',
+]
+QUALIFICATIFS = [
+    'Pomodoro', 'Eisenhower', 'Kaizen', 'Pareto', 'Feynman', 'Zettelkasten', 'Getting Things Done',
+    'Leitner', 'Kanban', 'SMART', 'Ikigai', 'zéro déchet', 'batch cooking', 'low-tech', 'minimaliste',
+]
+ROLES = [
+    (User.ROLE_INSCRIT, 90), (User.ROLE_EXPERT, 6), (User.ROLE_INVITE, 3), (User.ROLE_MODERATOR, 1),
+]
+NIVEAUX = [('debutant', 60), ('intermediaire', 30), ('expert', 10)]
+# Distribution en J typique des notes en ligne
+NOTES = [(1, 8), (2, 5), (3, 12), (4, 30), (5, 45)]
+STATUTS = [('acceptee', 60), ('rejetee', 20), ('en_attente', 15), ('en_revision', 5)]
+
+
+# ========== OUTILS ==========
+def poids_zipf(n, exposant, alea):
+    """Poids ∝ 1/rang^exposant, rangs mélangés pour disperser les « têtes » dans les ids."""
+    rangs = list(range(1, n + 1))
+    alea.shuffle(rangs)
+    return [rang ** -exposant for rang in rangs]
+
+
+def tirer(alea, choix):
+    """Tirage pondéré dans une liste de (valeur, poids)."""
+    valeurs, poids = zip(*choix)
+    return alea.choices(valeurs, weights=poids)[0]
+
+
+def repartir(total, poids, plafond, alea):
+    """Répartit total entre les éléments selon leurs poids (arrondi aléatoire), sans dépasser plafond."""
+    somme = sum(poids)
+    return [min(plafond, int(total * p / somme + alea.random())) for p in poids]
+
+
+def recent(alea, depuis=0.0):
+    """Fraction de la période dans [depuis, 1], plus dense vers aujourd'hui (croissance de l'usage)."""
+    return depuis + (1.0 - depuis) * alea.random() ** 0.5
+
+
+def _valeur_copy(valeur):
+    if valeur is None:
+        return r'\N'
+    if valeur is True:
+        return 't'
+    if valeur is False:
+        return 'f'
+    if isinstance(valeur, datetime):
+        return valeur.isoformat()
+    return (
+        str(valeur).replace('\\', '\\\\').replace('\t', '\\t')
+        .replace('\n', '\\n').replace('\r', '\\r')
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        "Génère un jeu de données synthétique volumineux et reproductible (utilisateurs, astuces, "
+        "évaluations, favoris, propositions, recherches) chargé par COPY en lots"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--utilisateurs', type=int, default=10000)
+        parser.add_argument('--astuces', type=int, default=50000)
+        parser.add_argument('--evaluations', type=int, default=500000)
+        parser.add_argument('--favoris', type=int, default=200000)
+        parser.add_argument('--propositions', type=int, default=20000)
+        parser.add_argument('--recherches', type=int, default=300000)
+        parser.add_argument('--jours', type=int, default=730, help="Période couverte par les dates générées")
+        parser.add_argument('--graine', type=int, default=42)
+        parser.add_argument('--taille-lot', type=int, default=50000, help="Lignes par COPY (une transaction par lot)")
+        parser.add_argument('--mot-de-passe', default='astuce123', help="Mot de passe commun des comptes générés")
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError("Génération disponible uniquement sur PostgreSQL (COPY)")
+        if options['utilisateurs'] < 1 or options['astuces'] < 1:
+            raise CommandError("Il faut au moins un utilisateur et une astuce")
+
+        self.alea = random.Random(options['graine'])
+        self.taille_lot = options['taille_lot']
+        self.maintenant = timezone.now()
+        self.debut = self.maintenant - timedelta(days=options['jours'])
+        self.duree = self.maintenant - self.debut
+
+        categories, termes = self.referentiels()
+        utilisateurs = self.generer_utilisateurs(options['utilisateurs'], options['mot_de_passe'])
+        astuces = self.generer_astuces(options['astuces'], utilisateurs, categories, termes)
+        self.generer_evaluations(options['evaluations'], utilisateurs, astuces)
+        self.generer_favoris(options['favoris'], utilisateurs, astuces)
+        self.generer_propositions(options['propositions'], utilisateurs)
+        self.generer_recherches(options['recherches'], utilisateurs)
+        self.finaliser(astuces['premier'])
+        self.stdout.write(self.style.SUCCESS("Jeu de données généré"))
+
+    # ========== CHARGEMENT ==========
+    def date(self, fraction):
+        return self.debut + self.duree * fraction
+
+    def copier(self, modele, lignes, avec_id=False):
+        """
+        Charge des dicts {attname: valeur} par COPY, un lot par transaction.
+        Les champs absents prennent la valeur par défaut du modèle.
+        """
+        champs = [
+            champ for champ in modele._meta.concrete_fields
+            if avec_id or not champ.primary_key
+        ]
+        defauts = {champ.attname: champ.get_default() for champ in champs}
+        colonnes = ', '.join(connection.ops.quote_name(champ.column) for champ in champs)
+        sql = f'COPY {connection.ops.quote_name(modele._meta.db_table)} ({colonnes}) FROM STDIN'
+
+        debut, total = time.monotonic(), 0
+        lignes = iter(lignes)
+        while True:
+            lot = list(islice(lignes, self.taille_lot))
+            if not lot:
+                break
+            tampon = ''.join(
+                '\t'.join(_valeur_copy(ligne.get(attname, defaut)) for attname, defaut in defauts.items()) + '\n'
+                for ligne in lot
+            )
+            with transaction.atomic(), connection.cursor() as cursor:
+                brut = cursor.cursor
+                if hasattr(brut, 'copy_expert'):  # psycopg2
+                    brut.copy_expert(sql, io.StringIO(tampon))
+                else:  # psycopg 3
+                    with brut.copy(sql) as copie:
+                        copie.write(tampon)
+            total += len(lot)
+
+        ecoule = time.monotonic() - debut
+        self.stdout.write(f"  {modele.__name__}: {total} lignes en {ecoule:.1f}s ({total / max(ecoule, 1e-6):.0f}/s)")
+        return total
+
+    def prochain_id(self, modele):
+        return (modele.objects.aggregate(m=Max('pk'))['m'] or 0) + 1
+
+    def reinitialiser_sequences(self, *modeles):
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(no_style(), modeles):
+                cursor.execute(sql)
+
+    # ========== GÉNÉRATION ==========
+    def referentiels(self):
+        for nom in CATEGORIES:
+            Categorie.objects.get_or_create(nom=nom)
+        noms = [f'{mot.capitalize()} {qualificatif}' for qualificatif in QUALIFICATIFS for mot in MOTS_TERMES]
+        Terme.objects.bulk_create(
+            [Terme(terme=nom, definition=f"Définition de « {nom} » générée pour les tests de charge.") for nom in noms],
+            ignore_conflicts=True,
+        )
+        categories = list(Categorie.objects.order_by('pk').values_list('pk', flat=True))
+        termes = list(Terme.objects.filter(terme__in=noms).order_by('pk').values_list('pk', 'terme'))
+        return categories, termes
+
+    def generer_utilisateurs(self, nombre, mot_de_passe):
+        alea = self.alea
+        premier = self.prochain_id(User)
+        mot_de_passe = make_password(mot_de_passe)  # un seul hachage pour tous les comptes
+        inscriptions = [recent(alea) for _ in range(nombre)]
+        self.stdout.write(f"Utilisateurs ({nombre})")
+
+        def lignes():
+            for i, fraction in enumerate(inscriptions):
+                pk = premier + i
+                date = self.date(fraction)
+                yield {
+                    'id': pk,
+                    'password': mot_de_passe,
+                    'username': f'synth_{pk}',
+                    'email': f'synth_{pk}@exemple.test',
+                    'nom': f'Utilisateur {pk}',
+                    'role': tirer(alea, ROLES),
+                    'date_joined': date,
+                    'date_creation': date,
+                }
+
+        self.copier(User, lignes(), avec_id=True)
+        self.reinitialiser_sequences(User)
+        # Activité très inégale : quelques contributeurs très actifs, une longue traîne
+        activite = poids_zipf(nombre, 1.1, alea)
+        return {'premier': premier, 'inscriptions': inscriptions, 'activite': activite}
+
+    def generer_astuces(self, nombre, utilisateurs, categories, termes):
+        alea = self.alea
+        premier = self.prochain_id(Astuce)
+        cumul_auteurs = list(accumulate(utilisateurs['activite']))
+        auteurs = alea.choices(range(len(cumul_auteurs)), cum_weights=cumul_auteurs, k=nombre)
+        cumul_sujets = list(accumulate(poids_zipf(len(SUJETS), 1.0, alea)))
+        cumul_categories = list(accumulate(poids_zipf(len(categories), 0.8, alea)))
+        publications = []
+        self.stdout.write(f"Astuces ({nombre})")
+
+        def lignes(liens_categories, liens_termes):
+            for i, auteur in enumerate(auteurs):
+                pk = premier + i
+                fraction = recent(alea, utilisateurs['inscriptions'][auteur])
+                publications.append(fraction)
+                date = self.date(fraction)
+                valide = alea.random() < 0.85
+                sujet = alea.choices(SUJETS, cum_weights=cumul_sujets)[0]
+                action, complement = alea.choice(ACTIONS), alea.choice(COMPLEMENTS)
+                lies = alea.sample(termes, alea.choice((0, 0, 1, 1, 2, 3)))
+                phrases = [
+                    alea.choice(PHRASES).format(action=action, sujet=sujet, complement=complement)
+                    for _ in range(alea.randint(2, 5))
+                ]
+                phrases += [f"Appliquez {nom} pour aller plus loin." for _, nom in lies]
+                if alea.random() < PROPORTION_MOT_RARE:
+                    phrases.append(f"Variante testée avec du {MOT_RARE} maison.")
+
+                for categorie in set(alea.choices(categories, cum_weights=cumul_categories, k=alea.randint(1, 3))):
+                    liens_categories.append({'astuce_id': pk, 'categorie_id': categorie})
+                liens_termes.extend({'astuce_id': pk, 'terme_id': terme} for terme, _ in lies)
+
+                yield {
+                    'id': pk,
+                    'titre': f"{action.capitalize()} {sujet} {complement}",
+                    'description': ' '.join(phrases),
+                    'source': f'https://exemple.test/astuces/{pk}' if alea.random() < 0.3 else None,
+                    'date_publication': date,
+                    'date_modification': date,
+                    'niveau_difficulte': tirer(alea, NIVEAUX),
+                    'valide': valide,
+                    'date_validation': date + timedelta(hours=alea.randint(1, 72)) if valide else None,
+                    'score_ai': round(alea.uniform(20, 100), 1) if alea.random() < 0.7 else None,
+                    'createur_id': utilisateurs['premier'] + auteur,
+                }
+
+        liens_categories, liens_termes = [], []
+        # Les liens sont produits au fil de l'eau : on les charge après chaque tranche d'astuces
+        tranche = lignes(liens_categories, liens_termes)
+        while True:
+            lot = list(islice(tranche, self.taille_lot))
+            if not lot:
+                break
+            self.copier(Astuce, lot, avec_id=True)
+            self.copier(Astuce.categories.through, liens_categories)
+            self.copier(Astuce.termes.through, liens_termes)
+            liens_categories.clear()
+            liens_termes.clear()
+
+        self.reinitialiser_sequences(Astuce)
+        # Popularité : loi de puissance marquée, les astuces les plus vues concentrent les votes
+        popularite = poids_zipf(nombre, 1.0, alea)
+        return {'premier': premier, 'publications': publications, 'popularite': popularite}
+
+    def paires(self, total, utilisateurs, astuces):
+        """(index utilisateur, index astuce) distincts, répartis selon activité et popularité."""
+        alea = self.alea
+        nombre_astuces = len(astuces['publications'])
+        cumul = list(accumulate(astuces['popularite']))
+        comptes = repartir(total, utilisateurs['activite'], max(1, nombre_astuces // 4), alea)
+        for utilisateur, compte in enumerate(comptes):
+            choisies = set()
+            for _ in range(10):
+                if len(choisies) >= compte:
+                    break
+                choisies.update(alea.choices(range(nombre_astuces), cum_weights=cumul, k=compte - len(choisies)))
+            for astuce in sorted(choisies):
+                yield utilisateur, astuce
+
+    def apres(self, utilisateurs, astuces, utilisateur, astuce):
+        depuis = max(utilisateurs['inscriptions'][utilisateur], astuces['publications'][astuce])
+        return self.date(recent(self.alea, depuis))
+
+    def generer_evaluations(self, nombre, utilisateurs, astuces):
+        alea = self.alea
+        self.stdout.write(f"Évaluations (~{nombre})")
+
+        def lignes():
+            for utilisateur, astuce in self.paires(nombre, utilisateurs, astuces):
+                note = tirer(alea, NOTES)
+                yield {
+                    'note': note,
+                    'fiabilite_percue': round(min(100.0, max(0.0, alea.gauss(note * 20, 10))), 1),
+                    'commentaire': alea.choice(PHRASES[4:]) if alea.random() < 0.2 else None,
+                    'date': self.apres(utilisateurs, astuces, utilisateur, astuce),
+                    'utilisateur_id': utilisateurs['premier'] + utilisateur,
+                    'astuce_id': astuces['premier'] + astuce,
+                }
+
+        self.copier(Evaluation, lignes())
+
+    def generer_favoris(self, nombre, utilisateurs, astuces):
+        self.stdout.write(f"Favoris (~{nombre})")
+        lignes = (
+            {
+                'date': self.apres(utilisateurs, astuces, utilisateur, astuce),
+                'utilisateur_id': utilisateurs['premier'] + utilisateur,
+                'astuce_id': astuces['premier'] + astuce,
+            }
+            for utilisateur, astuce in self.paires(nombre, utilisateurs, astuces)
+        )
+        self.copier(Favori, lignes)
+
+    def generer_propositions(self, nombre, utilisateurs):
+        alea = self.alea
+        cumul = list(accumulate(utilisateurs['activite']))
+        self.stdout.write(f"Propositions ({nombre})")
+
+        def lignes():
+            for utilisateur in alea.choices(range(len(cumul)), cum_weights=cumul, k=nombre):
+                date = self.date(recent(alea, utilisateurs['inscriptions'][utilisateur]))
+                sujet, action = alea.choice(SUJETS), alea.choice(ACTIONS)
+                statut = tirer(alea, STATUTS)
+                yield {
+                    'titre': f"{action.capitalize()} {sujet}",
+                    'description': alea.choice(PHRASES).format(action=action, sujet=sujet, complement=alea.choice(COMPLEMENTS)),
+                    'niveau_difficulte': tirer(alea, NIVEAUX),
+                    'date': date,
+                    'date_modification': date,
+                    'statut': statut,
+                    'commentaire_moderation': "Contenu trop proche d'une astuce existante." if statut == 'rejetee' else None,
+                    'utilisateur_id': utilisateurs['premier'] + utilisateur,
+                }
+
+        self.copier(Proposition, lignes())
+
+    def generer_recherches(self, nombre, utilisateurs):
+        alea = self.alea
+        cumul_utilisateurs = list(accumulate(utilisateurs['activite']))
+        mots = sorted({mot for sujet in SUJETS for mot in sujet.split(' ', 1)[1].split() if len(mot) > 2})
+        mots += [qualificatif.lower() for qualificatif in QUALIFICATIFS]
+        cumul_mots = list(accumulate(poids_zipf(len(mots), 1.2, alea)))
+        self.stdout.write(f"Recherches ({nombre})")
+
+        def lignes():
+            for utilisateur in alea.choices(range(len(cumul_utilisateurs)), cum_weights=cumul_utilisateurs, k=nombre):
+                yield {
+                    'mots_cles': ' '.join(alea.choices(mots, cum_weights=cumul_mots, k=alea.choice((1, 1, 1, 2, 2, 3)))),
+                    'date': self.date(recent(alea, utilisateurs['inscriptions'][utilisateur])),
+                    'utilisateur_id': utilisateurs['premier'] + utilisateur,
+                }
+
+        self.copier(Recherche, lignes())
+
+    # ========== FINALISATION ==========
+    def finaliser(self, premier_astuce):
+        """COPY contourne les signaux : agrégats, vecteurs et statistiques sont calculés ici."""
+        self.stdout.write("Agrégats des notes, vecteurs de recherche, statistiques...")
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                """
+                UPDATE astuces_astuce a SET
+                    nombre_votes = s.nombre,
+                    somme_notes = s.somme,
+                    notes_1 = s.n1, notes_2 = s.n2, notes_3 = s.n3, notes_4 = s.n4, notes_5 = s.n5,
+                    score_fiabilite = s.somme * 20.0 / s.nombre
+                FROM (
+                    SELECT astuce_id,
+                           count(*) AS nombre,
+                           sum(note) AS somme,
+                           count(*) FILTER (WHERE note = 1) AS n1,
+                           count(*) FILTER (WHERE note = 2) AS n2,
+                           count(*) FILTER (WHERE note = 3) AS n3,
+                           count(*) FILTER (WHERE note = 4) AS n4,
+                           count(*) FILTER (WHERE note = 5) AS n5
+                    FROM astuces_evaluation
+                    WHERE astuce_id >= %s
+                    GROUP BY astuce_id
+                ) s
+                WHERE s.astuce_id = a.id
+                """,
+                [premier_astuce],
+            )
+
+        dernier = Astuce.objects.aggregate(m=Max('pk'))['m'] or 0
+        for borne in range(premier_astuce, dernier + 1, self.taille_lot):
+            with transaction.atomic():
+                Astuce.objects.filter(pk__gte=borne, pk__lt=borne + self.taille_lot).update(search_vector=vecteur_astuce())
+
+        with connection.cursor() as cursor:
+            for modele in (User, Astuce, Evaluation, Favori, Proposition, Recherche):
+                cursor.execute(f'ANALYZE {connection.ops.quote_name(modele._meta.db_table)}')
+        invalider_contenu()
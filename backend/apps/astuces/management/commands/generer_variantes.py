@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from apps.astuces.images import enregistrer_variantes, modeles_images
+
+
+class Command(BaseCommand):
+    help = "Calcule les miniatures et variantes WebP des images déjà envoyées"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tout', action='store_true', help="Recalcule aussi les images qui ont déjà des variantes")
+
+    def handle(self, *args, **options):
+        for modele, champ in modeles_images():
+            queryset = modele.objects.exclude(Q(**{f'{champ}__isnull': True}) | Q(**{champ: ''}))
+            if not options['tout']:
+                queryset = queryset.filter(**{f'{champ}_variantes': {}})
+            traitees = 0
+            for pk in queryset.order_by('pk').values_list('pk', flat=True).iterator():
+                enregistrer_variantes(modele, pk, champ)
+                traitees += 1
+            self.stdout.write(f"{modele.__name__}.{champ} : {traitees} image(s)")
+        self.stdout.write(self.style.SUCCESS("Variantes à jour"))
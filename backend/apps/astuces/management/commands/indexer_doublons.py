@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from apps.astuces.doublons import reconstruire
+
+
+class Command(BaseCommand):
+    help = "Reconstruit l'index MinHash/LSH des astuces validées et propositions en attente (détection des doublons)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--taille-lot', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        nombre = reconstruire(options['taille_lot'])
+        self.stdout.write(self.style.SUCCESS(f"{nombre} signature(s) indexée(s)"))
@@ -0,0 +1,21 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.astuces.similaires import indexer_nouvelles, indexer_tout
+
+
+class Command(BaseCommand):
+    help = "Calcule les astuces similaires (TF-IDF) des astuces nouvellement validées ou modifiées"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--voisins', type=int, default=20, help="Voisins gardés par astuce")
+        parser.add_argument('--complet', action='store_true', help="Réapprend le vocabulaire et recalcule tout")
+
+    def handle(self, *args, **options):
+        debut = time.monotonic()
+        if options['complet']:
+            nombre = indexer_tout(options['voisins'])
+        else:
+            nombre = indexer_nouvelles(options['voisins'])
+        self.stdout.write(self.style.SUCCESS(f"{nombre} astuce(s) indexée(s) en {time.monotonic() - debut:.1f}s"))
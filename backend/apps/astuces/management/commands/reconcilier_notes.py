@@ -0,0 +1,72 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+from apps.astuces.cache import invalider_contenu
+from apps.astuces.models import Astuce, Evaluation
+
+CHAMPS = ['nombre_votes', 'somme_notes', 'notes_1', 'notes_2', 'notes_3', 'notes_4', 'notes_5', 'score_fiabilite']
+
+
+class Command(BaseCommand):
+    help = "Recalcule les agrégats de notes des astuces à partir des évaluations, par lots"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--taille-lot', type=int, default=1000)
+        parser.add_argument('--dry-run', action='store_true', help="Affiche les écarts sans corriger")
+
+    def handle(self, *args, **options):
+        taille_lot = options['taille_lot']
+        dry_run = options['dry_run']
+        dernier_id = 0
+        verifiees = corrigees = 0
+
+        while True:
+            ids = list(
+                Astuce.objects.filter(pk__gt=dernier_id)
+                .order_by('pk')
+                .values_list('pk', flat=True)[:taille_lot]
+            )
+            if not ids:
+                break
+            dernier_id = ids[-1]
+            verifiees += len(ids)
+
+            with transaction.atomic():
+                # Verrouille le lot pour ne pas écraser un vote concurrent
+                astuces = list(Astuce.objects.select_for_update().filter(pk__in=ids).only(*CHAMPS))
+                reels = {
+                    ligne['astuce']: ligne
+                    for ligne in Evaluation.objects.filter(astuce__in=ids)
+                    .values('astuce')
+                    .annotate(
+                        nombre_votes=Count('id'),
+                        somme_notes=Sum('note'),
+                        **{f'notes_{n}': Count('id', filter=Q(note=n)) for n in range(1, 6)},
+                    )
+                }
+
+                a_corriger = []
+                for astuce in astuces:
+                    reel = reels.get(astuce.pk, {})
+                    attendu = {champ: reel.get(champ, 0) for champ in CHAMPS[:-1]}
+                    nombre = attendu['nombre_votes']
+                    attendu['score_fiabilite'] = attendu['somme_notes'] * 20.0 / nombre if nombre else 0.0
+                    if any(getattr(astuce, champ) != valeur for champ, valeur in attendu.items()):
+                        for champ, valeur in attendu.items():
+                            setattr(astuce, champ, valeur)
+                        a_corriger.append(astuce)
+
+                corrigees += len(a_corriger)
+                if a_corriger and not dry_run:
+                    # bulk_update ne passe pas par auto_now : la synchro et les ETag doivent voir la correction
+                    maintenant = timezone.now()
+                    for astuce in a_corriger:
+                        astuce.date_modification = maintenant
+                    Astuce.objects.bulk_update(a_corriger, CHAMPS + ['date_modification'])
+
+        if corrigees and not dry_run:
+            invalider_contenu()
+        verbe = "à corriger" if dry_run else "corrigées"
+        self.stdout.write(self.style.SUCCESS(f"{verifiees} astuces vérifiées, {corrigees} {verbe}"))
@@ -0,0 +1,111 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Q
+
+from apps.astuces.management.commands.generer_donnees import MOT_RARE
+from apps.astuces.models import Astuce, Evaluation, Proposition, Recherche
+from apps.astuces.search import rechercher_astuces
+
+# Tables dont un parcours séquentiel sur une requête critique est une régression
+TABLES_SURVEILLEES = {
+    Astuce._meta.db_table,
+    Evaluation._meta.db_table,
+    Proposition._meta.db_table,
+    Recherche._meta.db_table,
+}
+
+
+def requetes_critiques(mots_cles):
+    """(nom, queryset) des lectures les plus fréquentes de l'API."""
+    astuce = Astuce.objects.filter(valide=True).order_by('-date_publication').values('date_publication', 'id')[1000:1001].first()
+    utilisateur_id = Recherche.objects.values_list('utilisateur_id', flat=True).order_by('-id').first()
+    evaluateur_id = Evaluation.objects.values_list('utilisateur_id', flat=True).order_by('-id').first()
+    createur_id = Astuce.objects.exclude(createur=None).values_list('createur_id', flat=True).order_by('-id').first()
+    modification = Astuce.objects.order_by('-transaction_modification').values_list('transaction_modification', flat=True)[1000:1001].first()
+
+    publiques = Astuce.objects.filter(valide=True)
+    requetes = [
+        ('astuces récentes', publiques.order_by('-date_publication', '-id')[:21]),
+        ('astuces par fiabilité', publiques.order_by('-score_fiabilite', '-id')[:21]),
+        ('astuces par votes', publiques.order_by('-nombre_votes', '-id')[:21]),
+        ('astuces tendance', publiques.filter(score_tendance__gt=0).order_by('-score_tendance', '-id')[:21]),
+        ('recherche plein texte', rechercher_astuces(publiques, mots_cles).order_by('-pertinence', '-id')[:21]),
+        ('propositions en attente', Proposition.objects.filter(statut='en_attente').order_by('date', 'id')[:50]),
+    ]
+    if astuce:
+        page_profonde = publiques.filter(
+            Q(date_publication__lt=astuce['date_publication'])
+            | Q(date_publication=astuce['date_publication'], id__lt=astuce['id'])
+        ).order_by('-date_publication', '-id')[:21]
+        requetes.append(('page profonde (clé)', page_profonde))
+    if modification is not None:
+        requetes.append(('synchronisation', Astuce.objects.filter(transaction_modification__gt=modification).order_by('transaction_modification', 'id')[:201]))
+    if utilisateur_id:
+        requetes.append(('recherches d\'un utilisateur', Recherche.objects.filter(utilisateur_id=utilisateur_id).order_by('-date')[:50]))
+    if evaluateur_id:
+        requetes.append(('évaluations d\'un profil', Evaluation.objects.filter(utilisateur_id=evaluateur_id).order_by('-date', '-id')[:21]))
+    if createur_id:
+        requetes.append(('astuces d\'un profil', Astuce.objects.filter(createur_id=createur_id).order_by('-date_publication', '-id')[:21]))
+    return requetes
+
+
+def problemes_du_plan(noeud):
+    """Parcourt le plan JSON d'EXPLAIN ANALYZE et liste les nœuds fautifs."""
+    problemes = []
+    type_noeud = noeud.get('Node Type')
+    if type_noeud == 'Seq Scan' and noeud.get('Relation Name') in TABLES_SURVEILLEES:
+        problemes.append(f"parcours séquentiel de {noeud['Relation Name']}")
+    if type_noeud in ('Sort', 'Incremental Sort') and noeud.get('Sort Space Type') == 'Disk':
+        problemes.append(f"tri externe sur disque ({noeud.get('Sort Space Used')} kB)")
+    for enfant in noeud.get('Plans', []):
+        problemes.extend(problemes_du_plan(enfant))
+    return problemes
+
+
+class Command(BaseCommand):
+    help = (
+        "Exécute EXPLAIN ANALYZE sur les requêtes critiques d'une base peuplée et échoue "
+        "si l'une d'elles parcourt séquentiellement une grande table ou trie sur disque"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--min-astuces', type=int, default=10000,
+                            help="Taille minimale de la table des astuces pour que les plans soient significatifs")
+        parser.add_argument('--mots-cles', default=MOT_RARE,
+                            help="Recherche plein texte testée (choisir un terme sélectif, présent dans peu d'astuces ; "
+                                 "generer_donnees place celui par défaut dans environ 0,2 %% d'entre elles)")
+        parser.add_argument('--analyze', action='store_true', help="Met à jour les statistiques (ANALYZE) avant")
+        parser.add_argument('--verbose-plans', action='store_true', help="Affiche les plans complets")
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError("Vérification des plans disponible uniquement sur PostgreSQL")
+
+        nombre = Astuce.objects.count()
+        if nombre < options['min_astuces']:
+            raise CommandError(
+                f"{nombre} astuces seulement : peupler la base d'abord (au moins {options['min_astuces']})"
+            )
+
+        if options['analyze']:
+            with connection.cursor() as cursor:
+                for table in sorted(TABLES_SURVEILLEES):
+                    cursor.execute(f'ANALYZE {connection.ops.quote_name(table)}')
+
+        echecs = 0
+        for nom, queryset in requetes_critiques(options['mots_cles']):
+            plan = json.loads(queryset.explain(format='json', analyze=True))[0]
+            problemes = problemes_du_plan(plan['Plan'])
+            duree = plan.get('Execution Time', 0.0)
+            if problemes:
+                echecs += 1
+                self.stdout.write(self.style.ERROR(f"✗ {nom} ({duree:.2f} ms) : {', '.join(problemes)}"))
+            else:
+                self.stdout.write(self.style.SUCCESS(f"✓ {nom} ({duree:.2f} ms)"))
+            if options['verbose_plans'] or problemes:
+                self.stdout.write(queryset.explain())
+
+        if echecs:
+            raise CommandError(f"{echecs} requête(s) critique(s) en régression")
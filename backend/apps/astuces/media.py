@@ -0,0 +1,249 @@
+import mimetypes
+import os
+import re
+import time
+from urllib.parse import quote, urlencode
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import signing
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.storage import default_storage
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+
+from .images import VARIANTES
+from .models import Astuce, ImageAstuce, Proposition
+
+# Fichiers nommés d'après leur contenu (apps.astuces.images) : jamais modifiés
+PREFIXES_IMMUABLES = ('derives/',)
+DERIVE = re.compile(r'^derives/[0-9a-f]{2}/[0-9a-f]{40}_(\w+)\.\w+$')
+CACHE_IMMUABLE = 'public, max-age=31536000, immutable'
+CACHE_PUBLIC = 'public, max-age=86400'
+CACHE_PRIVE = 'private, no-cache'
+TAILLE_MORCEAU = 64 * 1024
+PLAGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+SEL_SIGNATURE = 'astuces.media'
+
+
+# ========== URL SIGNÉES ==========
+def signer(chemin, utilisateur_id):
+    """
+    Jeton « signature » d'un fichier privé pour un utilisateur. L'expiration
+    est arrondie à la période MEDIA_URL_SIGNEE_DUREE : l'URL reste la même
+    pendant une période (caches des clients), puis vaut encore une période.
+    """
+    duree = getattr(settings, 'MEDIA_URL_SIGNEE_DUREE', 3600)
+    expire = (int(time.time()) // duree + 2) * duree
+    return signing.dumps({'c': chemin, 'u': utilisateur_id, 'e': expire}, salt=SEL_SIGNATURE, compress=True)
+
+
+def _utilisateur_signe(request, chemin):
+    """Utilisateur d'un jeton « signature » valide pour ce fichier, sinon None."""
+    jeton = request.GET.get('signature')
+    if not jeton:
+        return None
+    try:
+        donnees = signing.loads(jeton, salt=SEL_SIGNATURE)
+    except signing.BadSignature:
+        return None
+    if donnees.get('c') != chemin or donnees.get('e', 0) < time.time():
+        return None
+    return get_user_model().objects.filter(pk=donnees.get('u'), is_active=True).first()
+
+
+def url_media(chemin, request=None, prive=False):
+    """
+    URL d'un fichier de MEDIA_ROOT, absolue si une requête est fournie.
+    Un fichier privé est signé pour l'utilisateur de la requête : les
+    clients (Image.network...) le chargent sans en-tête Authorization.
+    """
+    url = default_storage.url(chemin)
+    if prive and request is not None and request.user.is_authenticated:
+        url = f"{url}?{urlencode({'signature': signer(chemin, request.user.pk)})}"
+    return request.build_absolute_uri(url) if request is not None else url
+
+
+# ========== PERMISSIONS ==========
+def _utilisateur(request, chemin):
+    """Utilisateur de l'URL signée, sinon du jeton JWT s'il y en a un."""
+    user = _utilisateur_signe(request, chemin)
+    if user is not None:
+        return user
+    try:
+        resultat = JWTAuthentication().authenticate(request)
+    except (AuthenticationFailed, InvalidToken):
+        return None
+    return resultat[0] if resultat else None
+
+
+def _est_moderateur(user):
+    return user is not None and (user.is_staff or getattr(user, 'role', '') == 'moderateur')
+
+
+def _utilisations(chemin):
+    """
+    (public, id du propriétaire) de chaque ligne dont l'image est ce fichier,
+    ou l'a produit s'il s'agit d'un dérivé. Les sources publiques les plus
+    courantes viennent d'abord : la lecture s'arrête au premier accès public.
+    """
+    if chemin.startswith(PREFIXES_IMMUABLES):
+        correspondance = DERIVE.match(chemin)
+        if correspondance is None or correspondance.group(1) not in VARIANTES:
+            return
+        # Index GIN jsonb_path_ops sur <champ>_variantes
+        def filtre(champ):
+            return {f'{champ}_variantes__contains': {correspondance.group(1): {'chemin': chemin}}}
+        astuces = propositions = avatars = True
+    else:
+        def filtre(champ):
+            return {champ: chemin}
+        astuces, propositions, avatars = chemin.startswith('astuces/'), chemin.startswith('propositions/'), False
+
+    if astuces:
+        yield from Astuce.objects.filter(**filtre('image')).values_list('valide', 'createur_id')
+        yield from ImageAstuce.objects.filter(**filtre('image')).values_list('astuce__valide', 'astuce__createur_id')
+    if avatars and get_user_model().objects.filter(**filtre('avatar')).exists():
+        yield True, None
+    if propositions:
+        for auteur_id in Proposition.objects.filter(**filtre('image')).values_list('utilisateur_id', flat=True):
+            yield False, auteur_id
+
+
+def acces_media(request, chemin):
+    """
+    (autorisé, public). Les avatars sont publics ; l'image d'une astuce l'est
+    si l'astuce est validée, sinon réservée à son créateur et aux modérateurs ;
+    celle d'une proposition à son auteur et aux modérateurs. Un dérivé
+    (miniature, WebP) a les droits de l'image dont il vient. L'utilisateur
+    vient d'une URL signée (url_media) ou de l'en-tête Authorization ; ses
+    droits sont vérifiés à chaque accès, même avec une signature valide.
+    """
+    if chemin.startswith('avatars/'):
+        return True, True
+
+    proprietaires = set()
+    for public, proprietaire_id in _utilisations(chemin):
+        if public:
+            return True, True
+        proprietaires.add(proprietaire_id)
+    if not proprietaires:
+        return False, False
+    user = _utilisateur(request, chemin)
+    return _est_moderateur(user) or (user is not None and user.pk in proprietaires), False
+
+
+# ========== ENVOI ==========
+def _plage(entete, taille):
+    """
+    (début, fin) inclusifs pour un en-tête Range à une seule plage,
+    None pour envoyer tout le fichier, False si la plage est insatisfaisable.
+    """
+    correspondance = PLAGE.match(entete.strip())
+    if not correspondance:
+        return None  # plages multiples ou unité inconnue : réponse complète
+    debut, fin = correspondance.groups()
+    if not debut and not fin:
+        return None
+    if not debut:
+        # Suffixe : les N derniers octets
+        longueur = int(fin)
+        if longueur == 0:
+            return False
+        return max(0, taille - longueur), taille - 1
+    debut = int(debut)
+    fin = min(int(fin), taille - 1) if fin else taille - 1
+    if debut >= taille or fin < debut:
+        return False
+    return debut, fin
+
+
+def _lire(chemin_complet, debut, longueur):
+    with open(chemin_complet, 'rb') as fichier:
+        fichier.seek(debut)
+        while longueur > 0:
+            morceau = fichier.read(min(TAILLE_MORCEAU, longueur))
+            if not morceau:
+                break
+            longueur -= len(morceau)
+            yield morceau
+
+
+def servir_media(request, chemin):
+    """
+    Sert MEDIA_ROOT après contrôle d'accès. En production le transfert est
+    délégué au serveur web (MEDIA_ENVOI = 'x-accel' pour nginx, 'x-sendfile'
+    pour Apache/lighttpd) ; sinon le fichier est envoyé en flux par Django
+    avec ETag, Last-Modified et Range.
+    """
+    if request.method not in ('GET', 'HEAD'):
+        return HttpResponse(status=405, headers={'Allow': 'GET, HEAD'})
+    try:
+        chemin_complet = safe_join(settings.MEDIA_ROOT, chemin)
+    except SuspiciousFileOperation:
+        raise Http404
+    chemin = os.path.relpath(chemin_complet, settings.MEDIA_ROOT).replace(os.sep, '/')
+
+    autorise, public = acces_media(request, chemin)
+    if not autorise:
+        # 404 plutôt que 403 : ne pas révéler l'existence d'un fichier privé
+        raise Http404
+    try:
+        stat = os.stat(chemin_complet)
+    except FileNotFoundError:
+        raise Http404
+    if not os.path.isfile(chemin_complet):
+        raise Http404
+
+    if public and chemin.startswith(PREFIXES_IMMUABLES):
+        cache_control = CACHE_IMMUABLE
+    else:
+        cache_control = CACHE_PUBLIC if public else CACHE_PRIVE
+    type_contenu = mimetypes.guess_type(chemin_complet)[0] or 'application/octet-stream'
+    entetes = {'Cache-Control': cache_control, 'X-Content-Type-Options': 'nosniff'}
+    if not public:
+        entetes['Vary'] = 'Authorization'
+
+    mode = getattr(settings, 'MEDIA_ENVOI', 'django')
+    if mode == 'x-accel':
+        # nginx : location interne pointant sur MEDIA_ROOT, qui gère Range et ETag
+        response = HttpResponse(content_type=type_contenu, headers=entetes)
+        response['X-Accel-Redirect'] = getattr(settings, 'MEDIA_ACCEL_PREFIXE', '/media-interne/') + quote(chemin)
+        return response
+    if mode == 'x-sendfile':
+        response = HttpResponse(content_type=type_contenu, headers=entetes)
+        response['X-Sendfile'] = chemin_complet
+        return response
+
+    taille = stat.st_size
+    etag = f'"{int(stat.st_mtime):x}-{taille:x}"'
+    entetes.update({'ETag': etag, 'Last-Modified': http_date(stat.st_mtime), 'Accept-Ranges': 'bytes'})
+    response = get_conditional_response(request, etag=etag, last_modified=int(stat.st_mtime))
+    if response is not None:
+        for cle, valeur in entetes.items():
+            response[cle] = valeur
+        return response
+
+    plage = None
+    if 'HTTP_RANGE' in request.META:
+        # If-Range : la plage ne vaut que si le fichier n'a pas changé
+        if_range = request.META.get('HTTP_IF_RANGE')
+        if if_range is None or if_range == etag:
+            plage = _plage(request.META['HTTP_RANGE'], taille)
+    if plage is False:
+        return HttpResponse(status=416, headers={**entetes, 'Content-Range': f'bytes */{taille}'})
+
+    debut, fin = plage or (0, taille - 1)
+    longueur = fin - debut + 1 if taille else 0
+    corps = [] if request.method == 'HEAD' else _lire(chemin_complet, debut, longueur)
+    response = StreamingHttpResponse(corps, content_type=type_contenu, headers=entetes)
+    response['Content-Length'] = str(longueur)
+    if plage:
+        response.status_code = 206
+        response['Content-Range'] = f'bytes {debut}-{fin}/{taille}'
+    return response
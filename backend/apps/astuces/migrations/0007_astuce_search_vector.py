@@ -0,0 +1,53 @@
+# Generated by Django 5.2.6 on 2026-10-18 08:42
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.conf import settings
+from django.contrib.postgres.operations import UnaccentExtension
+from django.db import migrations
+
+
+# Configuration française insensible aux accents : unaccent puis racinisation
+CREATE_CONFIG = """
+CREATE TEXT SEARCH CONFIGURATION french_unaccent (COPY = french);
+ALTER TEXT SEARCH CONFIGURATION french_unaccent
+    ALTER MAPPING FOR hword, hword_part, word WITH unaccent, french_stem;
+"""
+
+DROP_CONFIG = "DROP TEXT SEARCH CONFIGURATION IF EXISTS french_unaccent;"
+
+# Même pondération que apps.astuces.search.vecteur_astuce()
+BACKFILL = """
+UPDATE astuces_astuce a SET search_vector =
+    setweight(to_tsvector('french_unaccent', coalesce(a.titre, '')), 'A') ||
+    setweight(to_tsvector('french_unaccent', coalesce((
+        SELECT string_agg(t.terme, ' ')
+        FROM astuces_astuce_termes at
+        JOIN astuces_terme t ON t.id = at.terme_id
+        WHERE at.astuce_id = a.id
+    ), '')), 'B') ||
+    setweight(to_tsvector('french_unaccent', coalesce(a.description, '')), 'C');
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('astuces', '0006_astuce_image_proposition_image'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        UnaccentExtension(),
+        migrations.RunSQL(CREATE_CONFIG, DROP_CONFIG),
+        migrations.AddField(
+            model_name='astuce',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='astuce',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='astuce_search_vector_gin'),
+        ),
+        migrations.RunSQL(BACKFILL, migrations.RunSQL.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.6 on 2026-10-18 08:46
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('astuces', '0007_astuce_search_vector'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='recherche',
+            name='date',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
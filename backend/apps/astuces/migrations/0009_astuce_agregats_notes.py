@@ -0,0 +1,67 @@
+# Generated by Django 5.2.6 on 2026-10-18 08:47
+
+from django.db import migrations, models
+
+
+# Initialise les agrégats à partir des évaluations existantes
+BACKFILL = """
+UPDATE astuces_astuce a SET
+    nombre_votes = s.nombre,
+    somme_notes = s.somme,
+    notes_1 = s.n1, notes_2 = s.n2, notes_3 = s.n3, notes_4 = s.n4, notes_5 = s.n5,
+    score_fiabilite = s.somme * 20.0 / s.nombre
+FROM (
+    SELECT astuce_id,
+           count(*) AS nombre,
+           sum(note) AS somme,
+           count(*) FILTER (WHERE note = 1) AS n1,
+           count(*) FILTER (WHERE note = 2) AS n2,
+           count(*) FILTER (WHERE note = 3) AS n3,
+           count(*) FILTER (WHERE note = 4) AS n4,
+           count(*) FILTER (WHERE note = 5) AS n5
+    FROM astuces_evaluation
+    GROUP BY astuce_id
+) s
+WHERE s.astuce_id = a.id;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('astuces', '0008_alter_recherche_date'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='astuce',
+            name='notes_1',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='astuce',
+            name='notes_2',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='astuce',
+            name='notes_3',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='astuce',
+            name='notes_4',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='astuce',
+            name='notes_5',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='astuce',
+            name='somme_notes',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunSQL(BACKFILL, migrations.RunSQL.noop),
+    ]
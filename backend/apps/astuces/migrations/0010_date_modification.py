@@ -0,0 +1,31 @@
+# Generated by Django 5.2.6 on 2026-10-18 08:49
+
+from django.db import migrations, models
+
+
+# Les lignes existantes prennent leur dernière date connue plutôt que la date de migration
+BACKFILL = """
+UPDATE astuces_astuce SET date_modification = coalesce(date_validation, date_publication);
+UPDATE astuces_terme SET date_modification = date_creation;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('astuces', '0009_astuce_agregats_notes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='astuce',
+            name='date_modification',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.AddField(
+            model_name='terme',
+            name='date_modification',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.RunSQL(BACKFILL, migrations.RunSQL.noop),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.6 on 2026-10-18 08:50
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('astuces', '0010_date_modification'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AstuceSupprimee',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('astuce_id', models.BigIntegerField()),
+                ('date', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+            ],
+        ),
+    ]
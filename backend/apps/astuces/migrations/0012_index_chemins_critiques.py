@@ -0,0 +1,66 @@
+# Generated by Django 5.2.6 on 2026-10-18 08:52
+
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('astuces', '0011_astucesupprimee'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='astuce',
+            name='date_modification',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AlterField(
+            model_name='astucesupprimee',
+            name='date',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddIndex(
+            model_name='astuce',
+            index=models.Index(condition=models.Q(('valide', True)), fields=['-date_publication', '-id'], name='astuce_valide_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='astuce',
+            index=models.Index(condition=models.Q(('valide', True)), fields=['-score_fiabilite', '-id'], name='astuce_valide_score_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='astuce',
+            index=models.Index(condition=models.Q(('valide', True)), fields=['-nombre_votes', '-id'], name='astuce_valide_votes_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='astuce',
+            index=models.Index(fields=['date_modification', 'id'], name='astuce_modification_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='astuce',
+            index=models.Index(fields=['createur', '-date_publication'], name='astuce_createur_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='astucesupprimee',
+            index=models.Index(fields=['date', 'id'], name='astuce_supprimee_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='evaluation',
+            index=models.Index(fields=['utilisateur', '-date'], name='evaluation_user_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='proposition',
+            index=models.Index(fields=['statut', 'date'], name='proposition_statut_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='proposition',
+            index=models.Index(fields=['utilisateur', '-date'], name='proposition_user_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recherche',
+            index=models.Index(fields=['utilisateur', '-date'], name='recherche_user_date_idx'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.6 on 2026-10-18 08:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('astuces', '0012_index_chemins_critiques'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='astuce',
+            name='image_variantes',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.AddField(
+            model_name='imageastuce',
+            name='image_variantes',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.AddField(
+            model_name='proposition',
+            name='image_variantes',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
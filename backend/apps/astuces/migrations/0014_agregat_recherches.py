@@ -0,0 +1,34 @@
+# Generated by Django 5.2.6 on 2026-10-18 09:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('astuces', '0013_variantes_images'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PointReprise',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nom', models.CharField(max_length=50, unique=True)),
+                ('dernier_id', models.BigIntegerField(default=0)),
+                ('date', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='RechercheJournaliere',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('mots_cles', models.CharField(max_length=255)),
+                ('jour', models.DateField()),
+                ('nombre', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('jour', 'mots_cles'), name='recherche_jour_mots_unique')],
+            },
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.6 on 2026-10-18 09:04
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('astuces', '0014_agregat_recherches'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='astuce',
+            name='score_tendance',
+            field=models.FloatField(default=0.0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='astuce',
+            index=models.Index(condition=models.Q(('valide', True)), fields=['-score_tendance', '-id'], name='astuce_valide_tendance_idx'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.6 on 2026-10-18 09:05
+
+import django.contrib.postgres.fields
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('astuces', '0015_score_tendance'),
+        ('users', '0005_avatar_variantes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecommandationsUtilisateur',
+            fields=[
+                ('utilisateur', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='recommandations', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('astuces', django.contrib.postgres.fields.ArrayField(base_field=models.BigIntegerField(), default=list, size=None)),
+                ('scores', django.contrib.postgres.fields.ArrayField(base_field=models.FloatField(), default=list, size=None)),
+                ('date', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='VoisinsAstuce',
+            fields=[
+                ('astuce', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='voisins', serialize=False, to='astuces.astuce')),
+                ('voisins', django.contrib.postgres.fields.ArrayField(base_field=models.BigIntegerField(), default=list, size=None)),
+                ('scores', django.contrib.postgres.fields.ArrayField(base_field=models.FloatField(), default=list, size=None)),
+                ('date', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.6 on 2026-10-18 09:08
+
+import django.contrib.postgres.fields
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('astuces', '0016_recommandations'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SimilairesAstuce',
+            fields=[
+                ('astuce', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='similaires', serialize=False, to='astuces.astuce')),
+                ('astuces', django.contrib.postgres.fields.ArrayField(base_field=models.BigIntegerField(), default=list, size=None)),
+                ('scores', django.contrib.postgres.fields.ArrayField(base_field=models.FloatField(), default=list, size=None)),
+                ('date', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.6 on 2026-10-18 09:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('astuces', '0017_similaires'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='astuce',
+            name='score_ai_version',
+            field=models.CharField(blank=True, default='', editable=False, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='proposition',
+            name='score_ai',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='proposition',
+            name='score_ai_version',
+            field=models.CharField(blank=True, default='', editable=False, max_length=100),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.6 on 2026-10-18 09:11
+
+import django.contrib.postgres.fields
+import django.contrib.postgres.indexes
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('astuces', '0018_score_ai_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='proposition',
+            name='doublons',
+            field=models.JSONField(blank=True, default=list, editable=False),
+        ),
+        migrations.CreateModel(
+            name='SignatureTexte',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('signature', django.contrib.postgres.fields.ArrayField(base_field=models.BigIntegerField(), size=None)),
+                ('bandes', django.contrib.postgres.fields.ArrayField(base_field=models.BigIntegerField(), size=None)),
+                ('astuce', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='signature_texte', to='astuces.astuce')),
+                ('proposition', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='signature_texte', to='astuces.proposition')),
+            ],
+            options={
+                'indexes': [django.contrib.postgres.indexes.GinIndex(fields=['bandes'], name='signature_bandes_gin')],
+                'constraints': [models.CheckConstraint(condition=models.Q(('astuce__isnull', True), ('proposition__isnull', True), _connector='XOR'), name='signature_une_cible')],
+            },
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.6 on 2026-10-18 09:13
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('astuces', '0019_signatures_doublons'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='proposition',
+            name='reservee_jusqua',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='proposition',
+            name='reservee_par',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='propositions_reservees', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='proposition',
+            index=models.Index(models.OrderBy(models.F('score_ai'), descending=True, nulls_last=True), models.F('date'), models.F('id'), condition=models.Q(('statut', 'en_attente')), name='proposition_file_priorite_idx'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.6 on 2026-10-18 09:22
+
+import django.contrib.postgres.indexes
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('astuces', '0020_file_moderation'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='astuce',
+            index=models.Index(fields=['image'], name='astuce_image_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='astuce',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['image_variantes'], name='astuce_variantes_gin', opclasses=['jsonb_path_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='imageastuce',
+            index=models.Index(fields=['image'], name='image_astuce_image_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='imageastuce',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['image_variantes'], name='image_astuce_variantes_gin', opclasses=['jsonb_path_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='proposition',
+            index=models.Index(fields=['image'], name='proposition_image_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='proposition',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['image_variantes'], name='proposition_variantes_gin', opclasses=['jsonb_path_ops']),
+        ),
+    ]
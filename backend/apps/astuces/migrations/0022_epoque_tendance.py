@@ -0,0 +1,25 @@
+from datetime import datetime, timezone
+
+from django.db import migrations
+
+
+# Époque des scores tendance déjà calculés (constante du code jusqu'ici)
+EPOQUE_INITIALE = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+def creer_epoque(apps, schema_editor):
+    PointReprise = apps.get_model('astuces', 'PointReprise')
+    point, _ = PointReprise.objects.get_or_create(nom='tendance_epoque')
+    # update() : la date n'est pas écrasée par auto_now
+    PointReprise.objects.filter(pk=point.pk).update(date=EPOQUE_INITIALE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('astuces', '0021_index_medias'),
+    ]
+
+    operations = [
+        migrations.RunPython(creer_epoque, migrations.RunPython.noop),
+    ]
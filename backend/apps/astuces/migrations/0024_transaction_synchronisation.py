@@ -0,0 +1,75 @@
+# Generated by Django 5.2.6 on 2026-10-18 09:29
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+# Chaque écriture visible par la synchronisation porte le xid de sa transaction.
+# Sur astuce, seules les modifications qui datent la ligne (ou la dévalident)
+# comptent : les scores recalculés en tâche de fond ne la renvoient pas aux clients.
+CREATE_TRIGGERS = """
+CREATE FUNCTION astuces_transaction_modification() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT'
+       OR NEW.date_modification IS DISTINCT FROM OLD.date_modification
+       OR NEW.valide IS DISTINCT FROM OLD.valide THEN
+        NEW.transaction_modification := pg_current_xact_id()::text::bigint;
+    ELSE
+        NEW.transaction_modification := OLD.transaction_modification;
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER astuce_transaction_modification
+    BEFORE INSERT OR UPDATE ON astuces_astuce
+    FOR EACH ROW EXECUTE FUNCTION astuces_transaction_modification();
+
+CREATE FUNCTION astuces_transaction_suppression() RETURNS trigger AS $$
+BEGIN
+    NEW.transaction := pg_current_xact_id()::text::bigint;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER astuce_supprimee_transaction
+    BEFORE INSERT ON astuces_astucesupprimee
+    FOR EACH ROW EXECUTE FUNCTION astuces_transaction_suppression();
+"""
+
+DROP_TRIGGERS = """
+DROP TRIGGER IF EXISTS astuce_transaction_modification ON astuces_astuce;
+DROP FUNCTION IF EXISTS astuces_transaction_modification();
+DROP TRIGGER IF EXISTS astuce_supprimee_transaction ON astuces_astucesupprimee;
+DROP FUNCTION IF EXISTS astuces_transaction_suppression();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('astuces', '0023_contributions_tendance'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='astuce',
+            name='transaction_modification',
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='astucesupprimee',
+            name='transaction',
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='astuce',
+            index=models.Index(fields=['transaction_modification', 'id'], name='astuce_transaction_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='astucesupprimee',
+            index=models.Index(fields=['transaction', 'id'], name='astuce_supprimee_xact_idx'),
+        ),
+        migrations.RunSQL(CREATE_TRIGGERS, DROP_TRIGGERS),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-18 09:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('astuces', '0024_transaction_synchronisation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='similairesastuce',
+            name='empreinte',
+            field=models.CharField(blank=True, default='', max_length=32),
+        ),
+    ]
@@ -1,5 +1,11 @@
 from django.db import models
+from django.db.models import F, Q
+from django.db.models.functions import Cast, Coalesce, NullIf
 from django.conf import settings
+from django.utils import timezone
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 
 User = settings.AUTH_USER_MODEL
 
@@ -14,6 +20,7 @@ class Terme(models.Model):
     terme = models.CharField(max_length=200, unique=True)
     definition = models.TextField()
     date_creation = models.DateTimeField(auto_now_add=True)
+    date_modification = models.DateTimeField(auto_now=True)
     
     class Meta:
         ordering = ['terme']
@@ -21,6 +28,36 @@ class Terme(models.Model):
     def __str__(self):
         return self.terme
 
+class AstuceQuerySet(models.QuerySet):
+    def pour_serialisation(self):
+        """
+        Charge en un nombre fixe de requêtes tout ce qu'AstuceSerializer lit :
+        createur (jointure), categories et termes (prefetch), quelle que soit
+        la taille de la page. La note moyenne est stockée sur l'astuce.
+        """
+        return self.select_related('createur').prefetch_related('categories', 'termes')
+
+    def ajouter_note(self, note, sens=1):
+        """
+        Met à jour les agrégats de notes en un seul UPDATE atomique (F()),
+        à appeler dans la transaction qui crée (sens=1) ou supprime (sens=-1)
+        l'évaluation.
+        """
+        somme = F('somme_notes') + sens * note
+        nombre = F('nombre_votes') + sens
+        return self.update(**{
+            'somme_notes': somme,
+            'nombre_votes': nombre,
+            f'notes_{note}': F(f'notes_{note}') + sens,
+            'date_modification': timezone.now(),
+            # score_fiabilite = moyenne sur 5 ramenée sur 100
+            'score_fiabilite': Coalesce(
+                Cast(somme, models.FloatField()) * 20.0 / NullIf(nombre, 0),
+                0.0,
+            ),
+        })
+
+
 class Astuce(models.Model):
 
     NIVEAU_CHOICES = (
@@ -33,6 +70,11 @@ class Astuce(models.Model):
     description = models.TextField()
     source = models.CharField(max_length=255, blank=True, null=True)
     date_publication = models.DateTimeField(auto_now_add=True)
+    # Mise à jour à chaque save, changement de catégories/termes et nouvelle note
+    date_modification = models.DateTimeField(auto_now=True)
+    # Transaction PostgreSQL (xid) de la dernière modification, écrite par trigger :
+    # curseur de la synchronisation dans l'ordre des commits (apps.astuces.sync)
+    transaction_modification = models.BigIntegerField(default=0, editable=False)
     #  NOUVEAU: Niveau de difficulté
     niveau_difficulte = models.CharField(
         max_length=20, 
@@ -41,13 +83,27 @@ class Astuce(models.Model):
     )
     #  NOUVEAU: Image pour l'astuce
     image = models.ImageField(upload_to='astuces/%Y/%m/%d/', null=True, blank=True)
+    # Miniatures et WebP calculés après l'envoi (apps.astuces.images)
+    image_variantes = models.JSONField(default=dict, blank=True, editable=False)
 
     valide = models.BooleanField(default=False)
     date_validation = models.DateTimeField(null=True, blank=True)
 
     score_ai = models.FloatField(null=True, blank=True)
+    # Version du modèle qui a produit score_ai (apps.astuces.score_ai)
+    score_ai_version = models.CharField(max_length=100, blank=True, default='', editable=False)
     score_fiabilite = models.FloatField(default=0.0)  # moyenne calculée par les évaluations
     nombre_votes = models.PositiveIntegerField(default=0)
+    # Agrégats des évaluations, tenus à jour par AstuceQuerySet.ajouter_note()
+    somme_notes = models.PositiveIntegerField(default=0)
+    notes_1 = models.PositiveIntegerField(default=0)
+    notes_2 = models.PositiveIntegerField(default=0)
+    notes_3 = models.PositiveIntegerField(default=0)
+    notes_4 = models.PositiveIntegerField(default=0)
+    notes_5 = models.PositiveIntegerField(default=0)
+    # Popularité récente à décroissance exponentielle, stockée en « décroissance
+    # avant » (apps.astuces.tendances) : ne change qu'avec de nouveaux événements
+    score_tendance = models.FloatField(default=0.0, editable=False)
 
     createur = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name='astuces_creees')
     categories = models.ManyToManyField(Categorie, blank=True, related_name='astuces')
@@ -55,6 +111,38 @@ class Astuce(models.Model):
     # ✅ NOUVEAU: Relation avec les termes du dictionnaire
     termes = models.ManyToManyField(Terme, blank=True, related_name='astuces')
 
+    # Vecteur plein texte (titre, termes, description), maintenu par apps.astuces.search
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = AstuceQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            GinIndex(fields=['search_vector'], name='astuce_search_vector_gin'),
+            # Listes publiques : valide=True + tri exposé, id pour la pagination par clé
+            models.Index(fields=['-date_publication', '-id'], condition=Q(valide=True), name='astuce_valide_date_idx'),
+            models.Index(fields=['-score_fiabilite', '-id'], condition=Q(valide=True), name='astuce_valide_score_idx'),
+            models.Index(fields=['-nombre_votes', '-id'], condition=Q(valide=True), name='astuce_valide_votes_idx'),
+            models.Index(fields=['-score_tendance', '-id'], condition=Q(valide=True), name='astuce_valide_tendance_idx'),
+            # Exports incrémentaux (?depuis=)
+            models.Index(fields=['date_modification', 'id'], name='astuce_modification_idx'),
+            # Synchronisation différentielle
+            models.Index(fields=['transaction_modification', 'id'], name='astuce_transaction_idx'),
+            # Astuces d'un profil
+            models.Index(fields=['createur', '-date_publication'], name='astuce_createur_date_idx'),
+            # Contrôle d'accès des médias (apps.astuces.media) : fichier d'origine et dérivés
+            models.Index(fields=['image'], name='astuce_image_idx'),
+            GinIndex(fields=['image_variantes'], opclasses=['jsonb_path_ops'], name='astuce_variantes_gin'),
+        ]
+
+    @property
+    def moyenne_note(self):
+        return self.somme_notes / self.nombre_votes if self.nombre_votes else 0.0
+
+    @property
+    def distribution_notes(self):
+        return {note: getattr(self, f'notes_{note}') for note in range(1, 6)}
+
     def __str__(self):
         return self.titre
     
@@ -64,12 +152,17 @@ class Astuce(models.Model):
 class ImageAstuce(models.Model):
     astuce = models.ForeignKey(Astuce, on_delete=models.CASCADE, related_name='images')
     image = models.ImageField(upload_to='astuces/%Y/%m/%d/')
+    image_variantes = models.JSONField(default=dict, blank=True, editable=False)
     legende = models.CharField(max_length=255, blank=True, null=True)
     ordre = models.PositiveIntegerField(default=0)
     date_ajout = models.DateTimeField(auto_now_add=True)
     
     class Meta:
         ordering = ['ordre', 'date_ajout']
+        indexes = [
+            models.Index(fields=['image'], name='image_astuce_image_idx'),
+            GinIndex(fields=['image_variantes'], opclasses=['jsonb_path_ops'], name='image_astuce_variantes_gin'),
+        ]
     
     def __str__(self):
         return f"Image {self.ordre} - {self.astuce.titre}"
@@ -93,6 +186,7 @@ class Proposition(models.Model):
     source = models.CharField(max_length=255, blank=True, null=True)
     # ✅ NOUVEAU: Image pour la proposition
     image = models.ImageField(upload_to='propositions/%Y/%m/%d/', null=True, blank=True)
+    image_variantes = models.JSONField(default=dict, blank=True, editable=False)
 
     niveau_difficulte = models.CharField(max_length=20, choices=NIVEAU_CHOICES, default='debutant')
     categories = models.ManyToManyField(Categorie, blank=True, related_name='propositions')
@@ -103,10 +197,28 @@ class Proposition(models.Model):
     
     
     statut = models.CharField(max_length=20, choices=STATUT_CHOICES, default='en_attente')
+    score_ai = models.FloatField(null=True, blank=True, editable=False)
+    score_ai_version = models.CharField(max_length=100, blank=True, default='', editable=False)
+    # Quasi-doublons repérés à l'envoi : [{'type', 'id', 'similarite'}] (apps.astuces.doublons)
+    doublons = models.JSONField(default=list, blank=True, editable=False)
     commentaire_moderation = models.TextField(blank=True, null=True)
     
     utilisateur = models.ForeignKey(User, on_delete=models.CASCADE, related_name='propositions')
     astuce = models.OneToOneField(Astuce, on_delete=models.SET_NULL, null=True, blank=True, related_name='proposition_origine')
+    # Bail de modération (apps.astuces.moderation) : réservée jusqu'à cette date
+    reservee_par = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, editable=False, related_name='propositions_reservees')
+    reservee_jusqua = models.DateTimeField(null=True, blank=True, editable=False)
+
+    class Meta:
+        indexes = [
+            # File de modération et propositions d'un profil
+            models.Index(fields=['statut', 'date'], name='proposition_statut_date_idx'),
+            models.Index(fields=['utilisateur', '-date'], name='proposition_user_date_idx'),
+            models.Index(fields=['image'], name='proposition_image_idx'),
+            GinIndex(fields=['image_variantes'], opclasses=['jsonb_path_ops'], name='proposition_variantes_gin'),
+            # File de modération triée par priorité
+            models.Index(F('score_ai').desc(nulls_last=True), 'date', 'id', condition=Q(statut='en_attente'), name='proposition_file_priorite_idx'),
+        ]
 
     def __str__(self):
         return f"Proposition: {self.titre} - {self.get_statut_display()}"
@@ -138,6 +250,9 @@ class Evaluation(models.Model):
 
     class Meta:
         unique_together = ('utilisateur', 'astuce')  # un utilisateur évalue une astuce une seule fois
+        indexes = [
+            models.Index(fields=['utilisateur', '-date'], name='evaluation_user_date_idx'),
+        ]
 
     def __str__(self):
         return f"Eval {self.note} par {self.utilisateur} sur {self.astuce}"
@@ -155,8 +270,144 @@ class Favori(models.Model):
 
 class Recherche(models.Model):
     mots_cles = models.CharField(max_length=255)
-    date = models.DateTimeField(auto_now_add=True)
+    # Horodatage fourni par le journal différé (heure de la recherche, pas de l'insertion)
+    date = models.DateTimeField(default=timezone.now)
     utilisateur = models.ForeignKey(User, on_delete=models.CASCADE, related_name='recherches')
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['utilisateur', '-date'], name='recherche_user_date_idx'),
+        ]
+
     def __str__(self):
         return f"Recherche [{self.mots_cles}] par {self.utilisateur}"
+
+
+# Pierre tombale d'une astuce supprimée, pour la synchronisation différentielle
+class AstuceSupprimee(models.Model):
+    astuce_id = models.BigIntegerField()
+    date = models.DateTimeField(default=timezone.now)
+    # Transaction PostgreSQL (xid) de la suppression, écrite par trigger
+    transaction = models.BigIntegerField(default=0, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['date', 'id'], name='astuce_supprimee_date_idx'),
+            models.Index(fields=['transaction', 'id'], name='astuce_supprimee_xact_idx'),
+        ]
+
+    def __str__(self):
+        return f"Astuce {self.astuce_id} supprimée le {self.date}"
+
+
+# Nombre quotidien de recherches par mots-clés normalisés (apps.astuces.tendances)
+class RechercheJournaliere(models.Model):
+    mots_cles = models.CharField(max_length=255)
+    jour = models.DateField()
+    nombre = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['jour', 'mots_cles'], name='recherche_jour_mots_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.jour} [{self.mots_cles}] x{self.nombre}"
+
+
+# Point de reprise d'un traitement incrémental : dernier id déjà traité
+class PointReprise(models.Model):
+    nom = models.CharField(max_length=50, unique=True)
+    dernier_id = models.BigIntegerField(default=0)
+    date = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.nom} : {self.dernier_id}"
+
+
+# Contribution d'un utilisateur au score tendance d'une astuce, favori et note
+# réunis : un couple compte une fois, et sa contribution peut être retirée.
+# Sans contrainte de clé étrangère : la ligne doit survivre à la suppression
+# de l'utilisateur ou de l'astuce jusqu'au passage qui la retire du score.
+class ContributionTendance(models.Model):
+    utilisateur = models.ForeignKey(User, on_delete=models.DO_NOTHING, db_constraint=False, related_name='+')
+    astuce = models.ForeignKey(Astuce, on_delete=models.DO_NOTHING, db_constraint=False, related_name='+')
+    # log(somme des poids * exp(λ t)), t en secondes Unix : ne dépend pas de l'époque
+    log_poids = models.FloatField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['utilisateur', 'astuce'], name='contribution_tendance_unique'),
+        ]
+
+    def __str__(self):
+        return f"Contribution de {self.utilisateur_id} à {self.astuce_id}"
+
+
+# Favori retiré, évaluation modifiée ou supprimée : couple à recompter par le
+# prochain calcul des tendances (les créations sont lues sur leur clé primaire)
+class InteractionModifiee(models.Model):
+    utilisateur = models.ForeignKey(User, on_delete=models.DO_NOTHING, db_constraint=False, related_name='+')
+    astuce = models.ForeignKey(Astuce, on_delete=models.DO_NOTHING, db_constraint=False, related_name='+')
+    date = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Interaction modifiée {self.utilisateur_id} -> {self.astuce_id}"
+
+
+# Voisins d'une astuce par co-occurrence (favoris, bonnes notes), calculés hors ligne
+class VoisinsAstuce(models.Model):
+    astuce = models.OneToOneField(Astuce, on_delete=models.CASCADE, primary_key=True, related_name='voisins')
+    voisins = ArrayField(models.BigIntegerField(), default=list)
+    scores = ArrayField(models.FloatField(), default=list)
+    date = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Voisins de l'astuce {self.astuce_id}"
+
+
+# Recommandations d'un utilisateur, triées, calculées hors ligne (apps.astuces.recommandations)
+class RecommandationsUtilisateur(models.Model):
+    utilisateur = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='recommandations')
+    astuces = ArrayField(models.BigIntegerField(), default=list)
+    scores = ArrayField(models.FloatField(), default=list)
+    date = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Recommandations de {self.utilisateur_id}"
+
+
+# Astuces au contenu proche (TF-IDF), calculées hors ligne (apps.astuces.similaires)
+class SimilairesAstuce(models.Model):
+    astuce = models.OneToOneField(Astuce, on_delete=models.CASCADE, primary_key=True, related_name='similaires')
+    astuces = ArrayField(models.BigIntegerField(), default=list)
+    scores = ArrayField(models.FloatField(), default=list)
+    # Empreinte du texte indexé : une astuce datée par une note n'est pas revectorisée
+    empreinte = models.CharField(max_length=32, blank=True, default='')
+    date = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Astuces similaires à {self.astuce_id}"
+
+
+# Signature MinHash d'une astuce validée ou d'une proposition en attente (apps.astuces.doublons)
+class SignatureTexte(models.Model):
+    astuce = models.OneToOneField(Astuce, on_delete=models.CASCADE, null=True, blank=True, related_name='signature_texte')
+    proposition = models.OneToOneField(Proposition, on_delete=models.CASCADE, null=True, blank=True, related_name='signature_texte')
+    signature = ArrayField(models.BigIntegerField())
+    # Empreintes des bandes LSH : candidats par recouvrement (&&) sur l'index GIN
+    bandes = ArrayField(models.BigIntegerField())
+
+    class Meta:
+        indexes = [
+            GinIndex(fields=['bandes'], name='signature_bandes_gin'),
+        ]
+        constraints = [
+            models.CheckConstraint(
+                condition=Q(astuce__isnull=True) ^ Q(proposition__isnull=True),
+                name='signature_une_cible',
+            ),
+        ]
+
+    def __str__(self):
+        return f"Signature {'astuce ' + str(self.astuce_id) if self.astuce_id else 'proposition ' + str(self.proposition_id)}"
@@ -0,0 +1,203 @@
+"""
+File de modération : chaque modérateur réserve les prochaines propositions
+en attente (SELECT ... FOR UPDATE SKIP LOCKED, les lignes déjà prises par
+une autre transaction sont sautées, pas attendues) pour une durée limitée.
+Une décision n'est appliquée que par un UPDATE conditionnel sur le bail et
+l'état de la proposition : deux modérateurs ne peuvent pas publier la même.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .cache import invalider_contenu
+from .doublons import signer_lot, signer_proposition
+from .models import Astuce, Proposition, Terme
+from .search import mettre_a_jour_vecteurs
+from .suggestions import index_suggestions
+
+ORDRES = {
+    'age': ('date', 'id'),
+    'priorite': (F('score_ai').desc(nulls_last=True), 'date', 'id'),
+}
+RESERVATION_MAX = 50
+LOT_MAX = 1000
+
+
+class ReservationPerdue(Exception):
+    pass
+
+
+def duree_bail():
+    return timedelta(minutes=getattr(settings, 'MODERATION_BAIL_MINUTES', 15))
+
+
+def _disponible(moderateur, maintenant):
+    """Sans bail en cours, bail expiré, ou bail du modérateur lui-même."""
+    return Q(reservee_jusqua__isnull=True) | Q(reservee_jusqua__lt=maintenant) | Q(reservee_par=moderateur)
+
+
+# ========== RÉSERVATIONS ==========
+def reserver(moderateur, nombre=10, ordre='age'):
+    """
+    Réserve jusqu'à `nombre` propositions en attente non réservées, les plus
+    anciennes (ou de meilleur score_ai) d'abord. Renvoie leurs ids.
+    """
+    maintenant = timezone.now()
+    with transaction.atomic():
+        ids = list(
+            Proposition.objects.filter(statut='en_attente')
+            .filter(Q(reservee_jusqua__isnull=True) | Q(reservee_jusqua__lt=maintenant))
+            .order_by(*ORDRES[ordre])
+            .select_for_update(skip_locked=True)
+            .values_list('id', flat=True)[:min(nombre, RESERVATION_MAX)]
+        )
+        Proposition.objects.filter(pk__in=ids).update(
+            reservee_par=moderateur, reservee_jusqua=maintenant + duree_bail(),
+        )
+    return ids
+
+
+def reservations(moderateur):
+    """Propositions dont le modérateur détient un bail en cours."""
+    return Proposition.objects.filter(reservee_par=moderateur, reservee_jusqua__gte=timezone.now()).order_by('date', 'id')
+
+
+def prolonger(moderateur, ids):
+    """Renouvelle les baux encore détenus ; renvoie le nombre prolongé."""
+    maintenant = timezone.now()
+    return Proposition.objects.filter(pk__in=ids, reservee_par=moderateur, reservee_jusqua__gte=maintenant).update(
+        reservee_jusqua=maintenant + duree_bail(),
+    )
+
+
+def liberer(moderateur, ids):
+    """Rend des propositions à la file ; renvoie le nombre libéré."""
+    return Proposition.objects.filter(pk__in=ids, reservee_par=moderateur).update(reservee_par=None, reservee_jusqua=None)
+
+
+# ========== DÉCISIONS ==========
+def decider(proposition_id, moderateur, statut, commentaire=''):
+    """
+    Applique un statut si aucun autre modérateur ne détient de bail sur la
+    proposition, et crée l'astuce à l'acceptation. Une proposition déjà
+    publiée ne change plus de statut (ni nouvelle astuce, ni rejet qui la
+    laisserait en ligne) : la condition astuce IS NULL est vérifiée dans le
+    même UPDATE. Le bail est rendu. Lève ReservationPerdue sinon.
+    """
+    maintenant = timezone.now()
+    with transaction.atomic():
+        cible = Proposition.objects.filter(pk=proposition_id, astuce__isnull=True).filter(_disponible(moderateur, maintenant))
+        modifiees = cible.update(
+            statut=statut, commentaire_moderation=commentaire,
+            reservee_par=None, reservee_jusqua=None, date_modification=maintenant,
+        )
+        if not modifiees:
+            raise ReservationPerdue('Proposition réservée par un autre modérateur ou déjà publiée')
+
+        proposition = Proposition.objects.select_related('utilisateur').get(pk=proposition_id)
+        if statut == 'acceptee':
+            astuce = Astuce.objects.create(
+                titre=proposition.titre,
+                description=proposition.description,
+                source=proposition.source,
+                niveau_difficulte=proposition.niveau_difficulte,
+                score_ai=proposition.score_ai,
+                score_ai_version=proposition.score_ai_version,
+                valide=True,
+                createur=proposition.utilisateur,
+                date_publication=maintenant,
+                date_validation=maintenant,
+            )
+            astuce.categories.set(proposition.categories.all())
+            astuce.termes.set(proposition.termes.all())
+            Proposition.objects.filter(pk=proposition_id).update(astuce=astuce)
+            proposition.astuce = astuce
+        # update() ne déclenche pas post_save
+        signer_proposition(proposition)
+    return proposition
+
+
+def _astuce_de(proposition, maintenant):
+    return Astuce(
+        titre=proposition.titre,
+        description=proposition.description,
+        source=proposition.source,
+        niveau_difficulte=proposition.niveau_difficulte,
+        score_ai=proposition.score_ai,
+        score_ai_version=proposition.score_ai_version,
+        valide=True,
+        createur_id=proposition.utilisateur_id,
+        date_publication=maintenant,
+        date_validation=maintenant,
+    )
+
+
+def _copier_relations(relation, champ, astuce_par_proposition):
+    """Recopie en un INSERT les lignes de liaison proposition -> categorie/terme vers les astuces."""
+    source = getattr(Proposition, relation).through
+    cible = getattr(Astuce, relation).through
+    lignes = source.objects.filter(proposition_id__in=list(astuce_par_proposition)).values_list('proposition_id', champ)
+    cible.objects.bulk_create(
+        [cible(astuce_id=astuce_par_proposition[proposition_id], **{champ: pk}) for proposition_id, pk in lignes],
+        ignore_conflicts=True,
+    )
+
+
+def _indexer_suggestions(astuces):
+    if not index_suggestions.construit:
+        return
+    termes = Terme.objects.filter(astuces__in=astuces).distinct().values_list('pk', 'terme')
+    index_suggestions.ajouter_lot(
+        [('astuce', astuce.pk, astuce.titre, 0) for astuce in astuces] + [('terme', pk, terme, 0) for pk, terme in termes]
+    )
+
+
+def decider_lot(moderateur, decisions):
+    """
+    Applique {id: (statut, commentaire)} en une transaction : astuces créées
+    par bulk_create, catégories et termes recopiés par lignes de liaison,
+    statuts écrits par bulk_update. Les propositions verrouillées ou
+    réservées par un autre modérateur, et celles déjà publiées, sont
+    renvoyées en conflit sans bloquer le reste.
+    Renvoie (ids traités, ids en conflit, {proposition: astuce}).
+    """
+    maintenant = timezone.now()
+    with transaction.atomic():
+        propositions = list(
+            Proposition.objects.filter(pk__in=list(decisions), astuce__isnull=True)
+            .filter(_disponible(moderateur, maintenant))
+            .select_for_update(skip_locked=True)
+            .order_by('id')
+        )
+        acceptees = [proposition for proposition in propositions if decisions[proposition.pk][0] == 'acceptee']
+
+        # PostgreSQL renvoie les clés : les astuces arrivent dans l'ordre des propositions
+        astuces = Astuce.objects.bulk_create([_astuce_de(proposition, maintenant) for proposition in acceptees])
+        astuce_par_proposition = {proposition.pk: astuce.pk for proposition, astuce in zip(acceptees, astuces)}
+        if astuces:
+            _copier_relations('categories', 'categorie_id', astuce_par_proposition)
+            _copier_relations('termes', 'terme_id', astuce_par_proposition)
+
+        for proposition in propositions:
+            proposition.statut, proposition.commentaire_moderation = decisions[proposition.pk]
+            proposition.astuce_id = astuce_par_proposition.get(proposition.pk, proposition.astuce_id)
+            proposition.reservee_par, proposition.reservee_jusqua = None, None
+            proposition.date_modification = maintenant
+        Proposition.objects.bulk_update(propositions, [
+            'statut', 'commentaire_moderation', 'astuce', 'reservee_par', 'reservee_jusqua', 'date_modification',
+        ], batch_size=500)
+
+        # Ce que les signaux post_save / m2m_changed feraient pour chaque ligne
+        mettre_a_jour_vecteurs([astuce.pk for astuce in astuces])
+        signer_lot(astuces, propositions)
+        if astuces:
+            invalider_contenu()
+            # L'index en mémoire ne doit pas voir des astuces d'une transaction annulée
+            transaction.on_commit(lambda: _indexer_suggestions(astuces))
+
+    traitees = [proposition.pk for proposition in propositions]
+    conflits = sorted(set(decisions) - set(traitees))
+    return traitees, conflits, astuce_par_proposition
@@ -0,0 +1,167 @@
+import json
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination, Cursor
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Pagination par clé (keyset) : le curseur contient les valeurs de tri du
+    dernier élément de la page, complétées par l'id pour départager les
+    ex-aequo. Chaque page est un simple WHERE (...) > (...) LIMIT n, donc une
+    page profonde coûte autant que la première, et aucun COUNT(*) n'est fait.
+
+    L'ordre vient du OrderingFilter de la vue s'il existe, sinon de `ordering`.
+    Les champs de tri ne doivent pas être NULL : un tri demandé sur une
+    colonne NULL-able est remplacé par l'ordre par défaut.
+    """
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = ('-id',)
+    tie_breaker = 'id'
+
+    def get_ordering(self, request, queryset, view):
+        defaut = self.ordering
+        ordering = super().get_ordering(request, queryset, view)
+        if any(_nullable(queryset.model, order.lstrip('-')) for order in ordering):
+            ordering = tuple(defaut)
+        fields = [order.lstrip('-') for order in ordering]
+        if self.tie_breaker not in fields and 'pk' not in fields:
+            # Même sens que le premier champ pour profiter des index composites
+            prefix = '-' if ordering[0].startswith('-') else ''
+            ordering = ordering + (prefix + self.tie_breaker,)
+        return ordering
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            reverse, current_position = False, None
+        else:
+            reverse, current_position = self.cursor.reverse, self.cursor.position
+
+        if reverse:
+            queryset = queryset.order_by(*_reverse_ordering(self.ordering))
+        else:
+            queryset = queryset.order_by(*self.ordering)
+
+        if current_position is not None:
+            queryset = queryset.filter(self._keyset_filter(current_position, reverse))
+
+        # Un élément de plus pour savoir s'il existe une page suivante
+        results = list(queryset[:self.page_size + 1])
+        self.page = results[:self.page_size]
+        has_following = len(results) > len(self.page)
+
+        if reverse:
+            self.page = list(reversed(self.page))
+            self.has_next = current_position is not None
+            self.has_previous = has_following
+        else:
+            self.has_next = has_following
+            self.has_previous = current_position is not None
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+
+        return self.page
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        if self.page:
+            position = self._get_position_from_instance(self.page[-1], self.ordering)
+        else:
+            position = self.cursor.position
+        return self.encode_cursor(Cursor(offset=0, reverse=False, position=position))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if self.page:
+            position = self._get_position_from_instance(self.page[0], self.ordering)
+        else:
+            position = self.cursor.position
+        return self.encode_cursor(Cursor(offset=0, reverse=True, position=position))
+
+    def decode_cursor(self, request):
+        cursor = super().decode_cursor(request)
+        if cursor is None or cursor.position is None:
+            return cursor
+        try:
+            values = json.loads(cursor.position)
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return Cursor(offset=0, reverse=cursor.reverse, position=cursor.position)
+
+    def _keyset_filter(self, position, reverse):
+        """
+        Condition lexicographique (a, b, id) > (va, vb, vid), chaque champ
+        suivant son propre sens de tri.
+        """
+        values = json.loads(position)
+        condition = Q()
+        egalites = {}
+        for order, value in zip(self.ordering, values):
+            attr = order.lstrip('-')
+            descending = order.startswith('-')
+            lookup = 'lt' if descending != reverse else 'gt'
+            condition |= Q(**egalites, **{f'{attr}__{lookup}': value})
+            egalites[attr] = value
+        return condition
+
+    def _get_position_from_instance(self, instance, ordering):
+        values = []
+        for order in ordering:
+            attr = order.lstrip('-')
+            value = instance[attr] if isinstance(instance, dict) else getattr(instance, attr)
+            if value is None:
+                # str(None) donnerait 'None' dans le curseur, et les lignes NULL seraient sautées
+                raise ValueError(f"Champ de tri NULL dans le curseur : {attr}")
+            values.append(value if isinstance(value, (int, float)) else str(value))
+        return json.dumps(values, separators=(',', ':'))
+
+
+def _nullable(model, attr):
+    try:
+        return model._meta.get_field(attr).null
+    except FieldDoesNotExist:
+        # Annotation (pertinence, ...) : à la charge de la vue
+        return False
+
+
+def _reverse_ordering(ordering):
+    return tuple(order[1:] if order.startswith('-') else '-' + order for order in ordering)
+
+
+# ========== PAGINATIONS PAR RESSOURCE ==========
+class AstucePagination(KeysetPagination):
+    ordering = ('-date_publication',)
+
+
+class TendancePagination(KeysetPagination):
+    ordering = ('-score_tendance',)
+
+
+class PropositionPagination(KeysetPagination):
+    ordering = ('-date',)
+
+
+class EvaluationPagination(KeysetPagination):
+    ordering = ('-date',)
+
+
+class TermePagination(KeysetPagination):
+    ordering = ('terme',)
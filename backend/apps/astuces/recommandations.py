@@ -0,0 +1,157 @@
+"""
+Recommandations « vous aimerez aussi » calculées hors ligne : matrice creuse
+utilisateurs x astuces (favoris et évaluations positives), similarité cosinus
+entre astuces, puis score par utilisateur. Tout est stocké : l'API ne fait
+qu'une lecture par clé primaire.
+"""
+from array import array
+
+import numpy as np
+from scipy import sparse
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Evaluation, Favori, RecommandationsUtilisateur, VoisinsAstuce
+
+NOTE_POSITIVE = 4
+# Lissage du cosinus : deux astuces vues ensemble par 1 ou 2 personnes ne sont pas « proches »
+RETRAIT = 5.0
+CO_OCCURRENCES_MIN = 2
+
+
+# ========== MATRICE ==========
+def matrice_interactions():
+    """
+    (X, ids utilisateurs, ids astuces) : X binaire utilisateurs x astuces validées,
+    1 si l'utilisateur a mis l'astuce en favori ou l'a notée >= NOTE_POSITIVE.
+    """
+    lignes, colonnes = array('q'), array('q')
+    sources = (
+        Favori.objects.filter(astuce__valide=True).values_list('utilisateur_id', 'astuce_id'),
+        Evaluation.objects.filter(astuce__valide=True, note__gte=NOTE_POSITIVE).values_list('utilisateur_id', 'astuce_id'),
+    )
+    for queryset in sources:
+        for utilisateur_id, astuce_id in queryset.iterator(chunk_size=10000):
+            lignes.append(utilisateur_id)
+            colonnes.append(astuce_id)
+
+    utilisateurs, i = np.unique(np.frombuffer(lignes, dtype=np.int64), return_inverse=True)
+    astuces, j = np.unique(np.frombuffer(colonnes, dtype=np.int64), return_inverse=True)
+    X = sparse.csr_matrix(
+        (np.ones(len(i), dtype=np.float32), (i, j)),
+        shape=(len(utilisateurs), len(astuces)),
+    )
+    X.data[:] = 1.0  # favori + bonne note = une seule interaction
+    return X, utilisateurs, astuces
+
+
+def top_par_ligne(M, n):
+    """(ligne, indices, valeurs) des n plus grandes valeurs de chaque ligne d'une CSR."""
+    for ligne in range(M.shape[0]):
+        debut, fin = M.indptr[ligne], M.indptr[ligne + 1]
+        if debut == fin:
+            continue
+        valeurs = M.data[debut:fin]
+        indices = M.indices[debut:fin]
+        if len(valeurs) > n:
+            garder = np.argpartition(-valeurs, n - 1)[:n]
+            valeurs, indices = valeurs[garder], indices[garder]
+        ordre = np.argsort(-valeurs, kind='stable')
+        yield ligne, indices[ordre], valeurs[ordre]
+
+
+# ========== SIMILARITÉS ==========
+def similarites(X, k=50, taille_bloc=2000):
+    """
+    Matrice creuse astuces x astuces ne gardant que les k voisins les plus
+    proches de chaque astuce, cosinus lissé co / (sqrt(n_i n_j) + RETRAIT),
+    calculée par blocs de lignes pour borner la mémoire.
+    """
+    Xt = X.T.tocsr()
+    effectifs = np.asarray(Xt.getnnz(axis=1), dtype=np.float64)
+    nombre = Xt.shape[0]
+    lignes, colonnes, valeurs = [], [], []
+    for debut in range(0, nombre, taille_bloc):
+        co = (Xt[debut:debut + taille_bloc] @ X).tocsr()
+        rangs = np.repeat(np.arange(co.shape[0]), np.diff(co.indptr)) + debut
+        sim = co.data / (np.sqrt(effectifs[rangs] * effectifs[co.indices]) + RETRAIT)
+        sim[(co.data < CO_OCCURRENCES_MIN) | (co.indices == rangs)] = 0.0
+        co.data = sim.astype(np.float32)
+        co.eliminate_zeros()
+        for ligne, indices, scores in top_par_ligne(co, k):
+            lignes.append(np.full(len(indices), ligne + debut))
+            colonnes.append(indices)
+            valeurs.append(scores)
+
+    if not lignes:
+        return sparse.csr_matrix((nombre, nombre), dtype=np.float32)
+    return sparse.csr_matrix(
+        (np.concatenate(valeurs), (np.concatenate(lignes), np.concatenate(colonnes))),
+        shape=(nombre, nombre),
+    )
+
+
+# ========== CALCUL COMPLET ==========
+def calculer(k=50, n=50, taille_lot=5000, stdout=None):
+    """
+    Recalcule voisins et recommandations, enregistrés par lots (upsert),
+    puis supprime les lignes qui n'ont pas été renouvelées.
+    Renvoie (astuces avec voisins, utilisateurs avec recommandations).
+    """
+    debut = timezone.now()
+    X, utilisateurs, astuces = matrice_interactions()
+    if stdout:
+        stdout.write(f"Matrice {X.shape[0]} utilisateurs x {X.shape[1]} astuces, {X.nnz} interactions")
+    S = similarites(X, k)
+
+    voisins = [
+        VoisinsAstuce(astuce_id=int(astuces[ligne]), voisins=astuces[indices].tolist(), scores=scores.tolist())
+        for ligne, indices, scores in top_par_ligne(S, k)
+    ]
+    for position in range(0, len(voisins), taille_lot):
+        VoisinsAstuce.objects.bulk_create(
+            voisins[position:position + taille_lot],
+            update_conflicts=True, unique_fields=['astuce'], update_fields=['voisins', 'scores', 'date'],
+        )
+
+    nombre_utilisateurs = 0
+    for bloc in range(0, X.shape[0], taille_lot):
+        X_bloc = X[bloc:bloc + taille_lot]
+        R = (X_bloc @ S).tocsr()
+        # Ne pas recommander ce que l'utilisateur a déjà aimé
+        R = (R - R.multiply(X_bloc)).tocsr()
+        R.eliminate_zeros()
+        lignes = [
+            RecommandationsUtilisateur(
+                utilisateur_id=int(utilisateurs[bloc + ligne]),
+                astuces=astuces[indices].tolist(),
+                scores=scores.tolist(),
+            )
+            for ligne, indices, scores in top_par_ligne(R, n)
+        ]
+        RecommandationsUtilisateur.objects.bulk_create(
+            lignes, update_conflicts=True, unique_fields=['utilisateur'], update_fields=['astuces', 'scores', 'date'],
+        )
+        nombre_utilisateurs += len(lignes)
+
+    with transaction.atomic():
+        VoisinsAstuce.objects.filter(date__lt=debut).delete()
+        RecommandationsUtilisateur.objects.filter(date__lt=debut).delete()
+    return len(voisins), nombre_utilisateurs
+
+
+# ========== LECTURE ==========
+def astuces_recommandees(utilisateur_id, exclure=(), limite=20):
+    """
+    Ids recommandés pour un utilisateur (une lecture par clé primaire), sans
+    ceux de `exclure` (favoris ajoutés depuis le calcul). Liste vide si
+    l'utilisateur n'a pas encore assez d'interactions.
+    """
+    ids = (
+        RecommandationsUtilisateur.objects.filter(pk=utilisateur_id)
+        .values_list('astuces', flat=True)
+        .first()
+    ) or []
+    exclure = set(exclure)
+    return [pk for pk in ids if pk not in exclure][:limite]
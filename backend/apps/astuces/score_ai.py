@@ -0,0 +1,182 @@
+"""
+Score de qualité « IA » des astuces et propositions, calculé hors ligne par
+lots : caractéristiques extraites en numpy, prédiction par un modèle local
+interchangeable (SCORE_AI_MODELE), répartie sur un pool de processus.
+Les fonctions des travailleurs n'utilisent ni l'ORM ni les settings.
+"""
+import hashlib
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from django.utils.module_loading import import_string
+
+COLONNES = (
+    'longueur_titre', 'mots_description', 'source', 'source_url',
+    'termes', 'densite_termes', 'categories',
+)
+
+
+# ========== CARACTÉRISTIQUES ==========
+def caracteristiques(titres, descriptions, sources, termes, categories):
+    """Matrice (n, len(COLONNES)) en float32, une ligne par texte."""
+    mots = np.fromiter((len((d or '').split()) for d in descriptions), dtype=np.float32, count=len(descriptions))
+    sources = np.array([(s or '').strip().lower() for s in sources], dtype=object)
+    termes = np.asarray(termes, dtype=np.float32)
+    return np.column_stack([
+        np.log1p(np.fromiter((len(t or '') for t in titres), dtype=np.float32, count=len(titres))),
+        np.log1p(mots),
+        (sources != '').astype(np.float32),
+        np.fromiter((s.startswith(('http://', 'https://')) for s in sources), dtype=np.float32, count=len(sources)),
+        termes,
+        # Termes du dictionnaire pour 100 mots
+        100 * termes / np.maximum(mots, 1),
+        np.asarray(categories, dtype=np.float32),
+    ]).astype(np.float32)
+
+
+# ========== MODÈLES ==========
+class ModeleHeuristique:
+    """
+    Modèle par défaut : combinaison linéaire des caractéristiques passée dans
+    une sigmoïde, score de 0 à 100. Un modèle local remplace cette classe
+    s'il expose `version` et `predire(matrice) -> scores`.
+    """
+    version = 'heuristique-1'
+    poids = np.array([0.4, 0.6, 0.8, 0.4, 0.3, 0.2, 0.3], dtype=np.float32)
+    biais = -4.0
+
+    def predire(self, matrice):
+        # Densité plafonnée : une liste de termes sans texte n'est pas une bonne astuce
+        matrice = matrice.copy()
+        matrice[:, COLONNES.index('densite_termes')] = np.minimum(matrice[:, COLONNES.index('densite_termes')], 10)
+        return 100 / (1 + np.exp(-(matrice @ self.poids + self.biais)))
+
+
+class ModeleFichier:
+    """
+    Estimateur scikit-learn sauvegardé avec joblib (SCORE_AI_FICHIER), entraîné
+    sur les colonnes COLONNES ; la version suit le contenu du fichier.
+    """
+    version = 'fichier'
+    fichier = None
+
+    def __init__(self):
+        import joblib
+
+        self.estimateur = joblib.load(self.fichier)
+
+    def predire(self, matrice):
+        if hasattr(self.estimateur, 'predict_proba'):
+            return 100 * self.estimateur.predict_proba(matrice)[:, 1]
+        return self.estimateur.predict(matrice)
+
+
+def _empreinte_fichier(fichier):
+    """12 premiers caractères du SHA-256 : un modèle réentraîné sous le même nom change de version."""
+    condensat = hashlib.sha256()
+    with open(fichier, 'rb') as flux:
+        for bloc in iter(lambda: flux.read(1 << 20), b''):
+            condensat.update(bloc)
+    return condensat.hexdigest()[:12]
+
+
+def charger_modele(chemin, fichier=None):
+    """Classe du modèle désigné par son chemin Python (et son fichier pour ModeleFichier)."""
+    classe = import_string(chemin)
+    if fichier and issubclass(classe, ModeleFichier):
+        classe = type(classe.__name__, (classe,), {'fichier': fichier, 'version': f'fichier-{_empreinte_fichier(fichier)}'})
+    return classe
+
+
+# ========== TRAVAILLEURS ==========
+_modele = None
+
+
+def _initialiser(chemin, fichier):
+    global _modele
+    _modele = charger_modele(chemin, fichier)()
+
+
+def _scorer(lot):
+    ids, titres, descriptions, sources, termes, categories = zip(*lot)
+    scores = _modele.predire(caracteristiques(titres, descriptions, sources, termes, categories))
+    return list(ids), np.clip(np.nan_to_num(scores), 0, 100).astype(np.float64).round(1).tolist()
+
+
+def _lots(lignes, taille):
+    lot = []
+    for ligne in lignes:
+        lot.append(ligne)
+        if len(lot) >= taille:
+            yield lot
+            lot = []
+    if lot:
+        yield lot
+
+
+# ========== CALCUL ==========
+def scorer(travailleurs=None, taille_lot=500, tout=False, stdout=None):
+    """
+    Score les propositions en attente puis les astuces dont le score n'est
+    pas à la version courante du modèle (toutes avec `tout`), écrit par
+    bulk_update. Au plus deux lots par processus sont en vol : la lecture
+    (curseur serveur) suit le rythme du pool. Renvoie {modèle: nombre}.
+    """
+    from django.conf import settings
+    from django.db.models import Count
+    from django.utils import timezone
+
+    from .cache import invalider_contenu
+    from .models import Astuce, Proposition
+
+    chemin = getattr(settings, 'SCORE_AI_MODELE', 'apps.astuces.score_ai.ModeleHeuristique')
+    fichier = getattr(settings, 'SCORE_AI_FICHIER', '') or None
+    version = charger_modele(chemin, fichier).version
+    travailleurs = travailleurs or getattr(settings, 'SCORE_AI_TRAVAILLEURS', None) or os.cpu_count() or 1
+
+    jeux = (
+        (Proposition, Proposition.objects.filter(statut__in=('en_attente', 'en_revision'))),
+        (Astuce, Astuce.objects.all()),
+    )
+    resultat = {}
+    with ProcessPoolExecutor(travailleurs, initializer=_initialiser, initargs=(chemin, fichier)) as pool:
+        for modele, queryset in jeux:
+            if not tout:
+                queryset = queryset.exclude(score_ai_version=version)
+            lignes = queryset.annotate(
+                nombre_termes=Count('termes', distinct=True),
+                nombre_categories=Count('categories', distinct=True),
+            ).order_by('id').values_list(
+                'id', 'titre', 'description', 'source', 'nombre_termes', 'nombre_categories',
+            ).iterator(chunk_size=taille_lot)
+
+            en_vol, nombre = deque(), 0
+            lots = _lots(lignes, taille_lot)
+            while True:
+                for lot in lots:
+                    en_vol.append(pool.submit(_scorer, lot))
+                    if len(en_vol) >= 2 * travailleurs:
+                        break
+                if not en_vol:
+                    break
+                ids, scores = en_vol.popleft().result()
+                # bulk_update ne passe pas par auto_now : la synchro et les ETag doivent voir le nouveau score
+                maintenant = timezone.now()
+                modele.objects.bulk_update(
+                    [
+                        modele(pk=pk, score_ai=score, score_ai_version=version, date_modification=maintenant)
+                        for pk, score in zip(ids, scores)
+                    ],
+                    ['score_ai', 'score_ai_version', 'date_modification'],
+                )
+                nombre += len(ids)
+            resultat[modele.__name__] = nombre
+            if stdout:
+                stdout.write(f"{modele.__name__} : {nombre} score(s) ({version})")
+
+    if resultat.get('Astuce'):
+        invalider_contenu()
+    return resultat
@@ -0,0 +1,70 @@
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db.models import F, OuterRef, Subquery, TextField, Value
+from django.db.models.functions import Coalesce
+from rest_framework import filters
+
+# Configuration créée par la migration 0007 (french + unaccent)
+CONFIG = 'french_unaccent'
+
+# Part du score de fiabilité (0-100) dans le classement final
+POIDS_FIABILITE = 0.3
+
+
+def vecteur_astuce():
+    """
+    Expression du vecteur plein texte d'une astuce : titre (A), noms des
+    termes liés (B) et description (C).
+    """
+    from .models import Terme
+
+    termes = (
+        Terme.objects.filter(astuces=OuterRef('pk'))
+        .values('astuces')
+        .annotate(noms=StringAgg('terme', delimiter=' '))
+        .values('noms')
+    )
+    return (
+        SearchVector('titre', weight='A', config=CONFIG)
+        + SearchVector(Coalesce(Subquery(termes), Value(''), output_field=TextField()), weight='B', config=CONFIG)
+        + SearchVector('description', weight='C', config=CONFIG)
+    )
+
+
+def mettre_a_jour_vecteurs(astuce_ids):
+    """Recalcule le vecteur des astuces données en un seul UPDATE."""
+    from .models import Astuce
+
+    astuce_ids = list(astuce_ids)
+    if astuce_ids:
+        Astuce.objects.filter(pk__in=astuce_ids).update(search_vector=vecteur_astuce())
+
+
+def requete(mots_cles):
+    return SearchQuery(mots_cles, search_type='websearch', config=CONFIG)
+
+
+def rechercher_astuces(queryset, mots_cles):
+    """
+    Filtre par l'index GIN et annote `pertinence` : rang plein texte
+    (normalisé entre 0 et 1) mêlé au score de fiabilité.
+    """
+    query = requete(mots_cles)
+    rang = SearchRank(F('search_vector'), query, normalization=32)
+    fiabilite = F('score_fiabilite') / 100.0
+    return queryset.filter(search_vector=query).annotate(
+        pertinence=(1 - POIDS_FIABILITE) * rang + POIDS_FIABILITE * fiabilite
+    )
+
+
+class FullTextSearchFilter(filters.SearchFilter):
+    """
+    Remplace les `icontains` du SearchFilter par une recherche dans
+    Astuce.search_vector. L'ordre de la vue n'est pas modifié.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        mots_cles = request.query_params.get(self.search_param, '').strip()
+        if not mots_cles:
+            return queryset
+        return queryset.filter(search_vector=requete(mots_cles))
@@ -1,5 +1,9 @@
 from rest_framework import serializers
 from .models import Astuce, Categorie, Proposition, Validation, Evaluation, Favori, Recherche , Terme
+from .favoris import favoris_utilisateur
+from .images import urls_variantes
+from .media import url_media
+from .doublons import doublons_probables
 from django.conf import settings
 from django.contrib.auth import get_user_model
 import json
@@ -69,6 +73,7 @@ class AstuceSerializer(serializers.ModelSerializer):
     termes = TermeSerializer(many=True, read_only=True)
     est_favori = serializers.SerializerMethodField()
     image_url = serializers.SerializerMethodField()
+    image_variantes = serializers.SerializerMethodField()
     average_rating = serializers.SerializerMethodField()
     
     class Meta:
@@ -77,7 +82,7 @@ class AstuceSerializer(serializers.ModelSerializer):
             'id', 'titre', 'description', 'source', 'date_publication',
             'niveau_difficulte', 'valide', 'date_validation', 'score_ai',
             'score_fiabilite', 'nombre_votes', 'createur', 'categories',
-            'termes', 'est_favori', 'image', 'image_url', 'average_rating'
+            'termes', 'est_favori', 'image', 'image_url', 'image_variantes', 'average_rating'
         ]
 
     read_only_fields = ['id', 'date_publication', 'valide', 'date_validation',
@@ -87,14 +92,21 @@ class AstuceSerializer(serializers.ModelSerializer):
     def get_est_favori(self, obj):
         request = self.context.get('request')
         if request and request.user.is_authenticated:
-            return obj.favorited_by.filter(id=request.user.id).exists()
+            # Ensemble des favoris mis en cache par utilisateur (apps.astuces.favoris),
+            # lu une fois par réponse puis partagé via le contexte
+            favoris_ids = self.context.get('favoris_ids')
+            if favoris_ids is None:
+                favoris_ids = set(favoris_utilisateur(request.user.pk)[1])
+                self.context['favoris_ids'] = favoris_ids
+            return obj.id in favoris_ids
         return False
     
     def get_image_url(self, obj):
         if obj.image:
             request = self.context.get('request')
             if request:
-                url = request.build_absolute_uri(obj.image.url)
+                # Astuce non validée : URL signée pour son créateur ou un modérateur
+                url = url_media(obj.image.name, request, prive=not obj.valide)
                 print(f"🖼️  Astuce {obj.id} image_url: {url}")
                 return url
             # Fallback: construire l'URL absolue même sans request
@@ -106,11 +118,13 @@ class AstuceSerializer(serializers.ModelSerializer):
                 return f"http://192.168.137.1:8000/media/{image_path}"
         return None
     
+    def get_image_variantes(self, obj):
+        """Miniature, moyenne et WebP avec srcset ; None tant qu'elles ne sont pas calculées"""
+        return urls_variantes(obj.image_variantes, self.context.get('request'), prive=not obj.valide)
+
     def get_average_rating(self, obj):
-        """Calculate average rating from evaluations"""
-        from django.db.models import Avg
-        avg = obj.evaluations.aggregate(Avg('note'))['note__avg']
-        return avg if avg else 0.0
+        """Average rating, read from the aggregates stored on the astuce"""
+        return obj.moyenne_note
 
 class PropositionSerializer(serializers.ModelSerializer):
     utilisateur = serializers.StringRelatedField(read_only=True)
@@ -137,6 +151,7 @@ class PropositionSerializer(serializers.ModelSerializer):
     
     statut_display = serializers.CharField(source='get_statut_display', read_only=True)
     image_url = serializers.SerializerMethodField()
+    image_variantes = serializers.SerializerMethodField()
     
     class Meta:
         model = Proposition
@@ -145,10 +160,11 @@ class PropositionSerializer(serializers.ModelSerializer):
             'categories', 'categories_ids' , 
             'date', 'date_modification', 'statut', 'commentaire_moderation',
             'utilisateur', 'astuce' ,'termes', 'termes_ids', 'nouveaux_termes','statut_display',
-            'image', 'image_url'
+            'image', 'image_url', 'image_variantes', 'score_ai', 'doublons',
+            'reservee_par', 'reservee_jusqua'
         ]
         read_only_fields = [
-            'date', 'date_modification', 'statut',
+            'date', 'date_modification', 'statut', 'score_ai', 'doublons', 'reservee_par', 'reservee_jusqua',
             'commentaire_moderation', 'utilisateur', 'astuce', 'image_url'
         ]
     
@@ -156,7 +172,7 @@ class PropositionSerializer(serializers.ModelSerializer):
         if obj.image:
             request = self.context.get('request')
             if request:
-                url = request.build_absolute_uri(obj.image.url)
+                url = url_media(obj.image.name, request, prive=True)
                 print(f"🖼️  Proposition {obj.id} image_url: {url}")
                 return url
             # Fallback: construire l'URL absolue même sans request
@@ -166,14 +182,21 @@ class PropositionSerializer(serializers.ModelSerializer):
             else:
                 return f"http://192.168.137.1:8000/media/{image_path}"
         return None
+
+    def get_image_variantes(self, obj):
+        return urls_variantes(obj.image_variantes, self.context.get('request'), prive=True)
+
     def create(self, validated_data):
         # Extraire les données des champs write-only
         categories_ids = validated_data.pop('categories_ids', [])  # Liste d'IDs
         termes_data = validated_data.pop('termes', [])  # Vient de termes_ids
         nouveaux_termes_data = validated_data.pop('nouveaux_termes', [])
         
+        # Quasi-doublons (index MinHash/LSH), signalés aux modérateurs
+        doublons = doublons_probables(validated_data.get('titre', ''), validated_data.get('description', ''))
+        
         # Créer la proposition
-        proposition = Proposition.objects.create(**validated_data)
+        proposition = Proposition.objects.create(**validated_data, doublons=doublons)
         
         # Ajouter les catégories par IDs
         if categories_ids:
@@ -218,6 +241,8 @@ class EvaluationSerializer(serializers.ModelSerializer):
         model = Evaluation
         fields = ['id', 'note', 'fiabilite_percue', 'commentaire', 'date', 'utilisateur', 'astuce']
         read_only_fields = ['date', 'utilisateur','astuce']
+        # La note alimente l'histogramme notes_1..notes_5 de l'astuce
+        extra_kwargs = {'note': {'min_value': 1, 'max_value': 5}}
 
 class FavoriSerializer(serializers.ModelSerializer):
     utilisateur = serializers.StringRelatedField(read_only=True)
@@ -0,0 +1,197 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .cache import invalider_contenu
+from .doublons import signer_astuce, signer_proposition
+from .favoris import invalider_favoris
+from .images import planifier_variantes
+from .models import Astuce, AstuceSupprimee, Categorie, Evaluation, Favori, ImageAstuce, InteractionModifiee, Proposition, Terme
+from .search import mettre_a_jour_vecteurs
+from .suggestions import index_suggestions
+
+CHAMPS_INDEXES = {'titre', 'description'}
+CHAMPS_SIGNATURE = {'titre', 'description', 'valide', 'statut'}
+
+
+# ========== VECTEUR DE RECHERCHE ==========
+@receiver(post_save, sender=Astuce)
+def indexer_astuce(sender, instance, created, update_fields=None, **kwargs):
+    if update_fields is not None and not CHAMPS_INDEXES & set(update_fields):
+        return
+    mettre_a_jour_vecteurs([instance.pk])
+
+
+def _astuces_concernees(instance, action, reverse, pk_set):
+    """
+    Ids des astuces touchées par un m2m_changed sur categories/termes, quel
+    que soit le côté de la relation. None pour les actions « pre_* ».
+    """
+    if not reverse:
+        # astuce.termes.add/remove/set/clear
+        return [instance.pk] if action in ('post_add', 'post_remove', 'post_clear') else None
+
+    # terme.astuces.add/remove/clear : pk_set contient des ids d'astuces
+    if action == 'pre_clear':
+        instance._astuces_avant_clear = list(instance.astuces.values_list('pk', flat=True))
+    elif action == 'post_clear':
+        return getattr(instance, '_astuces_avant_clear', [])
+    elif action in ('post_add', 'post_remove'):
+        return pk_set or []
+    return None
+
+
+@receiver(m2m_changed, sender=Astuce.termes.through)
+def indexer_termes_astuce(sender, instance, action, reverse, pk_set, **kwargs):
+    astuce_ids = _astuces_concernees(instance, action, reverse, pk_set)
+    if astuce_ids:
+        mettre_a_jour_vecteurs(astuce_ids)
+
+
+@receiver(post_save, sender=Terme)
+def indexer_astuces_du_terme(sender, instance, created, **kwargs):
+    if not created:
+        mettre_a_jour_vecteurs(instance.astuces.values_list('pk', flat=True))
+
+
+# ========== DATE DE MODIFICATION ==========
+# auto_now ne couvre que save() : les relations et renommages la mettent à jour ici
+@receiver(m2m_changed, sender=Astuce.categories.through)
+@receiver(m2m_changed, sender=Astuce.termes.through)
+def dater_relations_astuce(sender, instance, action, reverse, pk_set, **kwargs):
+    astuce_ids = _astuces_concernees(instance, action, reverse, pk_set)
+    if astuce_ids:
+        Astuce.objects.filter(pk__in=astuce_ids).update(date_modification=timezone.now())
+
+
+@receiver(post_save, sender=Categorie)
+@receiver(post_save, sender=Terme)
+def dater_astuces_renommage(sender, instance, created, **kwargs):
+    if not created:
+        instance.astuces.update(date_modification=timezone.now())
+
+
+# ========== QUASI-DOUBLONS ==========
+@receiver(post_save, sender=Astuce)
+@receiver(post_save, sender=Proposition)
+def signature_texte(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and not CHAMPS_SIGNATURE & set(update_fields):
+        return
+    if sender is Astuce:
+        signer_astuce(instance)
+    else:
+        signer_proposition(instance)
+
+
+# ========== SYNCHRONISATION ==========
+@receiver(post_delete, sender=Astuce)
+def enregistrer_suppression(sender, instance, **kwargs):
+    AstuceSupprimee.objects.create(astuce_id=instance.pk)
+
+
+# ========== INDEX DE SUGGESTIONS ==========
+# Tant que l'index n'a pas été construit dans ce processus, rien à maintenir.
+# Les mises à jour attendent le commit : une création ou une validation
+# annulée ne laisse pas de suggestion fantôme jusqu'à la reconstruction.
+def _indexer_termes(termes):
+    index_suggestions.ajouter_lot([('terme', terme.pk, terme.terme, 0) for terme in termes])
+
+
+@receiver(post_save, sender=Astuce)
+def suggestions_astuce(sender, instance, **kwargs):
+    if not index_suggestions.construit:
+        return
+    pk, titre, poids, valide = instance.pk, instance.titre, instance.nombre_votes, instance.valide
+
+    def appliquer():
+        if valide:
+            nouvelle = not index_suggestions.contient('astuce', pk)
+            index_suggestions.ajouter('astuce', pk, titre, poids)
+            if nouvelle:
+                _indexer_termes(Terme.objects.filter(astuces=pk))
+        else:
+            index_suggestions.retirer('astuce', pk)
+    transaction.on_commit(appliquer)
+
+
+@receiver(post_delete, sender=Astuce)
+def suggestions_astuce_supprimee(sender, instance, **kwargs):
+    if index_suggestions.construit:
+        pk = instance.pk
+        transaction.on_commit(lambda: index_suggestions.retirer('astuce', pk))
+
+
+@receiver(m2m_changed, sender=Astuce.termes.through)
+def suggestions_termes_astuce(sender, instance, action, reverse, pk_set, **kwargs):
+    if not index_suggestions.construit or action != 'post_add':
+        return
+    ids = set(pk_set)
+
+    def appliquer():
+        if reverse:
+            if Astuce.objects.filter(pk__in=ids, valide=True).exists():
+                _indexer_termes([instance])
+        elif Astuce.objects.filter(pk=instance.pk, valide=True).exists():
+            _indexer_termes(Terme.objects.filter(pk__in=ids))
+    transaction.on_commit(appliquer)
+
+
+@receiver(post_save, sender=Terme)
+def suggestions_terme(sender, instance, created, **kwargs):
+    if not index_suggestions.construit:
+        return
+
+    def appliquer():
+        if index_suggestions.contient('terme', instance.pk) or instance.astuces.filter(valide=True).exists():
+            _indexer_termes([instance])
+    transaction.on_commit(appliquer)
+
+
+# ========== CACHE DES RÉPONSES ANONYMES ==========
+@receiver(post_save, sender=Astuce)
+@receiver(post_delete, sender=Astuce)
+@receiver(post_save, sender=Categorie)
+@receiver(post_delete, sender=Categorie)
+@receiver(post_save, sender=Terme)
+@receiver(post_delete, sender=Terme)
+def invalider_cache(sender, **kwargs):
+    invalider_contenu()
+
+
+@receiver(m2m_changed, sender=Astuce.categories.through)
+@receiver(m2m_changed, sender=Astuce.termes.through)
+def invalider_cache_relations(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        invalider_contenu()
+
+
+# ========== FAVORIS ==========
+@receiver(post_save, sender=Favori)
+@receiver(post_delete, sender=Favori)
+def invalider_cache_favoris(sender, instance, **kwargs):
+    invalider_favoris(instance.utilisateur_id)
+
+
+# ========== TENDANCES ==========
+@receiver(post_save, sender=Evaluation)
+@receiver(post_delete, sender=Evaluation)
+@receiver(post_delete, sender=Favori)
+def interaction_modifiee(sender, instance, created=False, **kwargs):
+    # Les créations sont lues par le calcul des tendances sur leur clé primaire
+    if not created:
+        InteractionModifiee.objects.create(utilisateur_id=instance.utilisateur_id, astuce_id=instance.astuce_id)
+
+
+# ========== VARIANTES DES IMAGES ==========
+@receiver(post_save, sender=Astuce)
+@receiver(post_save, sender=ImageAstuce)
+@receiver(post_save, sender=Proposition)
+def variantes_image(sender, instance, **kwargs):
+    planifier_variantes(instance, 'image')
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def variantes_avatar(sender, instance, **kwargs):
+    planifier_variantes(instance, 'avatar')
@@ -0,0 +1,211 @@
+"""
+Astuces similaires par le contenu : vecteurs TF-IDF (titre, description,
+catégories, termes) des astuces validées, k plus proches voisins au cosinus
+calculés hors ligne et stockés dans SimilairesAstuce. Le vectoriseur et la
+matrice sont gardés sur disque (SIMILAIRES_INDEX) pour n'indexer ensuite que
+les astuces nouvellement validées ou dont le texte a changé.
+"""
+import hashlib
+import os
+
+import joblib
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from django.conf import settings
+from django.contrib.postgres.aggregates import ArrayAgg
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .cache import invalider_contenu
+from .models import Astuce, SimilairesAstuce
+from .recommandations import top_par_ligne
+
+SCORE_MIN = 0.05  # en dessous, deux astuces ne partagent que des mots courants
+TAILLE_BLOC = 2000
+
+
+# ========== TEXTES ==========
+def _textes(queryset):
+    """(ids, textes) ; le titre compte double."""
+    lignes = queryset.annotate(
+        noms_categories=ArrayAgg('categories__nom', distinct=True, default=[]),
+        noms_termes=ArrayAgg('termes__terme', distinct=True, default=[]),
+    ).order_by('id').values_list('id', 'titre', 'description', 'noms_categories', 'noms_termes')
+    ids, textes = [], []
+    for pk, titre, description, categories, termes in lignes.iterator(chunk_size=2000):
+        ids.append(pk)
+        # ArrayAgg sur jointure externe : [None] quand l'astuce n'a ni catégorie ni terme
+        textes.append(' '.join(filter(None, [titre, titre, description, *categories, *termes])))
+    return np.array(ids, dtype=np.int64), textes
+
+
+def _empreinte(texte):
+    return hashlib.blake2b(texte.encode(), digest_size=16).hexdigest()
+
+
+def _vectoriseur(nombre):
+    # Petits corpus : garder tous les mots, sinon la coupe min_df/max_df vide le vocabulaire
+    grand = nombre >= 50
+    return TfidfVectorizer(
+        strip_accents='unicode', sublinear_tf=True, ngram_range=(1, 2),
+        min_df=2 if grand else 1, max_df=0.5 if grand else 1.0,
+        max_features=200000, dtype=np.float32,
+    )
+
+
+# ========== INDEX SUR DISQUE ==========
+def _chemin_index():
+    return getattr(settings, 'SIMILAIRES_INDEX', os.path.join(settings.BASE_DIR, 'var', 'similaires.joblib'))
+
+
+def charger_index():
+    """{'vectoriseur', 'matrice', 'ids'} ou None si aucun calcul complet n'a encore eu lieu."""
+    try:
+        return joblib.load(_chemin_index())
+    except FileNotFoundError:
+        return None
+
+
+def _sauver_index(vectoriseur, matrice, ids):
+    chemin = _chemin_index()
+    os.makedirs(os.path.dirname(chemin), exist_ok=True)
+    temporaire = f'{chemin}.{os.getpid()}.tmp'
+    joblib.dump({'vectoriseur': vectoriseur, 'matrice': matrice, 'ids': ids}, temporaire)
+    os.replace(temporaire, chemin)  # les lecteurs voient l'ancien ou le nouveau fichier, jamais un fichier partiel
+
+
+# ========== VOISINS ==========
+def _voisins(requetes, ids_requetes, matrice, ids, k):
+    """
+    {id: (ids voisins, scores)} des k plus proches voisins de chaque ligne de
+    `requetes` dans `matrice` (vecteurs normalisés : cosinus = produit scalaire).
+    """
+    resultat = {}
+    for debut in range(0, requetes.shape[0], TAILLE_BLOC):
+        bloc = (requetes[debut:debut + TAILLE_BLOC] @ matrice.T).tocsr()
+        lignes = np.repeat(np.arange(bloc.shape[0]), np.diff(bloc.indptr)) + debut
+        # Ni soi-même ni les voisins trop faibles
+        bloc.data[(ids[bloc.indices] == ids_requetes[lignes]) | (bloc.data < SCORE_MIN)] = 0.0
+        bloc.eliminate_zeros()
+        for ligne, indices, scores in top_par_ligne(bloc, k):
+            resultat[int(ids_requetes[debut + ligne])] = (ids[indices].tolist(), scores.tolist())
+    return resultat
+
+
+def _enregistrer(voisins, empreintes=None, taille_lot=5000):
+    """Upsert des listes ; l'empreinte n'est réécrite que pour les astuces revectorisées."""
+    lignes = [
+        SimilairesAstuce(astuce_id=pk, astuces=astuces, scores=scores, empreinte=(empreintes or {}).get(pk, ''))
+        for pk, (astuces, scores) in voisins.items()
+    ]
+    champs = ['astuces', 'scores', 'date'] + (['empreinte'] if empreintes is not None else [])
+    for position in range(0, len(lignes), taille_lot):
+        SimilairesAstuce.objects.bulk_create(
+            lignes[position:position + taille_lot],
+            update_conflicts=True, unique_fields=['astuce'], update_fields=champs,
+        )
+
+
+# ========== CALCULS ==========
+def indexer_tout(k=20):
+    """Réapprend le vocabulaire et recalcule tous les voisins. Renvoie le nombre d'astuces indexées."""
+    debut = timezone.now()
+    ids, textes = _textes(Astuce.objects.filter(valide=True))
+    if not textes:
+        SimilairesAstuce.objects.all().delete()
+        return 0
+    vectoriseur = _vectoriseur(len(textes))
+    try:
+        matrice = vectoriseur.fit_transform(textes).tocsr()
+    except ValueError:
+        # Vocabulaire vide (textes sans aucun mot)
+        return 0
+
+    # Une ligne même vide par astuce : sans voisin, elle n'est pas reprise au passage suivant
+    voisins = {pk: ([], []) for pk in ids.tolist()}
+    voisins.update(_voisins(matrice, ids, matrice, ids, k))
+    _enregistrer(voisins, dict(zip(ids.tolist(), map(_empreinte, textes))))
+    SimilairesAstuce.objects.filter(date__lt=debut).delete()
+    _sauver_index(vectoriseur, matrice, ids)
+    invalider_contenu()
+    return len(ids)
+
+
+def astuces_a_indexer():
+    """
+    Astuces validées sans voisins calculés, ou datées depuis le calcul : une
+    note date aussi l'astuce, l'empreinte du texte départage ensuite.
+    """
+    return Astuce.objects.filter(valide=True).filter(
+        Q(similaires__isnull=True) | Q(date_modification__gt=F('similaires__date'))
+    )
+
+
+def indexer_nouvelles(k=20):
+    """
+    Indexe seulement les astuces validées ou dont le texte a changé depuis le
+    dernier passage, avec le vocabulaire déjà appris : leurs voisins sont calculés et
+    elles sont ajoutées aux listes des astuces existantes dont elles entrent
+    dans le top k. Les astuces dévalidées sortent de la matrice ; les listes
+    qui les citent encore sont filtrées à la lecture jusqu'au prochain calcul
+    complet, qui rafraîchit aussi le vocabulaire.
+    """
+    index = charger_index()
+    if index is None:
+        return indexer_tout(k)
+    nouveaux_ids, textes = _textes(astuces_a_indexer())
+    if not textes:
+        return 0
+
+    # Texte inchangé (et toujours dans la matrice) : on date la ligne sans recalculer
+    empreintes = dict(zip(nouveaux_ids.tolist(), map(_empreinte, textes)))
+    connues = dict(SimilairesAstuce.objects.filter(pk__in=list(empreintes)).values_list('astuce_id', 'empreinte'))
+    presentes = set(index['ids'].tolist())
+    inchangees = {pk for pk, empreinte in empreintes.items() if connues.get(pk) == empreinte and pk in presentes}
+    if inchangees:
+        SimilairesAstuce.objects.filter(pk__in=list(inchangees)).update(date=timezone.now())
+        garder = ~np.isin(nouveaux_ids, list(inchangees))
+        nouveaux_ids, textes = nouveaux_ids[garder], [texte for texte, garde in zip(textes, garder) if garde]
+        if not textes:
+            return 0
+
+    vectoriseur = index['vectoriseur']
+    valides = np.fromiter(Astuce.objects.filter(valide=True).values_list('id', flat=True), dtype=np.int64)
+    garder = np.isin(index['ids'], valides) & ~np.isin(index['ids'], nouveaux_ids)
+    anciens, anciens_ids = index['matrice'][garder], index['ids'][garder]
+    nouveaux = vectoriseur.transform(textes).tocsr()
+    matrice = sparse.vstack([anciens, nouveaux], format='csr')
+    ids = np.concatenate([anciens_ids, nouveaux_ids])
+
+    voisins = {pk: ([], []) for pk in nouveaux_ids.tolist()}
+    voisins.update(_voisins(nouveaux, nouveaux_ids, matrice, ids, k))
+    _enregistrer(voisins, {pk: empreintes[pk] for pk in voisins})
+
+    # Astuces existantes : fusion des nouvelles venues dans leur liste
+    fusions = {}
+    candidats = _voisins(anciens, anciens_ids, nouveaux, nouveaux_ids, k)
+    actuels = SimilairesAstuce.objects.filter(pk__in=list(candidats)).values_list('astuce_id', 'astuces', 'scores')
+    for pk, astuces, scores in actuels.iterator(chunk_size=2000):
+        fusion = dict(zip(astuces, scores))
+        fusion.update(zip(*candidats[pk]))
+        meilleurs = sorted(fusion.items(), key=lambda element: -element[1])[:k]
+        if [pk_voisin for pk_voisin, _ in meilleurs] != astuces:
+            fusions[pk] = ([pk_voisin for pk_voisin, _ in meilleurs], [score for _, score in meilleurs])
+
+    _enregistrer(fusions)
+    _sauver_index(vectoriseur, matrice, ids)
+    invalider_contenu()
+    return len(nouveaux_ids)
+
+
+# ========== LECTURE ==========
+def astuces_similaires(astuce_id, limite=10):
+    """Ids des voisins stockés d'une astuce (une lecture par clé primaire)."""
+    ids = (
+        SimilairesAstuce.objects.filter(pk=astuce_id)
+        .values_list('astuces', flat=True)
+        .first()
+    ) or []
+    return ids[:limite]
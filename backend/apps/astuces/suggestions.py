@@ -0,0 +1,186 @@
+import bisect
+import heapq
+import re
+import threading
+import time
+import unicodedata
+
+from django.db import connection
+from django.db.models import Count, Q
+
+# Nombre maximal de suggestions renvoyées
+LIMITE_MAX = 20
+# Les préfixes courts correspondent à beaucoup d'entrées : leur top est mémorisé
+LONGUEUR_PREFIXE_MEMO = 3
+# Reconstruction complète périodique (poids, modifications faites par d'autres processus)
+INTERVALLE_RECONSTRUCTION = 600
+
+_MOT = re.compile(r'\w+')
+
+
+def normaliser(texte):
+    """Minuscules sans accents, espaces réduits."""
+    texte = unicodedata.normalize('NFKD', texte.lower())
+    texte = ''.join(c for c in texte if not unicodedata.combining(c))
+    return ' '.join(texte.split())
+
+
+def cles_de(libelle):
+    """Une clé par début de mot, pour qu'« energie » trouve « Économiser l'énergie »."""
+    texte = normaliser(libelle)
+    return {texte[m.start():] for m in _MOT.finditer(texte)}
+
+
+class IndexSuggestions:
+    """
+    Index de préfixes en mémoire (un par processus) : tableau trié de clés
+    parcouru avec bisect. Contient les titres des astuces validées et les
+    termes visibles (liés à une astuce validée), pondérés par popularité.
+    Une fois construit, il est reconstruit en arrière-plan quand il est
+    périmé : les requêtes continuent de lire l'ancien index.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()  # sérialise les écritures ; les lectures n'en prennent pas
+        self._construction = threading.Lock()  # une seule reconstruction à la fois
+        self._journal = None     # modifications reçues pendant une reconstruction
+        # (clés [(cle, type, id)] triées, {(type, id): (libelle, poids, cles)}, mémo) :
+        # remplacé d'un bloc à chaque écriture, jamais modifié sur place
+        self._etat = ([], {}, {})
+        self._construit_le = None
+
+    # ----- construction -----
+    def reconstruire(self):
+        from .models import Astuce, Terme
+
+        with self._lock:
+            self._journal = []
+        elements = {}
+        astuces = (
+            Astuce.objects.filter(valide=True)
+            .annotate(nb_favoris=Count('favorited_by', distinct=True))
+            .values_list('id', 'titre', 'nombre_votes', 'nb_favoris')
+        )
+        for pk, titre, votes, favoris in astuces.iterator(chunk_size=2000):
+            elements[('astuce', pk)] = (titre, votes + favoris, cles_de(titre))
+
+        termes = (
+            Terme.objects.annotate(nb_astuces=Count('astuces', filter=Q(astuces__valide=True), distinct=True))
+            .filter(nb_astuces__gt=0)
+            .values_list('id', 'terme', 'nb_astuces')
+        )
+        for pk, terme, nb in termes.iterator(chunk_size=2000):
+            elements[('terme', pk)] = (terme, nb, cles_de(terme))
+
+        cles = sorted(
+            (cle, type_, pk)
+            for (type_, pk), (_, _, cles_element) in elements.items()
+            for cle in cles_element
+        )
+        with self._lock:
+            self._etat = (cles, elements, {})
+            # Rejoue ce qui a pu échapper aux lectures ci-dessus
+            journal, self._journal = self._journal, None
+            for ajouts, retraits in journal:
+                self._appliquer(ajouts, retraits)
+            self._construit_le = time.monotonic()
+
+    def _reconstruire_en_fond(self):
+        try:
+            self.reconstruire()
+        finally:
+            connection.close()  # connexion propre à ce thread
+            self._construction.release()
+
+    def _verifier_fraicheur(self):
+        if self._construit_le is None:
+            # Rien à servir encore : les requêtes concurrentes attendent la première construction
+            with self._construction:
+                if self._construit_le is None:
+                    self.reconstruire()
+        elif time.monotonic() - self._construit_le > INTERVALLE_RECONSTRUCTION:
+            if self._construction.acquire(blocking=False):
+                threading.Thread(target=self._reconstruire_en_fond, name='suggestions', daemon=True).start()
+
+    @property
+    def construit(self):
+        return self._construit_le is not None
+
+    # ----- mises à jour incrémentales -----
+    def ajouter(self, type_, pk, libelle, poids=0):
+        self.ajouter_lot([(type_, pk, libelle, poids)])
+
+    def ajouter_lot(self, elements):
+        """[(type, id, libelle, poids)] en une seule copie de l'index."""
+        self._modifier(list(elements), [])
+
+    def retirer(self, type_, pk):
+        self._modifier([], [(type_, pk)])
+
+    def _modifier(self, ajouts, retraits):
+        with self._lock:
+            if self._journal is not None:
+                self._journal.append((ajouts, retraits))
+            self._appliquer(ajouts, retraits)
+
+    def _appliquer(self, ajouts, retraits):
+        """
+        Copie sur écriture, comme la reconstruction : une lecture en cours garde
+        l'ancien état entier, sans entrée décalée ni index hors limites.
+        """
+        cles, elements, _ = self._etat
+        elements = dict(elements)
+        retirees = set()
+        for type_, pk in retraits + [(type_, pk) for type_, pk, _, _ in ajouts]:
+            element = elements.pop((type_, pk), None)
+            if element is not None:
+                retirees.update((cle, type_, pk) for cle in element[2])
+        nouvelles = []
+        for type_, pk, libelle, poids in ajouts:
+            element = (libelle, poids, cles_de(libelle))
+            elements[(type_, pk)] = element
+            nouvelles.extend((cle, type_, pk) for cle in element[2])
+        if retirees:
+            cles = [cle for cle in cles if cle not in retirees]
+        self._etat = (list(heapq.merge(cles, sorted(nouvelles))), elements, {})
+
+    def contient(self, type_, pk):
+        return (type_, pk) in self._etat[1]
+
+    # ----- lecture -----
+    def suggerer(self, prefixe, limite=10):
+        self._verifier_fraicheur()
+        prefixe = normaliser(prefixe)
+        limite = max(1, min(limite, LIMITE_MAX))
+        if not prefixe:
+            return []
+
+        cles, elements, memos = self._etat
+        memo = len(prefixe) <= LONGUEUR_PREFIXE_MEMO
+        if memo and prefixe in memos:
+            return memos[prefixe][:limite]
+
+        candidats = {}
+        i = bisect.bisect_left(cles, (prefixe,))
+        while i < len(cles) and cles[i][0].startswith(prefixe):
+            _, type_, pk = cles[i]
+            element = elements.get((type_, pk))
+            if element is not None:
+                candidats[(type_, pk)] = element
+            i += 1
+
+        meilleurs = heapq.nlargest(
+            LIMITE_MAX if memo else limite,
+            candidats.items(),
+            key=lambda item: (item[1][1], -len(item[1][0])),
+        )
+        resultats = [
+            {'type': type_, 'id': pk, 'libelle': libelle}
+            for (type_, pk), (libelle, _, _) in meilleurs
+        ]
+        if memo:
+            memos[prefixe] = resultats
+        return resultats[:limite]
+
+
+index_suggestions = IndexSuggestions()
@@ -0,0 +1,101 @@
+import base64
+import json
+
+from django.db import connection
+from django.db.models import Q
+
+from .models import Astuce, AstuceSupprimee
+
+# Le curseur est le xid de la transaction qui a écrit la ligne (trigger de la
+# migration 0024), pas une date : une transaction longue peut commiter après
+# une plus récente. On ne livre que les lignes des transactions antérieures à
+# la plus ancienne encore active ; celles-là sont toutes terminées, aucune ne
+# peut plus apparaître derrière le curseur.
+LIMITE_DEFAUT = 200
+LIMITE_MAX = 1000
+
+
+class JetonInvalide(ValueError):
+    pass
+
+
+def encoder_jeton(position):
+    """position = {'m': [xid, id], 's': [xid, id]} (modifications, suppressions)"""
+    brut = json.dumps(position, separators=(',', ':')).encode('ascii')
+    return base64.urlsafe_b64encode(brut).decode('ascii').rstrip('=')
+
+
+def decoder_jeton(jeton):
+    if not jeton:
+        return {'m': None, 's': None}
+    try:
+        brut = base64.urlsafe_b64decode(jeton + '=' * (-len(jeton) % 4))
+        position = json.loads(brut)
+        for cle in ('m', 's'):
+            if position.get(cle) is not None:
+                transaction, pk = position[cle]
+                position[cle] = [int(transaction), int(pk)]
+        return {'m': position.get('m'), 's': position.get('s')}
+    except (ValueError, TypeError, KeyError):
+        raise JetonInvalide('Jeton de synchronisation invalide')
+
+
+def _borne():
+    """Plus ancien xid encore actif : les transactions antérieures sont toutes terminées."""
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT pg_snapshot_xmin(pg_current_snapshot())::text::bigint')
+        return cursor.fetchone()[0]
+
+
+def _apres(queryset, champ, position):
+    """Lignes strictement après (xid, id), dans l'ordre de l'index."""
+    if position is not None:
+        transaction, pk = position
+        queryset = queryset.filter(
+            Q(**{f'{champ}__gt': transaction}) | Q(**{champ: transaction, 'pk__gt': pk})
+        )
+    return queryset.order_by(champ, 'pk')
+
+
+def changements(jeton, limite=LIMITE_DEFAUT):
+    """
+    Astuces modifiées et supprimées depuis le jeton. Renvoie
+    (astuces validées à mettre à jour, ids à retirer, jeton suivant, encore).
+    Une astuce dévalidée est renvoyée comme pierre tombale.
+    """
+    position = decoder_jeton(jeton)
+    # Lue avant les lignes : tout ce qui est en dessous était déjà commité
+    borne = _borne()
+    initiale = position['m'] is None and position['s'] is None
+    if initiale:
+        # Première synchronisation : le client n'a rien à retirer, on part
+        # directement de la dernière suppression connue.
+        derniere = (
+            AstuceSupprimee.objects.filter(transaction__lt=borne)
+            .order_by('-transaction', '-pk').values_list('pk', 'transaction').first()
+        )
+        if derniere is not None:
+            position['s'] = [derniere[1], derniere[0]]
+
+    modifiees = list(
+        _apres(Astuce.objects.filter(transaction_modification__lt=borne), 'transaction_modification', position['m'])
+        .only('pk', 'valide', 'transaction_modification')[:limite + 1]
+    )
+    supprimees = list(
+        _apres(AstuceSupprimee.objects.filter(transaction__lt=borne), 'transaction', position['s'])
+        .values_list('pk', 'astuce_id', 'transaction')[:limite + 1]
+    )
+    encore = len(modifiees) > limite or len(supprimees) > limite
+    modifiees, supprimees = modifiees[:limite], supprimees[:limite]
+
+    if modifiees:
+        dernier = modifiees[-1]
+        position['m'] = [dernier.transaction_modification, dernier.pk]
+    if supprimees:
+        pk, _, transaction = supprimees[-1]
+        position['s'] = [transaction, pk]
+
+    a_jour = [astuce.pk for astuce in modifiees if astuce.valide]
+    retirees = [] if initiale else [astuce.pk for astuce in modifiees if not astuce.valide]
+    retirees += [astuce_id for _, astuce_id, _ in supprimees]
+    return a_jour, retirees, encoder_jeton(position), encore
@@ -0,0 +1,329 @@
+import math
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from .models import (
+    Astuce, ContributionTendance, Evaluation, Favori, InteractionModifiee, PointReprise, Recherche,
+    RechercheJournaliere,
+)
+from .suggestions import normaliser
+
+POINT_REPRISE = 'recherches_journalieres'
+# Le journal insère les recherches par lots, quelques secondes après leur date :
+# on laisse ce délai aux lignes récentes avant de les agréger.
+DELAI_DEFAUT = timedelta(minutes=1)
+
+
+# ========== AGRÉGATION ==========
+def _avant(lot, borne):
+    """
+    Lot (pk, _, date, ...) coupé à la première ligne trop récente : le point
+    de reprise ne doit jamais dépasser une ligne pas encore prise en compte.
+    """
+    for position, ligne in enumerate(lot):
+        if ligne[2] >= borne:
+            return lot[:position]
+    return lot
+
+
+def _ajouter(compteur):
+    """Upsert additif des (mots-clés, jour) : nombre = nombre + nouveaux."""
+    table = connection.ops.quote_name(RechercheJournaliere._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f"""
+            INSERT INTO {table} (mots_cles, jour, nombre) VALUES (%s, %s, %s)
+            ON CONFLICT (jour, mots_cles) DO UPDATE SET nombre = {table}.nombre + EXCLUDED.nombre
+            """,
+            [(mots_cles, jour, nombre) for (mots_cles, jour), nombre in compteur.items()],
+        )
+
+
+def agreger(taille_lot=10000, delai=DELAI_DEFAUT):
+    """
+    Replie les nouvelles lignes de Recherche (id > point de reprise) dans
+    RechercheJournaliere, lot par lot. Chaque lot et l'avancée du point de
+    reprise sont validés ensemble : un arrêt en cours de route ne compte
+    jamais deux fois. Renvoie le nombre de recherches traitées.
+    """
+    longueur = RechercheJournaliere._meta.get_field('mots_cles').max_length
+    borne = timezone.now() - delai
+    traitees = 0
+    while True:
+        with transaction.atomic():
+            # Le verrou sérialise les exécutions concurrentes (cron qui se chevauche)
+            point, _ = PointReprise.objects.select_for_update().get_or_create(nom=POINT_REPRISE)
+            lot = list(
+                Recherche.objects.filter(pk__gt=point.dernier_id)
+                .order_by('pk')
+                .values_list('pk', 'mots_cles', 'date')[:taille_lot]
+            )
+            lot = _avant(lot, borne)
+            if not lot:
+                return traitees
+
+            compteur = Counter()
+            for _, mots_cles, date in lot:
+                cle = normaliser(mots_cles)[:longueur]
+                if cle:
+                    compteur[(cle, timezone.localdate(date))] += 1
+            if compteur:
+                _ajouter(compteur)
+            point.dernier_id = lot[-1][0]
+            point.save(update_fields=['dernier_id', 'date'])
+        traitees += len(lot)
+
+
+# ========== TENDANCES ==========
+def tendances(jours=7, limite=10):
+    """
+    Recherches les plus fréquentes sur les `jours` derniers jours, avec le
+    nombre de la période précédente de même durée et l'évolution relative.
+    Lu dans l'agrégat quotidien et mis en cache (TENDANCES_TTL).
+    """
+    cle = f'astuces:tendances:{jours}:{limite}'
+    resultat = cache.get(cle)
+    if resultat is not None:
+        return resultat
+
+    aujourd_hui = timezone.localdate()
+    debut = aujourd_hui - timedelta(days=jours - 1)
+    debut_precedent = debut - timedelta(days=jours)
+    recentes = list(
+        RechercheJournaliere.objects.filter(jour__gte=debut)
+        .values('mots_cles')
+        .annotate(total=Sum('nombre'))
+        .order_by('-total', 'mots_cles')[:limite]
+    )
+    precedentes = dict(
+        RechercheJournaliere.objects.filter(
+            jour__gte=debut_precedent, jour__lt=debut,
+            mots_cles__in=[ligne['mots_cles'] for ligne in recentes],
+        )
+        .values('mots_cles')
+        .annotate(total=Sum('nombre'))
+        .values_list('mots_cles', 'total')
+    )
+
+    resultat = []
+    for ligne in recentes:
+        precedent = precedentes.get(ligne['mots_cles'], 0)
+        resultat.append({
+            'mots_cles': ligne['mots_cles'],
+            'nombre': ligne['total'],
+            'precedent': precedent,
+            'evolution': round((ligne['total'] - precedent) / precedent, 3) if precedent else None,
+        })
+    cache.set(cle, resultat, getattr(settings, 'TENDANCES_TTL', 900))
+    return resultat
+
+
+# ========== ASTUCES TENDANCE ==========
+# Décroissance avant : chaque événement ajoute poids * exp(λ (t - ÉPOQUE)) au
+# score stocké. Le score décru à l'instant T vaut score * exp(-λ (T - ÉPOQUE)),
+# facteur commun à toutes les astuces : trier sur la colonne revient à trier
+# sur la popularité décroissante, sans jamais réécrire les lignes inactives.
+# L'époque est stockée en base (champ date du point de reprise EPOQUE) : quand
+# l'exposant approche des limites du float, les scores sont renormalisés et
+# l'époque avance ; --reconstruire repart de zéro avec l'époque à maintenant.
+# Un utilisateur contribue une fois par astuce (ContributionTendance, favori et
+# note réunis) : un favori retiré puis remis remplace sa contribution, une note
+# modifiée ou supprimée la recalcule.
+EPOQUE = 'tendance_epoque'
+# exp(50) ~ 5e21 : loin du débordement (exp(709)), même pour des milliers d'événements
+EXPOSANT_MAX = 50.0
+POIDS_FAVORI = 3.0
+# Une note de 1 ou 2 ne rend pas une astuce tendance
+POIDS_NOTES = {1: 0.0, 2: 0.0, 3: 0.5, 4: 1.5, 5: 2.0}
+# point de reprise des créations: (modèle, champ de la note ou None pour un poids fixe)
+SOURCES_TENDANCE = {
+    'tendance_evaluations': (Evaluation, 'note'),
+    'tendance_favoris': (Favori, None),
+}
+
+
+def _lambda():
+    return math.log(2) / (getattr(settings, 'TENDANCE_DEMI_VIE_HEURES', 72) * 3600)
+
+
+def _poids(note):
+    return POIDS_FAVORI if note is None else POIDS_NOTES.get(note, 0.0)
+
+
+def _epoque(maintenant):
+    """
+    Époque courante, verrouillée jusqu'à la fin de la transaction. Au-delà de
+    EXPOSANT_MAX, tous les scores sont multipliés par exp(-λ (maintenant - époque))
+    et l'époque passe à maintenant : mêmes scores décrus, même ordre.
+    """
+    point, _ = PointReprise.objects.select_for_update().get_or_create(nom=EPOQUE)
+    exposant = _lambda() * (maintenant - point.date).total_seconds()
+    if exposant > EXPOSANT_MAX:
+        Astuce.objects.exclude(score_tendance=0).update(score_tendance=F('score_tendance') * math.exp(-exposant))
+        # update() : auto_now mettrait l'heure de l'écriture, pas celle du facteur appliqué
+        PointReprise.objects.filter(pk=point.pk).update(date=maintenant)
+        return maintenant
+    return point.date
+
+
+def score_actuel(score_stocke, maintenant=None):
+    """Score décru à l'instant présent (pour affichage, pas pour trier)."""
+    maintenant = maintenant or timezone.now()
+    epoque = PointReprise.objects.filter(nom=EPOQUE).values_list('date', flat=True).first() or maintenant
+    return score_stocke * math.exp(-_lambda() * (maintenant - epoque).total_seconds())
+
+
+# ========== CONTRIBUTIONS ==========
+def _par_couple(modele, colonnes, couples):
+    """Lignes (utilisateur_id, astuce_id, *colonnes) de `modele` pour ces couples (jointure sur VALUES)."""
+    table = connection.ops.quote_name(modele._meta.db_table)
+    valeurs = ', '.join(['(%s, %s)'] * len(couples))
+    selection = ', '.join(f't.{colonne}' for colonne in colonnes)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            SELECT t.utilisateur_id, t.astuce_id, {selection} FROM {table} t
+            JOIN (VALUES {valeurs}) AS v(utilisateur_id, astuce_id)
+            ON t.utilisateur_id = v.utilisateur_id AND t.astuce_id = v.astuce_id
+            """,
+            [valeur for couple in couples for valeur in couple],
+        )
+        return cursor.fetchall()
+
+
+def _log_poids(couples):
+    """
+    {(utilisateur, astuce): log(somme des poids * exp(λ t))} d'après les
+    favoris et évaluations existants ; absent si le couple ne pèse rien.
+    """
+    termes = defaultdict(list)
+    for modele, champ_note in SOURCES_TENDANCE.values():
+        colonnes = ('date',) + ((champ_note,) if champ_note else ())
+        for utilisateur_id, astuce_id, date, *note in _par_couple(modele, colonnes, couples):
+            valeur = _poids(note[0] if note else None)
+            if valeur:
+                termes[utilisateur_id, astuce_id].append(math.log(valeur) + _lambda() * date.timestamp())
+    # log-somme-exp : un favori et une note du même couple en une contribution
+    resultat = {}
+    for couple, logs in termes.items():
+        plus_grand = max(logs)
+        resultat[couple] = plus_grand + math.log(sum(math.exp(x - plus_grand) for x in logs))
+    return resultat
+
+
+def _incrementer_scores(increments):
+    table = connection.ops.quote_name(Astuce._meta.db_table)
+    valeurs = ', '.join(['(%s, %s)'] * len(increments))
+    with connection.cursor() as cursor:
+        # GREATEST : les retraits successifs ne laissent pas d'arrondi négatif
+        cursor.execute(
+            f"""
+            UPDATE {table} a SET score_tendance = GREATEST(a.score_tendance + v.increment, 0)
+            FROM (VALUES {valeurs}) AS v(id, increment)
+            WHERE a.id = v.id
+            """,
+            [valeur for paire in increments.items() for valeur in paire],
+        )
+
+
+def _recompter(couples, epoque):
+    """Remplace la contribution enregistrée de chaque couple par celle de l'état actuel."""
+    couples = list(couples)
+    decalage = _lambda() * epoque.timestamp()
+    anciennes = {
+        (utilisateur_id, astuce_id): (pk, log_poids)
+        for utilisateur_id, astuce_id, pk, log_poids in _par_couple(ContributionTendance, ('id', 'log_poids'), couples)
+    }
+    nouvelles = _log_poids(couples)
+
+    increments = defaultdict(float)
+    for couple in couples:
+        ancienne, nouvelle = anciennes.get(couple), nouvelles.get(couple)
+        increment = (math.exp(nouvelle - decalage) if nouvelle is not None else 0.0) - (
+            math.exp(ancienne[1] - decalage) if ancienne else 0.0
+        )
+        if increment:
+            increments[couple[1]] += increment
+
+    ContributionTendance.objects.filter(
+        pk__in=[pk for couple, (pk, _) in anciennes.items() if couple not in nouvelles]
+    ).delete()
+    ContributionTendance.objects.bulk_create(
+        [
+            ContributionTendance(utilisateur_id=utilisateur_id, astuce_id=astuce_id, log_poids=log_poids)
+            for (utilisateur_id, astuce_id), log_poids in nouvelles.items()
+        ],
+        update_conflicts=True, unique_fields=['utilisateur', 'astuce'], update_fields=['log_poids'],
+    )
+    if increments:
+        _incrementer_scores(increments)
+
+
+# ========== CALCUL ==========
+def mettre_a_jour_tendances(taille_lot=5000, delai=DELAI_DEFAUT):
+    """
+    Recompte les couples (utilisateur, astuce) touchés depuis le dernier
+    passage : évaluations et favoris créés (un point de reprise par source,
+    avancé dans la transaction du lot) et interactions modifiées ou retirées
+    (InteractionModifiee, vidée au fur et à mesure). Renvoie le nombre
+    d'événements pris en compte.
+    """
+    borne = timezone.now() - delai
+    traites = 0
+    while True:
+        with transaction.atomic():
+            epoque = _epoque(timezone.now())
+            couples, points, nombre = set(), [], 0
+            for nom, (modele, _) in SOURCES_TENDANCE.items():
+                point, _ = PointReprise.objects.select_for_update().get_or_create(nom=nom)
+                lot = list(
+                    modele.objects.filter(pk__gt=point.dernier_id)
+                    .order_by('pk')
+                    .values_list('pk', 'astuce_id', 'date', 'utilisateur_id')[:taille_lot]
+                )
+                lot = _avant(lot, borne)
+                if lot:
+                    couples.update((utilisateur_id, astuce_id) for _, astuce_id, _, utilisateur_id in lot)
+                    point.dernier_id = lot[-1][0]
+                    points.append(point)
+                    nombre += len(lot)
+            modifiees = list(
+                InteractionModifiee.objects.order_by('pk').values_list('pk', 'utilisateur_id', 'astuce_id')[:taille_lot]
+            )
+            if not couples and not modifiees:
+                break
+
+            couples.update((utilisateur_id, astuce_id) for _, utilisateur_id, astuce_id in modifiees)
+            _recompter(couples, epoque)
+            for point in points:
+                point.save(update_fields=['dernier_id', 'date'])
+            InteractionModifiee.objects.filter(pk__in=[pk for pk, _, _ in modifiees]).delete()
+        traites += nombre + len(modifiees)
+    return traites
+
+
+def reconstruire_tendances(demi_vies=20):
+    """
+    Remet les scores et les contributions à zéro, l'époque à maintenant, et
+    place les points de reprise juste avant les événements encore significatifs
+    (moins de `demi_vies` demi-vies, soit un poids résiduel inférieur à
+    2^-demi_vies).
+    """
+    depuis = timezone.now() - timedelta(hours=demi_vies * getattr(settings, 'TENDANCE_DEMI_VIE_HEURES', 72))
+    with transaction.atomic():
+        Astuce.objects.exclude(score_tendance=0).update(score_tendance=0.0)
+        ContributionTendance.objects.all().delete()
+        InteractionModifiee.objects.all().delete()
+        PointReprise.objects.update_or_create(nom=EPOQUE, defaults={'date': timezone.now()})
+        for nom, (modele, _) in SOURCES_TENDANCE.items():
+            premier = modele.objects.filter(date__gte=depuis).order_by('pk').values_list('pk', flat=True).first()
+            dernier_id = premier - 1 if premier is not None else (
+                modele.objects.order_by('-pk').values_list('pk', flat=True).first() or 0
+            )
+            PointReprise.objects.update_or_create(nom=nom, defaults={'dernier_id': dernier_id})
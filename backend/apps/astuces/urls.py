@@ -14,10 +14,17 @@ router.register(r'termes', views.TermeViewSet, basename='terme')
 urlpatterns = [
     path('', include(router.urls)),
     path('rechercher/', views.RechercheViewSet.as_view({'post': 'rechercher'}), name='rechercher'),
+    path('suggestions/', views.RechercheViewSet.as_view({'get': 'suggestions'}), name='suggestions'),
+    path('export/astuces/', views.ExportViewSet.as_view({'get': 'astuces'}), name='export-astuces'),
+    path('export/evaluations/', views.ExportViewSet.as_view({'get': 'evaluations'}), name='export-evaluations'),
+    path('export/validations/', views.ExportViewSet.as_view({'get': 'validations'}), name='export-validations'),
+    path('recherches/tendances/', views.RechercheViewSet.as_view({'get': 'tendances'}), name='tendances'),
+    path('sync/', views.SynchronisationViewSet.as_view({'get': 'sync'}), name='sync'),
     path('astuces/<int:pk>/details/', views.AstuceViewSet.as_view({'get': 'details'}), name='astuce-details'),
     path('astuces/<int:pk>/evaluer/', views.AstuceViewSet.as_view({'post': 'evaluer'}), name='astuce-evaluer'),
     path('astuces/<int:pk>/toggle_favori/', views.AstuceViewSet.as_view({'post': 'toggle_favori'}), name='astuce-toggle-favori'),
     path('favoris/mes_favoris/', views.FavoriViewSet.as_view({'get': 'mes_favoris'}), name='mes-favoris'),
+    path('favoris/ids/', views.FavoriViewSet.as_view({'get': 'ids'}), name='favoris-ids'),
     path('propositions/mes_propositions/', views.PropositionViewSet.as_view({'get': 'mes_propositions'}), name='mes-propositions'),
     path('propositions/<int:pk>/changer_statut/', views.PropositionViewSet.as_view({'post': 'changer_statut'}), name='changer-statut'),
 ]
\ No newline at end of file
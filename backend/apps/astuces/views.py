@@ -1,16 +1,31 @@
 from rest_framework import viewsets, permissions, status, filters
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework.negotiation import BaseContentNegotiation
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Avg, Q
+from django.db import transaction
+from django.db.models import Prefetch
 from django.utils import timezone
+from django.utils.cache import get_conditional_response, quote_etag
 from django.contrib.auth import get_user_model
-from .models import Astuce, Categorie, Proposition, Validation, Evaluation, Favori, Recherche, Terme
+from .models import Astuce, Categorie, Proposition, Validation, Evaluation, Favori, Terme
 from .serializers import (
     AstuceSerializer, CategorieSerializer, PropositionSerializer,
     ValidationSerializer, EvaluationSerializer, FavoriSerializer,
     RechercheSerializer, FavoriAvecAstuceSerializer, TermeSerializer
 )
+from .pagination import AstucePagination, TendancePagination, PropositionPagination, EvaluationPagination, TermePagination
+from .search import FullTextSearchFilter, rechercher_astuces
+from .suggestions import index_suggestions
+from .tendances import tendances
+from .journal import journal_recherches
+from .sync import JetonInvalide, changements, LIMITE_DEFAUT, LIMITE_MAX
+from .favoris import favoris_utilisateur
+from .recommandations import astuces_recommandees
+from .similaires import astuces_similaires
+from .exports import TYPES, lire_depuis, reponse_export
+from .moderation import LOT_MAX, ORDRES, ReservationPerdue, decider, decider_lot, liberer, prolonger, reservations, reserver
+from .cache import CacheAnonymeMixin, ConditionnelMixin, cache_anonyme, conditionnel, invalider_contenu, marqueur_utilisateur
 
 User = get_user_model()
 
@@ -20,36 +35,56 @@ class IsModerator(permissions.BasePermission):
         return request.user and request.user.is_authenticated and getattr(request.user, 'role', '') == 'moderateur'
 
 # ========== CATEGORIES ==========
-class CategorieViewSet(viewsets.ModelViewSet):
+class CategorieViewSet(ConditionnelMixin, CacheAnonymeMixin, viewsets.ModelViewSet):
     queryset = Categorie.objects.all()
     serializer_class = CategorieSerializer
     permission_classes = [permissions.AllowAny]
 
 # ========== ASTUCES ==========
-class AstuceViewSet(viewsets.ModelViewSet):
+class AstuceViewSet(ConditionnelMixin, CacheAnonymeMixin, viewsets.ModelViewSet):
     queryset = Astuce.objects.all()
     serializer_class = AstuceSerializer
-    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, filters.SearchFilter]
+    pagination_class = AstucePagination
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, FullTextSearchFilter]
     filterset_fields = ['categories', 'valide', 'createur']
     ordering_fields = ['date_publication', 'score_fiabilite', 'nombre_votes']
     search_fields = ['titre', 'description']
     ordering = ['-date_publication']
 
     def get_permissions(self):
-        if self.action in ['create', 'evaluer', 'toggle_favori']:
+        if self.action in ['create', 'evaluer', 'toggle_favori', 'recommandations']:
             return [permissions.IsAuthenticated()]
         if self.action in ['update', 'partial_update', 'destroy']:
             return [IsModerator()]
         return [permissions.AllowAny()]
 
+    def astuces_visibles(self):
+        if self.request.user.is_authenticated and (self.request.user.is_staff or getattr(self.request.user, 'role', '') == 'moderateur'):
+            return Astuce.objects.all()
+        return Astuce.objects.filter(valide=True)
+
     def get_queryset(self):
-        queryset = Astuce.objects.filter(valide=True)
+        queryset = self.astuces_visibles()
         
-        if self.request.user.is_authenticated and (self.request.user.is_staff or getattr(self.request.user, 'role', '') == 'moderateur'):
-            queryset = Astuce.objects.all()
+        # Lecture groupée pour les actions qui sérialisent des astuces
+        if self.action in ['list', 'retrieve', 'details']:
+            queryset = queryset.pour_serialisation()
         
         return queryset
 
+    def validateurs(self, request, *args, **kwargs):
+        if not self.detail:
+            return super().validateurs(request, *args, **kwargs)
+        # Détail : la date de modification de la ligne suffit (une lecture par clé primaire)
+        date = self.astuces_visibles().filter(pk=kwargs.get('pk')).values_list('date_modification', flat=True).first()
+        if date is None:
+            return None, None
+        source = f'{self.action}|{kwargs.get("pk")}|{date.isoformat()}|{marqueur_utilisateur(request)}'
+        # Last-Modified ignore est_favori : réservé aux visiteurs anonymes
+        return source, (date if not request.user.is_authenticated else None)
+
+    @conditionnel
+    @cache_anonyme
     def list(self, request, *args, **kwargs):
         """Override list to include request context"""
         queryset = self.filter_queryset(self.get_queryset())
@@ -63,34 +98,88 @@ class AstuceViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
     @action(detail=True, methods=['get'])
+    @conditionnel
+    @cache_anonyme
     def details(self, request, pk=None):
         astuce = self.get_object()
-        evaluations = astuce.evaluations.all()[:10]
+        evaluations = astuce.evaluations.select_related('utilisateur').prefetch_related(
+            Prefetch('astuce', queryset=Astuce.objects.pour_serialisation())
+        )[:10]
         
         # Serialize with context to get est_favori
-        serializer = self.get_serializer(astuce, context={'request': request})
-        eval_serializer = EvaluationSerializer(evaluations, many=True)
-
-        # Check if current user has this in favorites
-        est_favori = False
-        if request.user.is_authenticated:
-            est_favori = Favori.objects.filter(
-                utilisateur=request.user,
-                astuce=astuce
-            ).exists()
+        context = {'request': request}
+        serializer = self.get_serializer(astuce, context=context)
+        eval_serializer = EvaluationSerializer(evaluations, many=True, context=context)
         
         astuce_data = serializer.data
-        astuce_data['est_favori'] = est_favori  # Ensure it's included
         
         data = {
             'astuce': astuce_data,
             'evaluations': eval_serializer.data,
-            'moyenne_note': astuce.evaluations.aggregate(Avg('note'))['note__avg'] or 0,
-            'nombre_evaluations': astuce.evaluations.count(),
+            'moyenne_note': astuce.moyenne_note,
+            'nombre_evaluations': astuce.nombre_votes,
+            'distribution_notes': astuce.distribution_notes,
         }
         
         return Response(data)
 
+    @action(detail=False, methods=['get'])
+    @cache_anonyme
+    def tendances(self, request):
+        """
+        Trending astuces: ordered by the stored time-decayed score
+        (partial index on valide=True), refreshed by calculer_tendances
+        """
+        queryset = Astuce.objects.filter(valide=True, score_tendance__gt=0).pour_serialisation()
+        paginator = TendancePagination()
+        page = paginator.paginate_queryset(queryset, request)
+        serializer = self.get_serializer(page, many=True, context={'request': request})
+        return paginator.get_paginated_response(serializer.data)
+
+    @action(detail=True, methods=['get'])
+    @cache_anonyme
+    def similaires(self, request, pk=None):
+        """Astuces with close content (TF-IDF neighbours stored by indexer_similaires)"""
+        try:
+            limite = min(max(int(request.query_params.get('limit', 10)), 1), 20)
+        except ValueError:
+            limite = 10
+        if not str(pk).isdigit():
+            return Response([])
+        ids = astuces_similaires(int(pk), limite)
+        astuces = Astuce.objects.filter(pk__in=ids, valide=True).pour_serialisation().in_bulk()
+        serializer = self.get_serializer([astuces[i] for i in ids if i in astuces], many=True, context={'request': request})
+        return Response(serializer.data)
+
+    @action(detail=False, methods=['get'])
+    def recommandations(self, request):
+        """
+        "You may also like" for the current user: stored list computed by
+        calculer_recommandations, falling back to trending astuces
+        """
+        try:
+            limite = min(max(int(request.query_params.get('limit', 20)), 1), 50)
+        except ValueError:
+            limite = 20
+        favoris_ids = set(favoris_utilisateur(request.user.pk)[1])
+        ids = astuces_recommandees(request.user.pk, exclure=favoris_ids, limite=limite)
+
+        if ids:
+            astuces = Astuce.objects.filter(pk__in=ids, valide=True).pour_serialisation().in_bulk()
+            astuces = [astuces[pk] for pk in ids if pk in astuces]
+        else:
+            astuces = list(
+                Astuce.objects.filter(valide=True, score_tendance__gt=0)
+                .exclude(pk__in=favoris_ids)
+                .pour_serialisation()
+                .order_by('-score_tendance', '-id')[:limite]
+            )
+        serializer = self.get_serializer(astuces, many=True, context={
+            'request': request,
+            'favoris_ids': favoris_ids,
+        })
+        return Response(serializer.data)
+
     @action(detail=True, methods=['post'], permission_classes=[permissions.IsAuthenticated])
     def evaluer(self, request, pk=None):
         astuce = self.get_object()
@@ -104,13 +193,12 @@ class AstuceViewSet(viewsets.ModelViewSet):
         
         serializer = EvaluationSerializer(data=request.data)
         if serializer.is_valid():
-            serializer.save(utilisateur=request.user, astuce=astuce)
-            
-            evaluations = astuce.evaluations.all()
-            moyenne = evaluations.aggregate(Avg('note'))['note__avg'] or 0
-            astuce.score_fiabilite = moyenne * 20
-            astuce.nombre_votes = evaluations.count()
-            astuce.save()
+            # Agrégats mis à jour dans la même transaction que l'évaluation
+            with transaction.atomic():
+                evaluation = serializer.save(utilisateur=request.user, astuce=astuce)
+                Astuce.objects.filter(pk=astuce.pk).ajouter_note(evaluation.note)
+                invalider_contenu()
+            astuce.refresh_from_db()
             
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         
@@ -149,32 +237,44 @@ class FavoriViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         return Favori.objects.filter(utilisateur=self.request.user)
     
+    def perform_create(self, serializer):
+        serializer.save(utilisateur=self.request.user)
+    
+    @action(detail=False, methods=['get'])
+    def ids(self, request):
+        """Sorted ids of the current user's favorite astuces, with an ETag"""
+        empreinte, ids = favoris_utilisateur(request.user.pk)
+        etag = quote_etag(empreinte)
+        response = get_conditional_response(request._request, etag=etag)
+        if response is None:
+            response = Response(ids)
+        response['ETag'] = etag
+        return response
+    
     @action(detail=False, methods=['get'])
     def mes_favoris(self, request):
         """Return the list of favorite astuces for the current user"""
-        print(f"🔍 Fetching favorites for user: {request.user.username}")
-        
-        favoris = self.get_queryset().select_related('astuce')
-        print(f"📊 Found {favoris.count()} favorites")
-        
-        # Extract the astuces from favoris
-        astuces = [favori.astuce for favori in favoris]
-        
-        # Serialize the astuces with context
-        serializer = AstuceSerializer(astuces, many=True, context={'request': request})
-        
-        # Add est_favori=True for all since these are all favorites
-        data = serializer.data
-        for astuce_data in data:
-            astuce_data['est_favori'] = True
+        # Les astuces favorites sont chargées directement, avec leurs relations
+        astuces = list(
+            Astuce.objects.filter(favorited_by__utilisateur=request.user)
+            .pour_serialisation()
+            .order_by('favorited_by__id')
+        )
         
-        print(f"✅ Returning {len(data)} favorite astuces")
-        return Response(data)
+        # Toutes ces astuces sont des favoris : inutile de les recharger
+        serializer = AstuceSerializer(astuces, many=True, context={
+            'request': request,
+            'favoris_ids': {astuce.id for astuce in astuces},
+        })
+        return Response(serializer.data)
 
 # ========== PROPOSITIONS ==========
 class PropositionViewSet(viewsets.ModelViewSet):
     queryset = Proposition.objects.all()
     serializer_class = PropositionSerializer
+    pagination_class = PropositionPagination
+    # Colonnes non NULL seulement : elles entrent dans le curseur de pagination
+    ordering_fields = ['date', 'date_modification']
     permission_classes = [permissions.IsAuthenticated]
     
     def get_queryset(self):
@@ -190,6 +290,10 @@ class PropositionViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def mes_propositions(self, request):
         propositions = self.get_queryset().filter(utilisateur=request.user)
+        page = self.paginate_queryset(propositions)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
         serializer = self.get_serializer(propositions, many=True)
         return Response(serializer.data)
     
@@ -205,37 +309,105 @@ class PropositionViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        proposition.statut = nouveau_statut
-        proposition.commentaire_moderation = commentaire
-        proposition.save()
-        
-        # Si la proposition est acceptée, créer l'astuce correspondante
-        if nouveau_statut == 'acceptee':
-            astuce = Astuce.objects.create(
-                titre=proposition.titre,
-                description=proposition.description,
-                source=proposition.source,
-                valide=True,
-                createur=proposition.utilisateur,
-                date_publication=timezone.now(),
-                date_validation=timezone.now(),
-            )
-            astuce.categories.set(proposition.categories.all())
-            proposition.astuce = astuce
-            proposition.save()
+        # Refusé si un autre modérateur a la proposition en main ; l'astuce n'est créée qu'une fois
+        try:
+            proposition = decider(proposition.pk, request.user, nouveau_statut, commentaire)
+        except ReservationPerdue as e:
+            return Response({'error': str(e)}, status=status.HTTP_409_CONFLICT)
         
         serializer = self.get_serializer(proposition)
         return Response(serializer.data)
+
+    @action(detail=False, methods=['get', 'post'], permission_classes=[IsModerator])
+    def file(self, request):
+        """
+        GET: propositions currently leased by the moderator.
+        POST {nombre, ordre: age|priorite}: lease the next pending ones (SKIP LOCKED)
+        """
+        if request.method == 'POST':
+            ordre = request.data.get('ordre', 'age')
+            if ordre not in ORDRES:
+                return Response({'error': 'ordre doit valoir age ou priorite'}, status=status.HTTP_400_BAD_REQUEST)
+            try:
+                nombre = max(int(request.data.get('nombre', 10)), 1)
+            except (TypeError, ValueError):
+                return Response({'error': 'nombre doit être un entier'}, status=status.HTTP_400_BAD_REQUEST)
+            reserver(request.user, nombre, ordre)
+        
+        propositions = reservations(request.user).select_related('utilisateur').prefetch_related('categories', 'termes')
+        serializer = self.get_serializer(propositions, many=True)
+        return Response(serializer.data)
+
+    @action(detail=False, methods=['post'], permission_classes=[IsModerator])
+    def moderer_lot(self, request):
+        """
+        Bulk decisions: {"decisions": [{"id", "statut", "commentaire_moderation"}]},
+        applied in one transaction; ids leased by another moderator come back in "conflits"
+        """
+        decisions = request.data.get('decisions')
+        if not isinstance(decisions, list) or not decisions:
+            return Response({'error': 'decisions doit être une liste non vide'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(decisions) > LOT_MAX:
+            return Response({'error': f'{LOT_MAX} décisions au plus par requête'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        par_id = {}
+        for decision in decisions:
+            if not isinstance(decision, dict) or not str(decision.get('id', '')).isdigit():
+                return Response({'error': 'Chaque décision doit avoir un id'}, status=status.HTTP_400_BAD_REQUEST)
+            if decision.get('statut') not in dict(Proposition.STATUT_CHOICES):
+                return Response({'error': f"Statut invalide pour {decision['id']}"}, status=status.HTTP_400_BAD_REQUEST)
+            par_id[int(decision['id'])] = (decision['statut'], decision.get('commentaire_moderation', '') or '')
+        
+        traitees, conflits, astuces = decider_lot(request.user, par_id)
+        return Response({'traitees': traitees, 'conflits': conflits, 'astuces': astuces})
+
+    @action(detail=False, methods=['post'], permission_classes=[IsModerator])
+    def prolonger(self, request):
+        """Renew the leases held on ?ids"""
+        return Response({'prolongees': prolonger(request.user, self._ids(request))})
+
+    @action(detail=False, methods=['post'], permission_classes=[IsModerator])
+    def liberer(self, request):
+        """Give leased propositions back to the queue"""
+        return Response({'liberees': liberer(request.user, self._ids(request))})
+
+    def _ids(self, request):
+        ids = request.data.get('ids', [])
+        if not isinstance(ids, list):
+            return []
+        return [int(pk) for pk in ids if str(pk).isdigit()]
     
     
 # ========== EVALUATIONS ==========
 class EvaluationViewSet(viewsets.ModelViewSet):
     queryset = Evaluation.objects.all()  # AJOUTÉ
     serializer_class = EvaluationSerializer
+    pagination_class = EvaluationPagination
+    ordering_fields = ['date', 'note']
     permission_classes = [permissions.IsAuthenticated]
     
     def get_queryset(self):
         return Evaluation.objects.filter(utilisateur=self.request.user)
+    
+    def perform_update(self, serializer):
+        # Garder les agrégats de l'astuce cohérents si la note change
+        with transaction.atomic():
+            ancienne_note = Evaluation.objects.select_for_update().get(pk=serializer.instance.pk).note
+            evaluation = serializer.save()
+            astuces = Astuce.objects.filter(pk=evaluation.astuce_id)
+            if evaluation.note != ancienne_note:
+                astuces.ajouter_note(ancienne_note, sens=-1)
+                astuces.ajouter_note(evaluation.note)
+            else:
+                # Commentaire ou fiabilité perçue : l'astuce servie (ETag, synchro, cache) change aussi
+                astuces.update(date_modification=timezone.now())
+            invalider_contenu()
+    
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            instance.delete()
+            Astuce.objects.filter(pk=instance.astuce_id).ajouter_note(instance.note, sens=-1)
+            invalider_contenu()
 
 # ========== VALIDATIONS ==========
 class ValidationViewSet(viewsets.ModelViewSet):
@@ -265,35 +437,125 @@ class RechercheViewSet(viewsets.ViewSet):
         categorie_id = request.data.get('categorie_id')
         
         if request.user.is_authenticated:
-            Recherche.objects.create(
-                mots_cles=mots_cles,
-                utilisateur=request.user
-            )
+            # Écriture différée, insérée par lots hors du chemin de la requête
+            journal_recherches.enregistrer(request.user.pk, mots_cles)
         
         if request.user.is_authenticated and (request.user.is_staff or getattr(request.user, 'role', '') == 'moderateur'):
             queryset = Astuce.objects.all()
         else:
             queryset = Astuce.objects.filter(valide=True)
         
-        if mots_cles:
-            queryset = queryset.filter(
-                Q(titre__icontains=mots_cles) |
-                Q(description__icontains=mots_cles)
-            )
-        
         if categorie_id:
             queryset = queryset.filter(categories__id=categorie_id)
         
-        serializer = AstuceSerializer(queryset.order_by('-date_publication'), many=True)
+        paginator = AstucePagination()
+        if mots_cles:
+            # Index GIN + classement par pertinence (rang plein texte et fiabilité)
+            queryset = rechercher_astuces(queryset, mots_cles)
+            paginator.ordering = ('-pertinence',)
+        
+        page = paginator.paginate_queryset(queryset.pour_serialisation(), request, view=self)
+        serializer = AstuceSerializer(page, many=True, context={'request': request})
+        return paginator.get_paginated_response(serializer.data)
+
+    @action(detail=False, methods=['get'])
+    def suggestions(self, request):
+        """Autocomplete: titres d'astuces et termes commençant par ?q=, servis depuis la mémoire"""
+        prefixe = request.query_params.get('q', '')
+        try:
+            limite = int(request.query_params.get('limit', 10))
+        except ValueError:
+            limite = 10
+        return Response(index_suggestions.suggerer(prefixe, limite))
+
+    @action(detail=False, methods=['get'])
+    def tendances(self, request):
+        """Trending searches over ?jours= (1-90, défaut 7), from the daily rollup"""
+        try:
+            jours = min(max(int(request.query_params.get('jours', 7)), 1), 90)
+            limite = min(max(int(request.query_params.get('limit', 10)), 1), 50)
+        except ValueError:
+            return Response({'error': 'jours et limit doivent être des entiers'}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(tendances(jours, limite))
+
+
+# ========== SYNCHRONISATION ==========
+class SynchronisationViewSet(viewsets.ViewSet):
+    permission_classes = [permissions.AllowAny]
+    
+    @action(detail=False, methods=['get'])
+    def sync(self, request):
+        """
+        Changements depuis ?since=<jeton> : astuces créées ou modifiées et
+        ids à retirer (supprimées ou dévalidées), avec le jeton suivant.
+        Sans jeton, renvoie tout le catalogue par lots.
+        """
+        try:
+            limite = min(int(request.query_params.get('limit', LIMITE_DEFAUT)), LIMITE_MAX)
+        except ValueError:
+            limite = LIMITE_DEFAUT
+        
+        try:
+            a_jour, retirees, jeton, encore = changements(request.query_params.get('since'), max(limite, 1))
+        except JetonInvalide as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        astuces = Astuce.objects.filter(pk__in=a_jour).pour_serialisation().in_bulk()
+        serializer = AstuceSerializer(
+            [astuces[pk] for pk in a_jour if pk in astuces],
+            many=True,
+            context={'request': request}
+        )
         return Response({
-            'results': serializer.data,
-            'count': queryset.count()
+            'astuces': serializer.data,
+            'supprimees': retirees,
+            'next_since': jeton,
+            'has_more': encore,
         })
 
 
+# ========== EXPORTS ==========
+class SansNegociation(BaseContentNegotiation):
+    """Accept: application/x-ndjson ou text/csv ne doit pas finir en 406 : le flux ignore les renderers."""
+    def select_parser(self, request, parsers):
+        return parsers[0]
+
+    def select_renderer(self, request, renderers, format_suffix=None):
+        return renderers[0], renderers[0].media_type
+
+
+class ExportViewSet(viewsets.ViewSet):
+    """
+    Exports complets pour les modérateurs, en flux NDJSON (défaut) ou CSV :
+    /export/<astuces|evaluations|validations>/?type=csv&depuis=2025-01-01
+    """
+    permission_classes = [IsModerator]
+    content_negotiation_class = SansNegociation
+
+    def exporter(self, request, ressource):
+        type_export = request.query_params.get('type', 'ndjson')
+        if type_export not in TYPES:
+            return Response({'error': f"type doit être l'un de : {', '.join(TYPES)}"}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            depuis = lire_depuis(request.query_params.get('depuis'))
+        except ValueError:
+            return Response({'error': 'Date invalide pour depuis'}, status=status.HTTP_400_BAD_REQUEST)
+        return reponse_export(ressource, type_export, depuis)
+
+    def astuces(self, request):
+        return self.exporter(request, 'astuces')
+
+    def evaluations(self, request):
+        return self.exporter(request, 'evaluations')
+
+    def validations(self, request):
+        return self.exporter(request, 'validations')
+
+
 # ========== TERMES ==========
-class TermeViewSet(viewsets.ModelViewSet):
+class TermeViewSet(ConditionnelMixin, CacheAnonymeMixin, viewsets.ModelViewSet):
     serializer_class = TermeSerializer
+    pagination_class = TermePagination
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
     search_fields = ['terme', 'definition']
     ordering_fields = ['terme', 'date_creation']
@@ -303,6 +565,14 @@ class TermeViewSet(viewsets.ModelViewSet):
         # Only return terms from validated astuces
         return Terme.objects.filter(astuces__valide=True).distinct()
 
+    def validateurs(self, request, *args, **kwargs):
+        if not self.detail:
+            return super().validateurs(request, *args, **kwargs)
+        date = self.get_queryset().filter(pk=kwargs.get('pk')).values_list('date_modification', flat=True).first()
+        if date is None:
+            return None, None
+        return f'terme|{kwargs.get("pk")}|{date.isoformat()}', date
+
     def get_permissions(self):
         if self.action in ['create', 'update', 'partial_update', 'destroy']:
             return [permissions.IsAuthenticated()]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-18 08:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0004_customuser_avatar'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customuser',
+            name='avatar_variantes',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.6 on 2026-10-18 09:22
+
+import django.contrib.postgres.indexes
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('users', '0005_avatar_variantes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='customuser',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['avatar_variantes'], name='user_avatar_variantes_gin', opclasses=['jsonb_path_ops']),
+        ),
+    ]
@@ -1,3 +1,4 @@
+from django.contrib.postgres.indexes import GinIndex
 from django.db import models
 from django.contrib.auth.models import AbstractUser
 
@@ -25,6 +26,14 @@ class CustomUser(AbstractUser):
     phone = models.CharField(max_length=20, blank=True)
     #  NOUVEAU: Avatar pour l'utilisateur
     avatar = models.ImageField(upload_to='avatars/%Y/%m/%d/', null=True, blank=True)
+    # Miniatures et WebP calculés après l'envoi (apps.astuces.images)
+    avatar_variantes = models.JSONField(default=dict, blank=True, editable=False)
+
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # Dérivés d'avatar servis par apps.astuces.media
+            GinIndex(fields=['avatar_variantes'], opclasses=['jsonb_path_ops'], name='user_avatar_variantes_gin'),
+        ]
 
     def is_moderator(self):
         return self.role == self.ROLE_MODERATOR
@@ -1,14 +1,17 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
 
+from apps.astuces.images import urls_variantes
+
 User = get_user_model()
 
 class UserSerializer(serializers.ModelSerializer):
     avatar_url = serializers.SerializerMethodField()
+    avatar_variantes = serializers.SerializerMethodField()
     
     class Meta:
         model = User
-        fields = ['id', 'username', 'nom', 'email', 'age', 'centres_interet', 'role', 'date_creation','bio', 'phone', 'avatar', 'avatar_url']
+        fields = ['id', 'username', 'nom', 'email', 'age', 'centres_interet', 'role', 'date_creation','bio', 'phone', 'avatar', 'avatar_url', 'avatar_variantes']
     
     def get_avatar_url(self, obj):
         if obj.avatar:
@@ -25,6 +28,9 @@ class UserSerializer(serializers.ModelSerializer):
                 return f"http://192.168.137.1:8000/media/{avatar_path}"
         return None
 
+    def get_avatar_variantes(self, obj):
+        return urls_variantes(obj.avatar_variantes, self.context.get('request'))
+
 class RegisterSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True)
 
@@ -1,3 +1,90 @@
-from django.test import TestCase
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APITestCase
 
-# Create your tests here.
+from apps.astuces.models import Astuce, Categorie, Evaluation, Favori, Proposition
+
+from .models import CustomUser
+
+
+# ========== PROFIL ==========
+class ProfilTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.utilisateur = CustomUser.objects.create_user('membre', 'membre@exemple.test', 'motdepasse')
+        self.autre = CustomUser.objects.create_user('autre', 'autre@exemple.test', 'motdepasse')
+        self.categorie = Categorie.objects.create(nom='Cuisine')
+        self.client.force_authenticate(self.utilisateur)
+
+    def _astuces(self, createur, nombre, debut=0):
+        astuces = []
+        for i in range(debut, debut + nombre):
+            astuce = Astuce.objects.create(titre=f'Astuce {i}', description='Description', valide=True, createur=createur)
+            astuce.categories.add(self.categorie)
+            astuces.append(astuce)
+        return astuces
+
+    def _parcourir(self, url):
+        ids = []
+        while url:
+            reponse = self.client.get(url)
+            self.assertEqual(reponse.status_code, status.HTTP_200_OK)
+            ids += [element['id'] for element in reponse.data['results']]
+            url = reponse.data['next']
+        return ids
+
+    def test_astuces_nombre_de_requetes_constant(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Favori.objects.create(utilisateur=self.utilisateur, astuce=self._astuces(self.utilisateur, 2)[0])
+        with CaptureQueriesContext(connection) as petit:
+            self.client.get('/api/users/profile/astuces/')
+        with self.captureOnCommitCallbacks(execute=True):
+            for astuce in self._astuces(self.utilisateur, 15, 2)[::3]:
+                Favori.objects.create(utilisateur=self.utilisateur, astuce=astuce)
+        with CaptureQueriesContext(connection) as grand:
+            reponse = self.client.get('/api/users/profile/astuces/')
+        self.assertEqual(len(reponse.data['results']), 17)
+        self.assertEqual(len(grand), len(petit))
+
+    def test_astuces_seulement_les_siennes(self):
+        miennes = self._astuces(self.utilisateur, 3)
+        self._astuces(self.autre, 2, 3)
+        ids = self._parcourir('/api/users/profile/astuces/?page_size=2')
+        self.assertEqual(sorted(ids), [astuce.pk for astuce in miennes])
+
+    def test_evaluations_paginees(self):
+        astuces = self._astuces(self.autre, 7)
+        for note, astuce in enumerate(astuces):
+            Evaluation.objects.create(note=note % 5 + 1, utilisateur=self.utilisateur, astuce=astuce)
+        Evaluation.objects.create(note=3, utilisateur=self.autre, astuce=astuces[0])
+
+        ids = self._parcourir('/api/users/profile/evaluations/?page_size=3')
+        attendus = Evaluation.objects.filter(utilisateur=self.utilisateur).order_by('-date', '-id').values_list('id', flat=True)
+        self.assertEqual(ids, list(attendus))
+
+    def test_propositions_seulement_les_siennes(self):
+        Proposition.objects.create(titre='La mienne', description='Texte', utilisateur=self.utilisateur)
+        Proposition.objects.create(titre='Une autre', description='Texte', utilisateur=self.autre)
+        reponse = self.client.get('/api/users/profile/propositions/')
+        self.assertEqual([proposition['titre'] for proposition in reponse.data['results']], ['La mienne'])
+
+    def test_authentification_requise(self):
+        self.client.force_authenticate(None)
+        reponse = self.client.get('/api/users/profile/evaluations/')
+        self.assertEqual(reponse.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_tri_sur_colonne_nulle_ignore(self):
+        # score_ai et date_validation sont NULL : tri par défaut, aucune ligne sautée
+        miennes = self._astuces(self.utilisateur, 3)
+        for tri in ('score_ai', 'date_validation', '-source'):
+            ids = self._parcourir(f'/api/users/profile/astuces/?ordering={tri}&page_size=1')
+            self.assertEqual(ids, [astuce.pk for astuce in reversed(miennes)])
+
+    def test_tri_autorise(self):
+        astuces = self._astuces(self.autre, 3)
+        for note, astuce in zip((4, 1, 3), astuces):
+            Evaluation.objects.create(note=note, utilisateur=self.utilisateur, astuce=astuce)
+        reponse = self.client.get('/api/users/profile/evaluations/?ordering=-note')
+        self.assertEqual([evaluation['note'] for evaluation in reponse.data['results']], [4, 3, 1])
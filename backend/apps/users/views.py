@@ -6,6 +6,8 @@ from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.views import TokenObtainPairView
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 
+from apps.astuces.pagination import AstucePagination, EvaluationPagination, PropositionPagination
+
 from .serializers import RegisterSerializer, UserSerializer
 
 User = get_user_model()
@@ -97,12 +99,15 @@ class ProfileView(generics.RetrieveUpdateAPIView):  # Changed from RetrieveAPIVi
 # 🆕 NEW: Get user's created astuces
 class UserAstucesView(generics.ListAPIView):
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = AstucePagination
+    # Colonnes non NULL seulement : elles entrent dans le curseur de pagination
+    ordering_fields = ['date_publication', 'score_fiabilite', 'nombre_votes']
     
     def get_queryset(self):
         """Return astuces created by the current user"""
         # Import here to avoid circular imports
         from apps.astuces.models import Astuce
-        return Astuce.objects.filter(createur=self.request.user).order_by('-date_publication')
+        return Astuce.objects.filter(createur=self.request.user).pour_serialisation().order_by('-date_publication')
     
     def get_serializer_class(self):
         """Dynamically import serializer to avoid circular imports"""
@@ -113,12 +118,18 @@ class UserAstucesView(generics.ListAPIView):
 # 🆕 NEW: Get user's evaluations
 class UserEvaluationsView(generics.ListAPIView):
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = EvaluationPagination
+    # Colonnes non NULL seulement : elles entrent dans le curseur de pagination
+    ordering_fields = ['date', 'note']
     
     def get_queryset(self):
         """Return evaluations written by the current user"""
         # Import here to avoid circular imports
-        from apps.astuces.models import Evaluation
-        return Evaluation.objects.filter(utilisateur=self.request.user).select_related('astuce').order_by('-date')
+        from django.db.models import Prefetch
+        from apps.astuces.models import Astuce, Evaluation
+        return Evaluation.objects.filter(utilisateur=self.request.user).select_related('utilisateur').prefetch_related(
+            Prefetch('astuce', queryset=Astuce.objects.pour_serialisation())
+        ).order_by('-date')
     
     def get_serializer_class(self):
         """Dynamically import serializer to avoid circular imports"""
@@ -129,6 +140,9 @@ class UserEvaluationsView(generics.ListAPIView):
 # 🆕 NEW: Get user's propositions
 class UserPropositionsView(generics.ListAPIView):
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = PropositionPagination
+    # Colonnes non NULL seulement : elles entrent dans le curseur de pagination
+    ordering_fields = ['date', 'date_modification']
     
     def get_queryset(self):
         """Return propositions created by the current user"""
@@ -0,0 +1,290 @@
+"""
+Banc de charge de l'API : rejoue un mélange pondéré d'appels réels
+(connexion, pages de la liste, détails, recherche, favoris, évaluation,
+proposition) avec de nombreux utilisateurs virtuels authentifiés par JWT.
+
+Les comptes viennent de `manage.py generer_donnees` (synth_<id>) :
+
+    python charge.py --url http://localhost:8000 --utilisateurs 200 --duree 60 \
+        --plage 1:2000 --sortie resultats.json --comparer reference.json
+
+Rapport par appel : requêtes, débit, erreurs (5xx et échecs réseau),
+réponses 4xx, latence p50/p95/p99. La sortie JSON est stable d'un
+lancement à l'autre pour pouvoir être comparée.
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from collections import defaultdict
+
+import httpx
+
+MELANGE_DEFAUT = 'liste=35,page_suivante=10,details=25,rechercher=15,toggle_favori=6,evaluer=5,proposer=4'
+MOTS = [
+    'café', 'vélo', 'jardin', 'budget', 'ordinateur', 'smartphone', 'cuisine', 'sommeil',
+    'tomates', 'batterie', 'plantes', 'pomodoro', 'kanban', 'factures', 'pain', 'lessive',
+]
+
+
+# ========== STATISTIQUES ==========
+class Statistiques:
+    def __init__(self):
+        self.latences = defaultdict(list)
+        self.codes = defaultdict(lambda: defaultdict(int))
+        self.erreurs = defaultdict(int)
+        self.actif = False  # faux pendant l'échauffement
+
+    def noter(self, appel, duree, code=None):
+        if not self.actif:
+            return
+        self.latences[appel].append(duree)
+        if code is None or code >= 500:
+            self.erreurs[appel] += 1
+        self.codes[appel]['reseau' if code is None else str(code)] += 1
+
+    @staticmethod
+    def centile(triees, p):
+        if not triees:
+            return 0.0
+        rang = min(len(triees) - 1, max(0, round(p / 100 * len(triees)) - 1))
+        return triees[rang]
+
+    def resume(self, duree):
+        def bloc(latences, erreurs, codes):
+            triees = sorted(latences)
+            nombre = len(triees)
+            return {
+                'requetes': nombre,
+                'rps': round(nombre / duree, 2),
+                'erreurs': erreurs,
+                'taux_erreur': round(erreurs / nombre, 4) if nombre else 0.0,
+                'reponses_4xx': sum(n for code, n in codes.items() if code.startswith('4')),
+                'codes': dict(sorted(codes.items())),
+                'latence_ms': {
+                    'p50': round(self.centile(triees, 50) * 1000, 2),
+                    'p95': round(self.centile(triees, 95) * 1000, 2),
+                    'p99': round(self.centile(triees, 99) * 1000, 2),
+                    'moyenne': round(sum(triees) / nombre * 1000, 2) if nombre else 0.0,
+                    'max': round(triees[-1] * 1000, 2) if nombre else 0.0,
+                },
+            }
+
+        appels = {
+            appel: bloc(self.latences[appel], self.erreurs[appel], self.codes[appel])
+            for appel in sorted(self.latences)
+        }
+        tous_codes = defaultdict(int)
+        for codes in self.codes.values():
+            for code, n in codes.items():
+                tous_codes[code] += n
+        total = bloc(
+            [l for latences in self.latences.values() for l in latences],
+            sum(self.erreurs.values()),
+            tous_codes,
+        )
+        return {'appels': appels, 'total': total}
+
+
+# ========== UTILISATEUR VIRTUEL ==========
+class UtilisateurVirtuel:
+    def __init__(self, client, stats, identifiant, mot_de_passe, alea, pause):
+        self.client = client
+        self.stats = stats
+        self.identifiant = identifiant
+        self.mot_de_passe = mot_de_passe
+        self.alea = alea
+        self.pause = pause
+        self.entetes = {}
+        self.astuces_vues = []
+        self.suivante = None
+
+    async def appeler(self, appel, methode, url, **kwargs):
+        debut = time.perf_counter()
+        try:
+            response = await self.client.request(methode, url, headers=self.entetes, **kwargs)
+        except httpx.HTTPError:
+            self.stats.noter(appel, time.perf_counter() - debut)
+            return None
+        self.stats.noter(appel, time.perf_counter() - debut, response.status_code)
+        return response
+
+    async def connexion(self):
+        response = await self.appeler('login', 'POST', '/api/users/login/', json={
+            'username': self.identifiant, 'password': self.mot_de_passe,
+        })
+        if response is None or response.status_code != 200:
+            return False
+        self.entetes = {'Authorization': f"Bearer {response.json()['access']}"}
+        return True
+
+    def retenir(self, response):
+        if response is None or response.status_code != 200:
+            return
+        donnees = response.json()
+        self.suivante = donnees.get('next')
+        ids = [astuce['id'] for astuce in donnees.get('results', [])]
+        # Garde une fenêtre récente d'ids pour details, favoris et évaluations
+        self.astuces_vues = (self.astuces_vues + ids)[-200:]
+
+    async def liste(self):
+        self.retenir(await self.appeler('liste', 'GET', '/api/astuces/astuces/'))
+
+    async def page_suivante(self):
+        if not self.suivante:
+            return await self.liste()
+        self.retenir(await self.appeler('page_suivante', 'GET', self.suivante))
+
+    async def details(self):
+        if not self.astuces_vues:
+            return await self.liste()
+        pk = self.alea.choice(self.astuces_vues)
+        await self.appeler('details', 'GET', f'/api/astuces/astuces/{pk}/details/')
+
+    async def rechercher(self):
+        mots = ' '.join(self.alea.sample(MOTS, self.alea.choice((1, 1, 2))))
+        await self.appeler('rechercher', 'POST', '/api/astuces/rechercher/', json={'mots_cles': mots})
+
+    async def toggle_favori(self):
+        if not self.astuces_vues:
+            return await self.liste()
+        pk = self.alea.choice(self.astuces_vues)
+        await self.appeler('toggle_favori', 'POST', f'/api/astuces/astuces/{pk}/toggle_favori/')
+
+    async def evaluer(self):
+        if not self.astuces_vues:
+            return await self.liste()
+        pk = self.alea.choice(self.astuces_vues)
+        # Un 400 « déjà évalué » est une réponse normale de l'API
+        await self.appeler('evaluer', 'POST', f'/api/astuces/astuces/{pk}/evaluer/', json={
+            'note': self.alea.randint(1, 5), 'commentaire': 'Test de charge',
+        })
+
+    async def proposer(self):
+        mot = self.alea.choice(MOTS)
+        await self.appeler('proposer', 'POST', '/api/astuces/propositions/', json={
+            'titre': f'Bien utiliser {mot} (charge)',
+            'description': f"Proposition générée par le banc de charge autour de {mot}.",
+            'niveau_difficulte': 'debutant',
+        })
+
+    async def executer(self, melange, fin):
+        if not await self.connexion():
+            return
+        appels, poids = zip(*melange.items())
+        while time.monotonic() < fin:
+            appel = self.alea.choices(appels, weights=poids)[0]
+            await getattr(self, appel)()
+            if self.pause:
+                await asyncio.sleep(self.alea.expovariate(1 / self.pause))
+
+
+# ========== LANCEMENT ==========
+def lire_melange(texte):
+    melange = {}
+    for morceau in texte.split(','):
+        appel, _, poids = morceau.partition('=')
+        appel = appel.strip()
+        if not hasattr(UtilisateurVirtuel, appel) or appel in ('connexion', 'executer', 'appeler', 'retenir'):
+            raise argparse.ArgumentTypeError(f"Appel inconnu : {appel}")
+        melange[appel] = float(poids)
+    return melange
+
+
+async def lancer(args, transport=None):
+    alea = random.Random(args.graine)
+    premier, dernier = (int(borne) for borne in args.plage.split(':'))
+    stats = Statistiques()
+    limites = httpx.Limits(max_connections=args.connexions, max_keepalive_connections=args.connexions)
+    async with httpx.AsyncClient(base_url=args.url, limits=limites, timeout=args.timeout, transport=transport) as client:
+        debut = time.monotonic()
+        fin = debut + args.echauffement + args.duree
+        utilisateurs = []
+        for i in range(args.utilisateurs):
+            identifiant = args.comptes.format(alea.randint(premier, dernier))
+            vu = UtilisateurVirtuel(client, stats, identifiant, args.mot_de_passe, random.Random(alea.random()), args.pause)
+            # Montée en charge progressive sur la durée d'échauffement
+            delai = args.echauffement * i / args.utilisateurs
+            utilisateurs.append(asyncio.create_task(demarrer(vu, delai, args.melange, fin)))
+
+        await asyncio.sleep(args.echauffement)
+        stats.actif = True
+        mesure = time.monotonic()
+        await asyncio.gather(*utilisateurs)
+        duree = time.monotonic() - mesure
+
+    return {
+        'configuration': {
+            'url': args.url, 'utilisateurs': args.utilisateurs, 'duree': args.duree,
+            'echauffement': args.echauffement, 'pause': args.pause, 'graine': args.graine,
+            'melange': args.melange,
+        },
+        'duree_mesuree': round(duree, 2),
+        **stats.resume(duree),
+    }
+
+
+async def demarrer(vu, delai, melange, fin):
+    await asyncio.sleep(delai)
+    await vu.executer(melange, fin)
+
+
+def afficher(resultat, reference=None):
+    entete = f"{'appel':<15}{'req':>8}{'rps':>9}{'err%':>8}{'4xx':>7}{'p50':>9}{'p95':>9}{'p99':>9}"
+    print(entete)
+    print('-' * len(entete))
+    lignes = list(resultat['appels'].items()) + [('TOTAL', resultat['total'])]
+    for appel, bloc in lignes:
+        latence = bloc['latence_ms']
+        print(
+            f"{appel:<15}{bloc['requetes']:>8}{bloc['rps']:>9.1f}{bloc['taux_erreur'] * 100:>7.2f}%"
+            f"{bloc['reponses_4xx']:>7}{latence['p50']:>9.1f}{latence['p95']:>9.1f}{latence['p99']:>9.1f}"
+        )
+        ancien = (reference or {}).get('appels', {}).get(appel) if appel != 'TOTAL' else (reference or {}).get('total')
+        if ancien:
+            ecarts = []
+            for cle in ('p50', 'p95', 'p99'):
+                avant = ancien['latence_ms'][cle]
+                if avant:
+                    ecarts.append(f"{cle} {(latence[cle] - avant) / avant * 100:+.1f}%")
+            if ancien['rps']:
+                ecarts.append(f"rps {(bloc['rps'] - ancien['rps']) / ancien['rps'] * 100:+.1f}%")
+            print(f"{'':<15}vs référence : {', '.join(ecarts)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Banc de charge asynchrone de l'API Astuce+")
+    parser.add_argument('--url', default='http://localhost:8000')
+    parser.add_argument('--utilisateurs', type=int, default=50, help="Utilisateurs virtuels simultanés")
+    parser.add_argument('--duree', type=float, default=30.0, help="Durée mesurée (secondes)")
+    parser.add_argument('--echauffement', type=float, default=5.0, help="Montée en charge non mesurée (secondes)")
+    parser.add_argument('--pause', type=float, default=0.0, help="Temps de réflexion moyen entre deux appels (secondes)")
+    parser.add_argument('--melange', type=lire_melange, default=lire_melange(MELANGE_DEFAUT),
+                        help=f"Poids des appels (défaut : {MELANGE_DEFAUT})")
+    parser.add_argument('--comptes', default='synth_{}', help="Modèle des identifiants, {} reçoit un id de --plage")
+    parser.add_argument('--plage', default='1:1000', help="Ids des comptes, bornes incluses")
+    parser.add_argument('--mot-de-passe', default='astuce123')
+    parser.add_argument('--connexions', type=int, default=100, help="Connexions HTTP maximales")
+    parser.add_argument('--timeout', type=float, default=30.0)
+    parser.add_argument('--graine', type=int, default=42)
+    parser.add_argument('--sortie', help="Fichier JSON de résultats")
+    parser.add_argument('--comparer', help="Résultats JSON d'un lancement précédent")
+    args = parser.parse_args()
+
+    resultat = asyncio.run(lancer(args))
+    reference = None
+    if args.comparer:
+        with open(args.comparer, encoding='utf-8') as fichier:
+            reference = json.load(fichier)
+    afficher(resultat, reference)
+    if args.sortie:
+        with open(args.sortie, 'w', encoding='utf-8') as fichier:
+            json.dump(resultat, fichier, ensure_ascii=False, indent=2, sort_keys=True)
+    if resultat['total']['requetes'] == 0:
+        sys.exit("Aucune requête mesurée : vérifier l'URL et les comptes")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""
+Métriques Prometheus : latence, taille des réponses, nombre et durée des
+requêtes SQL, par vue DRF et action (ex. « AstuceViewSet.details »).
+
+Avec plusieurs workers (gunicorn...), définir PROMETHEUS_MULTIPROC_DIR
+vers un dossier vide avant le démarrage : chaque processus y écrit ses
+valeurs et /metrics les agrège. Dans ce mode, appeler
+prometheus_client.multiprocess.mark_process_dead(worker.pid) depuis le
+hook child_exit de gunicorn.
+"""
+import os
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Histogram, generate_latest, multiprocess,
+)
+
+LABELS = ['vue', 'methode', 'statut']
+
+DUREE_REQUETE = Histogram(
+    'astuce_requete_duree_secondes', "Durée de traitement des requêtes HTTP",
+    LABELS, buckets=(.005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10),
+)
+TAILLE_REPONSE = Histogram(
+    'astuce_reponse_taille_octets', "Taille du corps des réponses",
+    LABELS, buckets=(256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304),
+)
+REQUETES_SQL = Histogram(
+    'astuce_sql_requetes', "Nombre de requêtes SQL par requête HTTP",
+    LABELS, buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100),
+)
+DUREE_SQL = Histogram(
+    'astuce_sql_duree_secondes', "Temps passé en base par requête HTTP",
+    LABELS, buckets=(.001, .0025, .005, .01, .025, .05, .1, .25, .5, 1, 2.5),
+)
+
+
+def nom_vue(view_func, methode):
+    """« ViewSet.action » pour DRF, chemin de la fonction sinon."""
+    classe = getattr(view_func, 'cls', None)
+    if classe is None:
+        return f'{view_func.__module__}.{view_func.__name__}'
+    actions = getattr(view_func, 'actions', None) or {}
+    action = actions.get(methode.lower(), methode.lower())
+    return f'{classe.__name__}.{action}'
+
+
+class CompteurSQL:
+    """execute_wrapper qui compte les requêtes et cumule leur durée."""
+
+    def __init__(self):
+        self.nombre = 0
+        self.duree = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        debut = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duree += time.perf_counter() - debut
+            self.nombre += 1
+
+
+class MetriquesMiddleware:
+    """À placer en tête de MIDDLEWARE pour mesurer toute la chaîne."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if request.path == '/metrics':
+            return self.get_response(request)
+
+        compteur = CompteurSQL()
+        debut = time.perf_counter()
+        with ExitStack() as pile:
+            for connexion in connections.all():
+                pile.enter_context(connexion.execute_wrapper(compteur))
+            response = self.get_response(request)
+        duree = time.perf_counter() - debut
+
+        labels = (getattr(request, '_vue_metriques', 'non_resolue'), request.method, str(response.status_code))
+        DUREE_REQUETE.labels(*labels).observe(duree)
+        REQUETES_SQL.labels(*labels).observe(compteur.nombre)
+        DUREE_SQL.labels(*labels).observe(compteur.duree)
+        if not response.streaming:
+            TAILLE_REPONSE.labels(*labels).observe(len(response.content))
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request._vue_metriques = nom_vue(view_func, request.method)
+
+
+def metrics(request):
+    """
+    Exposition au format Prometheus, avec l'en-tête « Authorization: Bearer
+    <METRIQUES_JETON> ». Sans jeton configuré, refusée hors DEBUG.
+    """
+    jeton = getattr(settings, 'METRIQUES_JETON', '')
+    if jeton:
+        if not constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {jeton}'):
+            return HttpResponseForbidden()
+    elif not settings.DEBUG:
+        return HttpResponseForbidden()
+
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registre = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registre)
+    else:
+        registre = REGISTRY
+    return HttpResponse(generate_latest(registre), content_type=CONTENT_TYPE_LATEST)
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 from datetime import timedelta
 
@@ -32,6 +33,35 @@ REST_FRAMEWORK = {
 SECRET_KEY = 'django-insecure-zhfz$v#2^#6v@+6%&91743*f4pl+_9w9ahnpi%bnt=p5)6vp(h'
 
 
+# Journal des recherches (apps.astuces.journal) : écriture différée par lots
+RECHERCHES_ECRITURE_DIFFEREE = True
+RECHERCHES_TAILLE_LOT = 200
+RECHERCHES_INTERVALLE_VIDAGE = 2.0  # secondes
+RECHERCHES_CAPACITE_FILE = 10000
+# Exposition /metrics (core.metriques) : jeton Bearer exigé ; sans jeton, servie en DEBUG seulement
+METRIQUES_JETON = os.getenv('METRIQUES_JETON', '')
+TENDANCES_TTL = 900  # cache des recherches tendance (secondes)
+# Astuces tendance : demi-vie du poids d'une évaluation ou d'un favori
+TENDANCE_DEMI_VIE_HEURES = 72
+# Astuces similaires (apps.astuces.similaires) : vectoriseur TF-IDF et matrice
+SIMILAIRES_INDEX = os.path.join(BASE_DIR, 'var', 'similaires.joblib')
+
+
+# Variantes des images envoyées (apps.astuces.images) : threads de calcul
+IMAGES_TRAVAILLEURS = 2
+IMAGES_VARIANTES_SYNCHRONES = False  # True : calcul au commit, sans pool (scripts, tests)
+
+
+# Score IA (apps.astuces.score_ai) : modèle local et processus de calcul (défaut : un par cœur)
+SCORE_AI_MODELE = 'apps.astuces.score_ai.ModeleHeuristique'
+SCORE_AI_FICHIER = os.getenv('SCORE_AI_FICHIER', '')  # estimateur joblib pour ModeleFichier
+SCORE_AI_TRAVAILLEURS = None
+
+
+# File de modération (apps.astuces.moderation) : durée d'une réservation
+MODERATION_BAIL_MINUTES = 15
+
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=60),  # 1 hour token validity
     'REFRESH_TOKEN_LIFETIME': timedelta(days=7),     # refresh token validity
@@ -65,6 +95,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'rest_framework',
     'django_filters',
     'corsheaders',
@@ -74,6 +105,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.metriques.MetriquesMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -121,6 +153,17 @@ DATABASES = {
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
+
+# Cache (réponses anonymes versionnées, apps.astuces.cache)
+# locmem en développement et en test ; memcached ou Redis en production (voir prod.py)
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'astuce-plus',
+    }
+}
+CACHE_REPONSES_TTL = 300  # secondes
+CACHE_FAVORIS_TTL = 3600  # secondes
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -159,9 +202,14 @@ STATIC_URL = 'static/'
 
 # Media files (Uploads)
 # https://docs.djangoproject.com/en/5.2/howto/static-files/
-import os
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+# Envoi des médias (apps.astuces.media) : 'django' (flux, Range, ETag),
+# 'x-accel' (nginx, location interne MEDIA_ACCEL_PREFIXE) ou 'x-sendfile'
+MEDIA_ENVOI = os.getenv('MEDIA_ENVOI', 'django')
+MEDIA_ACCEL_PREFIXE = '/media-interne/'
+# Validité des URL signées des médias privés (secondes, entre une et deux périodes)
+MEDIA_URL_SIGNEE_DUREE = 3600
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
@@ -14,3 +14,15 @@ DATABASES = {
         'PORT': '5432',
     }
 }
+
+# Cache partagé entre les workers : les compteurs de génération doivent être communs
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.getenv('REDIS_URL', 'redis://127.0.0.1:6379/1'),
+    }
+}
+
+# nginx sert les médias après contrôle d'accès par Django :
+#   location /media-interne/ { internal; alias /chemin/vers/media/; }
+MEDIA_ENVOI = os.getenv('MEDIA_ENVOI', 'x-accel')
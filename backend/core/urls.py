@@ -1,8 +1,9 @@
 from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
-from django.conf.urls.static import static
 from . import views
+from .metriques import metrics
+from apps.astuces.media import servir_media
 
 from rest_framework import routers
 from rest_framework_simplejwt.views import (
@@ -14,11 +15,11 @@ from rest_framework_simplejwt.views import (
 urlpatterns = [
     path('', views.home),  # page d’accueil temporaire
     path('admin/', admin.site.urls),
+    path('metrics', metrics),
     path('api/users/', include('apps.users.urls')),
     path('api/astuces/', include('apps.astuces.urls')),  # API astuces 
+    # Médias avec contrôle d'accès, délégués au serveur web en production
+    path(f"{settings.MEDIA_URL.strip('/')}/<path:chemin>", servir_media, name='media'),
 
 ]
 
-# Servir les fichiers média en développement
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)